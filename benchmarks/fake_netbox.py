@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Fake NetBox Server
+
+A stand-in for the NetBox REST API used by the benchmarks. Objects are never
+stored: device, interface and IP address N is generated from N on demand, so
+datasets of a million devices cost no memory. The server emulates offset
+pagination with `count`/`next`, the common filters, brief mode, bulk
+POST/PATCH/DELETE, and can add latency and answer a share of requests with
+429 Too Many Requests.
+
+Writes are acknowledged but not applied; the dataset is fixed for a run.
+
+Run standalone with `python -m benchmarks.fake_netbox --devices 100000`. The
+first line printed is the base URL. GET /_bench/stats returns request and byte
+counters and POST /_bench/reset clears them.
+"""
+
+import argparse
+import json
+import random
+import resource
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+DATASETS = {
+    "tiny": 1_000,
+    "small": 10_000,
+    "medium": 100_000,
+    "large": 1_000_000,
+}
+
+DEVICES_PER_SITE = 100
+INTERFACES_PER_DEVICE = 8
+IPS_PER_DEVICE = 2
+MAX_PAGE_SIZE = 1000
+NETBOX_VERSION = "4.2.0"
+
+ROLES = ["access-switch", "core-switch", "firewall", "router", "server"]
+STATUSES = ["active", "planned", "offline"]
+
+# Query parameters that do not filter
+CONTROL_PARAMS = {"limit", "offset", "ordering", "format", "brief", "fields", "exclude", "include"}
+
+
+def _ref(kind: str, id: int, name: str, **extra: Any) -> Dict[str, Any]:
+    return {"id": id, "url": f"/api/{kind}/{id}/", "display": name, "name": name, **extra}
+
+
+class Dataset:
+    """Synthetic sites, devices, interfaces and IP addresses derived from their IDs."""
+
+    def __init__(self, devices: int):
+        self.devices = devices
+        self.sites = max(1, devices // DEVICES_PER_SITE)
+        self.sizes = {
+            "dcim/sites": self.sites,
+            "dcim/devices": devices,
+            "dcim/interfaces": devices * INTERFACES_PER_DEVICE,
+            "ipam/ip-addresses": devices * IPS_PER_DEVICE,
+            "core/object-changes": 0,
+        }
+
+    def site_of(self, device: int) -> int:
+        return (device - 1) % self.sites + 1
+
+    def site(self, id: int, brief: bool = False) -> Dict[str, Any]:
+        ref = _ref("dcim/sites", id, f"site-{id:05d}", slug=f"site-{id:05d}")
+        if brief:
+            return ref
+        return {**ref, "status": {"value": "active", "label": "Active"}, "region": None, "tenant": None,
+                "facility": f"DC{id}", "time_zone": "UTC", "description": "", "tags": []}
+
+    def device(self, id: int, brief: bool = False) -> Dict[str, Any]:
+        ref = _ref("dcim/devices", id, f"device-{id:07d}")
+        if brief:
+            return ref
+        role = ROLES[id % len(ROLES)]
+        status = STATUSES[id % len(STATUSES)]
+        return {
+            **ref,
+            "device_type": {"id": id % 20 + 1, "display": f"model-{id % 20 + 1}", "slug": f"model-{id % 20 + 1}",
+                            "manufacturer": {"id": id % 4 + 1, "name": f"vendor-{id % 4 + 1}",
+                                             "slug": f"vendor-{id % 4 + 1}"}},
+            "role": {"id": id % len(ROLES) + 1, "name": role, "slug": role},
+            "site": self.site(self.site_of(id), brief=True),
+            "rack": None,
+            "status": {"value": status, "label": status.title()},
+            "serial": f"SN{id:010d}",
+            "primary_ip4": None,
+            "tenant": None,
+            "platform": None,
+            "description": "",
+            "tags": [],
+            "custom_fields": {},
+            "last_updated": "2024-01-01T00:00:00Z",
+        }
+
+    def interface(self, id: int, brief: bool = False) -> Dict[str, Any]:
+        device = (id - 1) // INTERFACES_PER_DEVICE + 1
+        ref = _ref("dcim/interfaces", id, f"eth{(id - 1) % INTERFACES_PER_DEVICE}")
+        if brief:
+            return ref
+        return {**ref, "device": self.device(device, brief=True), "type": {"value": "10gbase-t"},
+                "enabled": True, "mtu": 9000, "mac_address": f"00:00:{id >> 16 & 255:02x}:{id >> 8 & 255:02x}:{id & 255:02x}:00",
+                "description": "", "tags": []}
+
+    def ip_address(self, id: int, brief: bool = False) -> Dict[str, Any]:
+        interface = (id - 1) // IPS_PER_DEVICE * INTERFACES_PER_DEVICE + (id - 1) % IPS_PER_DEVICE + 1
+        address = f"10.{id >> 16 & 255}.{id >> 8 & 255}.{id & 255}/24"
+        ref = {"id": id, "url": f"/api/ipam/ip-addresses/{id}/", "display": address, "address": address}
+        if brief:
+            return ref
+        return {**ref, "status": {"value": "active"}, "assigned_object_type": "dcim.interface",
+                "assigned_object_id": interface, "assigned_object": self.interface(interface, brief=True),
+                "dns_name": "", "tenant": None, "tags": []}
+
+    def render(self, endpoint: str, id: int, brief: bool = False) -> Dict[str, Any]:
+        return {
+            "dcim/sites": self.site,
+            "dcim/devices": self.device,
+            "dcim/interfaces": self.interface,
+            "ipam/ip-addresses": self.ip_address,
+        }[endpoint](id, brief)
+
+    def select(self, endpoint: str, filters: Dict[str, List[str]]) -> Sequence[int]:
+        """
+        Return the IDs matching the filters, in order.
+
+        Site (by ID or slug), device and ID filters are answered arithmetically; any other
+        filter is checked against each generated candidate.
+        """
+        size = self.sizes.get(endpoint, 0)
+        candidates: Sequence[int] = range(1, size + 1)
+        checks: List[Callable[[int], bool]] = []
+        for key, values in filters.items():
+            if key == "id":
+                candidates = self._restrict(candidates, [range(int(v), int(v) + 1) for v in values])
+            elif endpoint == "dcim/devices" and key in ("site_id", "site"):
+                # Every device has a site, so 'site=null' selects nothing
+                sites = [int(v.rpartition("-")[2]) if key == "site" else int(v) for v in values if v != "null"]
+                candidates = self._restrict(candidates, [
+                    range(s, size + 1, self.sites) for s in sites if 0 < s <= self.sites])
+            elif endpoint == "dcim/interfaces" and key == "device_id":
+                candidates = self._restrict(candidates, [
+                    range((int(v) - 1) * INTERFACES_PER_DEVICE + 1, int(v) * INTERFACES_PER_DEVICE + 1)
+                    for v in values if 0 < int(v) <= self.devices])
+            elif endpoint == "ipam/ip-addresses" and key == "device_id":
+                candidates = self._restrict(candidates, [
+                    range((int(v) - 1) * IPS_PER_DEVICE + 1, int(v) * IPS_PER_DEVICE + 1)
+                    for v in values if 0 < int(v) <= self.devices])
+            else:
+                checks.append(self._check(endpoint, key, set(values)))
+        if checks:
+            candidates = [i for i in candidates if all(check(i) for check in checks)]
+        return candidates
+
+    @staticmethod
+    def _restrict(candidates: Sequence[int], ranges: List[range]) -> Sequence[int]:
+        """Intersect the candidates with the union of ranges, keeping a range where possible."""
+        if len(ranges) == 1 and isinstance(candidates, range) and candidates.start == 1 and candidates.step == 1:
+            r = ranges[0]
+            return r if r.stop - 1 < candidates.stop else range(r.start, candidates.stop, r.step)
+        allowed = candidates if isinstance(candidates, range) else set(candidates)
+        return sorted({i for r in ranges for i in r if i in allowed})
+
+    def _check(self, endpoint: str, key: str, values: set) -> Callable[[int], bool]:
+        def check(id: int) -> bool:
+            obj = self.render(endpoint, id)
+            field = key[:-3] if key.endswith("_id") else key
+            value = obj.get(field)
+            if isinstance(value, dict):
+                if key.endswith("_id"):
+                    return str(value.get("id")) in values
+                return str(value.get("slug", value.get("value", value.get("name")))) in values
+            return str(value) in values
+        return check
+
+
+class BenchStats:
+    """Request and traffic counters of the fake server."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.throttled = 0
+            self.bytes_in = 0
+            self.bytes_out = 0
+            self.by_method: Dict[str, int] = {}
+
+    def record(self, method: str, bytes_in: int, bytes_out: int, throttled: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.throttled += throttled
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.by_method[method] = self.by_method.get(method, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "by_method": dict(self.by_method),
+                "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            }
+
+
+class FakeNetBoxHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, Nagle's algorithm adds ~40ms per request
+    disable_nagle_algorithm = True
+    server: "FakeNetBoxServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._handle()
+
+    def do_POST(self) -> None:
+        self._handle()
+
+    def do_PATCH(self) -> None:
+        self._handle()
+
+    def do_PUT(self) -> None:
+        self._handle()
+
+    def do_DELETE(self) -> None:
+        self._handle()
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        url = urlparse(self.path)
+        if url.path.startswith("/_bench/"):
+            if url.path == "/_bench/reset":
+                self.server.stats.reset()
+            self._send(200, self.server.stats.to_dict(), record=False)
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency * random.uniform(0.5, 1.5))
+        if self.server.throttle_rate and random.random() < self.server.throttle_rate:
+            self._send(429, {"detail": "Request was throttled."}, len(raw), throttled=True,
+                       headers={"Retry-After": str(self.server.retry_after)})
+            return
+        status, body = self._route(url.path, parse_qs(url.query), raw)
+        self._send(status, body, len(raw))
+
+    def _route(self, path: str, query: Dict[str, List[str]], raw: bytes) -> Tuple[int, Any]:
+        dataset = self.server.dataset
+        parts = path.strip("/").split("/")
+        if parts[0] != "api":
+            return 404, {"detail": "Not found."}
+        if parts[1:] == ["status"]:
+            return 200, {"netbox-version": NETBOX_VERSION}
+        if len(parts) < 3:
+            return 404, {"detail": "Not found."}
+        endpoint = "/".join(parts[1:3])
+        if endpoint not in dataset.sizes:
+            return 404, {"detail": "Not found."}
+        if self.command != "GET":
+            return self._write(endpoint, json.loads(raw or b"null"))
+        brief = query.get("brief", ["false"])[0].lower() in ("1", "true")
+        if len(parts) == 4:
+            id = int(parts[3])
+            if not 0 < id <= dataset.sizes[endpoint]:
+                return 404, {"detail": "No object matches the given query."}
+            return 200, dataset.render(endpoint, id, brief)
+        filters = {k: v for k, v in query.items() if k not in CONTROL_PARAMS}
+        ids = dataset.select(endpoint, filters)
+        limit = min(int(query.get("limit", ["50"])[0]) or MAX_PAGE_SIZE, MAX_PAGE_SIZE)
+        offset = int(query.get("offset", ["0"])[0])
+        page = ids[offset:offset + limit]
+        next_url = None
+        if offset + limit < len(ids):
+            params = "&".join(f"{k}={v}" for k, vs in query.items() if k not in ("limit", "offset") for v in vs)
+            next_url = f"http://{self.headers['Host']}{path}?{params}&limit={limit}&offset={offset + limit}"
+        return 200, {
+            "count": len(ids),
+            "next": next_url,
+            "previous": None,
+            "results": [dataset.render(endpoint, i, brief) for i in page],
+        }
+
+    def _write(self, endpoint: str, body: Any) -> Tuple[int, Any]:
+        items = body if isinstance(body, list) else [body]
+        if self.command == "DELETE":
+            return 204, None
+        if self.command == "POST":
+            with self.server.id_lock:
+                first = self.server.next_id
+                self.server.next_id += len(items)
+            items = [{**item, "id": first + n} for n, item in enumerate(items)]
+        return (201 if self.command == "POST" else 200), (items if isinstance(body, list) else items[0])
+
+    def _send(self, status: int, body: Any, bytes_in: int = 0, throttled: bool = False,
+              headers: Optional[Dict[str, str]] = None, record: bool = True) -> None:
+        payload = b"" if body is None else json.dumps(body, separators=(",", ":")).encode()
+        self.send_response(status)
+        if payload:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        # Counted before the client can see the response, so a caller reading the stats never misses it
+        if record:
+            self.server.stats.record(self.command, bytes_in, len(payload), throttled)
+        self.wfile.write(payload)
+
+
+class FakeNetBoxServer(ThreadingHTTPServer):
+    """Threaded HTTP server serving a synthetic Dataset."""
+
+    daemon_threads = True
+
+    def __init__(self, dataset: Dataset, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: int = 1):
+        """
+        Initialize the server.
+
+        Args:
+            dataset: The synthetic dataset to serve
+            host: Address to bind
+            port: Port to bind (0 picks a free one)
+            latency: Mean added latency per request in seconds
+            throttle_rate: Share of requests answered with 429
+            retry_after: Retry-After seconds sent with each 429
+        """
+        super().__init__((host, port), FakeNetBoxHandler)
+        self.dataset = dataset
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.stats = BenchStats()
+        self.id_lock = threading.Lock()
+        self.next_id = max(dataset.sizes.values()) + 1
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients that stop reading a streamed page close the connection early
+        pass
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a synthetic NetBox dataset")
+    parser.add_argument("--dataset", choices=sorted(DATASETS), default="small")
+    parser.add_argument("--devices", type=int, help="Number of devices (overrides --dataset)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean added latency per request in seconds")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args()
+
+    dataset = Dataset(args.devices or DATASETS[args.dataset])
+    server = FakeNetBoxServer(dataset, args.host, args.port, args.latency, args.throttle_rate, args.retry_after)
+    print(server.url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+NetBox MCP Benchmarks
+
+Starts the fake NetBox server (benchmarks/fake_netbox.py) in a subprocess,
+then drives NetBoxRestClient directly and the netbox_server.py MCP tools over
+stdio against it. Each scenario reports p50/p99 latency, operations and HTTP
+requests per second, bytes transferred and peak RSS, and the whole run is
+written as JSON so it can be compared with an earlier one:
+
+    python -m benchmarks.run --dataset medium --latency 0.005 --output after.json --compare before.json
+
+Run from the repository root.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from benchmarks.fake_netbox import DATASETS, Dataset
+from netbox_client import NetBoxRestClient
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Metrics where a lower value is better, used by --compare
+LOWER_IS_BETTER = {"p50_ms", "p99_ms", "mean_ms", "http_requests", "bytes_in", "bytes_out", "peak_rss_kb"}
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))]
+
+
+class FakeNetBoxProcess:
+    """The fake NetBox server, run in its own process so it does not compete for the GIL."""
+
+    def __init__(self, devices: int, latency: float, throttle_rate: float):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.fake_netbox", "--devices", str(devices),
+             "--latency", str(latency), "--throttle-rate", str(throttle_rate)],
+            cwd=REPO_ROOT, stdout=subprocess.PIPE, text=True,
+        )
+        self.url = self.process.stdout.readline().strip()
+        if not self.url:
+            raise RuntimeError("fake NetBox server failed to start")
+
+    def reset(self) -> None:
+        requests.post(f"{self.url}/_bench/reset", timeout=10)
+
+    def stats(self) -> Dict[str, Any]:
+        return requests.get(f"{self.url}/_bench/stats", timeout=10).json()
+
+    def stop(self) -> None:
+        self.process.terminate()
+        self.process.wait()
+
+
+def summarize(name: str, target: str, latencies: List[float], errors: int, wall: float,
+              server: Dict[str, Any], peak_rss_kb: int) -> Dict[str, Any]:
+    """Build a scenario's result record."""
+    ops = len(latencies)
+    return {
+        "name": name,
+        "target": target,
+        "ops": ops,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "ops_per_sec": round(ops / wall, 2) if wall else 0.0,
+        "http_requests": server["requests"],
+        "http_requests_per_sec": round(server["requests"] / wall, 2) if wall else 0.0,
+        "throttled": server["throttled"],
+        "bytes_in": server["bytes_in"],
+        "bytes_out": server["bytes_out"],
+        "peak_rss_kb": peak_rss_kb,
+        "wall_s": round(wall, 3),
+    }
+
+
+def client_scenarios(client: NetBoxRestClient, devices: int, sites: int) -> Dict[str, Callable[[random.Random], Any]]:
+    """Operations driven directly against NetBoxRestClient, each taking a seeded RNG."""
+    new_interfaces = [{"device": 1, "name": f"bench{i}", "type": "virtual"} for i in range(1000)]
+    return {
+        "client.device_by_id": lambda rng: client.get("dcim/devices", id=rng.randint(1, devices)),
+        "client.devices_by_site": lambda rng: client.get("dcim/devices", params={"site_id": rng.randint(1, sites)}),
+        "client.interfaces_by_device": lambda rng: client.get("dcim/interfaces",
+                                                              params={"device_id": rng.randint(1, devices)}),
+        "client.count_by_site": lambda rng: client.count("dcim/devices", {"site_id": rng.randint(1, sites)}),
+        "client.list_all_sites": lambda rng: client.get("dcim/sites"),
+        "client.bulk_create_1000": lambda rng: client.bulk_create("dcim/interfaces", new_interfaces),
+    }
+
+
+def mcp_scenarios(devices: int, sites: int) -> Dict[str, Callable[[random.Random], tuple]]:
+    """MCP tool calls, each returning (tool name, arguments) for a seeded RNG."""
+    return {
+        "mcp.get_objects_by_site": lambda rng: ("netbox_get_objects", {
+            "object_type": "devices", "filters": {"site": f"site-{rng.randint(1, sites):05d}"}}),
+        "mcp.get_object_by_id": lambda rng: ("netbox_get_object_by_id", {
+            "object_type": "devices", "object_id": rng.randint(1, devices)}),
+        "mcp.aggregate_by_site": lambda rng: ("netbox_aggregate", {
+            "object_type": "devices", "filters": {"site": f"site-{rng.randint(1, sites):05d}"}}),
+        "mcp.describe_device": lambda rng: ("netbox_describe", {
+            "object_type": "devices", "object_id": rng.randint(1, devices), "depth": 1}),
+    }
+
+
+def run_client(fake: FakeNetBoxProcess, args: argparse.Namespace, devices: int, sites: int) -> List[Dict[str, Any]]:
+    client = NetBoxRestClient(fake.url, "bench-token", max_workers=args.workers)
+    results = []
+    for name, op in client_scenarios(client, devices, sites).items():
+        if not selected(name, args.only):
+            continue
+        rng = random.Random(args.seed)
+        iterations = max(1, args.iterations // 20) if name.endswith(("list_all_sites", "bulk_create_1000")) else args.iterations
+        for _ in range(args.warmup):
+            op(rng)
+        fake.reset()
+        latencies: List[float] = []
+        errors = 0
+
+        def timed(op_rng: random.Random) -> Optional[float]:
+            started = time.perf_counter()
+            try:
+                op(op_rng)
+            except Exception:
+                return None
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        rngs = [random.Random(rng.random()) for _ in range(iterations)]
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for elapsed in pool.map(timed, rngs):
+                if elapsed is None:
+                    errors += 1
+                else:
+                    latencies.append(elapsed)
+        wall = time.perf_counter() - started
+        results.append(summarize(name, "client", latencies, errors, wall, fake.stats(),
+                                 resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+        print_result(results[-1])
+    return results
+
+
+async def run_mcp(fake: FakeNetBoxProcess, args: argparse.Namespace, devices: int, sites: int) -> List[Dict[str, Any]]:
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    env = dict(os.environ, NETBOX_URL=fake.url, NETBOX_TOKEN="bench-token", NETBOX_SCHEMA="0",
+               FASTMCP_LOG_LEVEL="DEBUG" if args.verbose else "WARNING",
+               NETBOX_CACHE="1" if args.cache else "0")
+    server_params = StdioServerParameters(command=sys.executable, args=["netbox_server.py"], env=env, cwd=REPO_ROOT)
+    results = []
+    errlog = sys.stderr if args.verbose else open(os.devnull, "w")
+    async with stdio_client(server_params, errlog=errlog) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            semaphore = asyncio.Semaphore(args.concurrency)
+            for name, make_call in mcp_scenarios(devices, sites).items():
+                if not selected(name, args.only):
+                    continue
+                rng = random.Random(args.seed)
+                for _ in range(args.warmup):
+                    await session.call_tool(*make_call(rng))
+                fake.reset()
+                calls = [make_call(rng) for _ in range(args.iterations)]
+
+                async def timed(tool: str, arguments: Dict[str, Any]) -> Optional[float]:
+                    async with semaphore:
+                        started = time.perf_counter()
+                        result = await session.call_tool(tool, arguments)
+                        if result.isError:
+                            return None
+                        return time.perf_counter() - started
+
+                started = time.perf_counter()
+                outcomes = await asyncio.gather(*(timed(tool, arguments) for tool, arguments in calls))
+                wall = time.perf_counter() - started
+                latencies = [elapsed for elapsed in outcomes if elapsed is not None]
+                # The MCP server is still running, so its peak RSS is not known until the session closes
+                results.append(summarize(name, "mcp", latencies, len(outcomes) - len(latencies), wall,
+                                         fake.stats(), 0))
+                print_result(results[-1])
+    # The fake server is still running and unreaped, so this covers the MCP server process only
+    server_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    for result in results:
+        result["peak_rss_kb"] = server_rss
+    return results
+
+
+def selected(name: str, only: Optional[List[str]]) -> bool:
+    return not only or any(pattern in name for pattern in only)
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    print(f"{result['name']:<30} p50 {result['p50_ms']:>9.2f}ms  p99 {result['p99_ms']:>9.2f}ms  "
+          f"{result['ops_per_sec']:>8.1f} ops/s  {result['http_requests_per_sec']:>8.1f} req/s  "
+          f"{result['bytes_out'] / 1e6:>8.2f} MB out  errors {result['errors']}", flush=True)
+
+
+def compare(current: Dict[str, Any], baseline_path: str) -> None:
+    """Print each scenario's change relative to a previous run."""
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["scenarios"]}
+    print(f"\nCompared with {baseline_path}:")
+    for result in current["scenarios"]:
+        before = baseline.get(result["name"])
+        if not before:
+            continue
+        changes = []
+        for metric in ("p50_ms", "p99_ms", "ops_per_sec", "http_requests", "bytes_out"):
+            if before[metric]:
+                delta = (result[metric] - before[metric]) / before[metric] * 100
+                better = delta < 0 if metric in LOWER_IS_BETTER else delta > 0
+                changes.append(f"{metric} {delta:+.1f}%{'' if abs(delta) < 5 else (' ✓' if better else ' ✗')}")
+        print(f"{result['name']:<30} " + "  ".join(changes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the NetBox client and MCP tools against a fake NetBox")
+    parser.add_argument("--dataset", choices=sorted(DATASETS, key=DATASETS.get), default="small")
+    parser.add_argument("--devices", type=int, help="Number of devices (overrides --dataset)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean added server latency in seconds")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--iterations", type=int, default=200, help="Operations per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed operations before each scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="Operations in flight at once")
+    parser.add_argument("--workers", type=int, default=4, help="NetBoxRestClient max_workers")
+    parser.add_argument("--verbose", action="store_true", help="Show the MCP server's log output")
+    parser.add_argument("--cache", action="store_true", help="Keep the MCP server's response cache enabled")
+    parser.add_argument("--target", choices=["all", "client", "mcp"], default="all")
+    parser.add_argument("--only", nargs="*", help="Run only scenarios whose name contains one of these")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Print changes relative to an earlier JSON result file")
+    args = parser.parse_args()
+
+    devices = args.devices or DATASETS[args.dataset]
+    sites = Dataset(devices).sites
+    fake = FakeNetBoxProcess(devices, args.latency, args.throttle_rate)
+    try:
+        scenarios = []
+        if args.target in ("all", "client"):
+            scenarios += run_client(fake, args, devices, sites)
+        if args.target in ("all", "mcp"):
+            scenarios += asyncio.run(run_mcp(fake, args, devices, sites))
+        fake_rss = fake.stats()["peak_rss_kb"]
+    finally:
+        fake.stop()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "devices": devices,
+            "latency": args.latency,
+            "throttle_rate": args.throttle_rate,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "cache": args.cache,
+            "seed": args.seed,
+            "fake_server_peak_rss_kb": fake_rss,
+        },
+        "scenarios": scenarios,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+NetBox Bulk Operations
+
+This module splits bulk create/update/delete payloads into chunks and tracks
+their outcome. It holds no transport of its own: the REST clients drive a
+BulkPlan, submitting the chunks it hands out with bounded concurrency and
+reporting back how each request went.
+"""
+
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+import requests
+
+BULK_METHODS = {"create": "POST", "update": "PATCH", "delete": "DELETE"}
+
+# Statuses for which NetBox did not apply the chunk, so any method may resend it
+RETRYABLE_STATUSES = {429, 503}
+
+# Statuses that may arrive after the chunk was applied; only resent for idempotent methods
+IDEMPOTENT_RETRYABLE_STATUSES = {502, 504}
+
+# Statuses NetBox answers when some objects of a chunk fail validation; only these split a chunk
+SPLITTABLE_STATUSES = {400, 422}
+
+
+@dataclass
+class ChunkResult:
+    """Outcome of one chunk of a bulk operation."""
+
+    offset: int
+    size: int
+    status: str
+    attempts: int = 1
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def retried(self) -> bool:
+        return self.attempts > 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "offset": self.offset,
+            "size": self.size,
+            "status": self.status,
+            "attempts": self.attempts,
+            "retried": self.retried,
+            "elapsed": round(self.elapsed, 3),
+            "error": self.error,
+        }
+
+
+@dataclass
+class BulkResult:
+    """Structured outcome of a chunked bulk operation."""
+
+    operation: str
+    endpoint: str
+    total: int
+    chunks: List[ChunkResult] = field(default_factory=list)
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return sum(c.size for c in self.chunks if c.status == "succeeded")
+
+    @property
+    def failed(self) -> int:
+        return sum(c.size for c in self.chunks if c.status == "failed")
+
+    @property
+    def ok(self) -> bool:
+        return self.failed == 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operation": self.operation,
+            "endpoint": self.endpoint,
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried_chunks": sum(1 for c in self.chunks if c.retried),
+            "elapsed": round(self.elapsed, 3),
+            "chunks": [c.to_dict() for c in self.chunks],
+        }
+
+
+class BulkOperationError(requests.HTTPError):
+    """Raised by bulk_create/bulk_update/bulk_delete when any chunk failed."""
+
+    def __init__(self, result: BulkResult):
+        super().__init__(
+            f"Bulk {result.operation} on {result.endpoint}: {result.failed} of {result.total} objects failed"
+        )
+        self.result = result
+
+
+@dataclass
+class PendingChunk:
+    """A chunk handed out for submission."""
+
+    offset: int
+    items: List[Dict[str, Any]]
+    attempts: int = 1
+    delay: float = 0.0
+    started: float = 0.0
+
+
+class BulkPlan:
+    """
+    Chunking, retry and adaptive sizing state for one bulk operation.
+
+    Transient failures (429/503, connection errors, and for update/delete also
+    502/504 and timeouts) are resent with jittered exponential backoff up to
+    `retries` times. A multi-object chunk rejected with 400 or 422 is split in
+    half so the bad rows end up isolated in their own failed chunks; other
+    failures (401, 403, 404, 405, ...) fail the whole chunk at once. With `adaptive`,
+    the size of new chunks is scaled towards `target_latency` seconds per request.
+    """
+
+    def __init__(self, operation: str, endpoint: str, items: List[Dict[str, Any]], chunk_size: int,
+                 adaptive: bool = False, target_latency: float = 2.0, max_chunk_size: int = 2000,
+                 retries: int = 2, backoff: float = 0.5, split_on_error: bool = True):
+        if operation not in BULK_METHODS:
+            raise ValueError(f"Invalid bulk operation '{operation}'. Must be one of: {', '.join(BULK_METHODS)}")
+        self.operation = operation
+        self.method = BULK_METHODS[operation]
+        self.items = items
+        self.chunk_size = max(1, chunk_size)
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.max_chunk_size = max(self.chunk_size, max_chunk_size)
+        self.retries = retries
+        self.backoff = backoff
+        self.split_on_error = split_on_error
+        self.cursor = 0
+        self.queue: Deque[PendingChunk] = deque()
+        self.bodies: Dict[int, List[Dict[str, Any]]] = {}
+        self.result = BulkResult(operation=operation, endpoint=endpoint, total=len(items))
+        self.start = time.monotonic()
+
+    @property
+    def idempotent(self) -> bool:
+        return self.operation != "create"
+
+    def has_work(self) -> bool:
+        return bool(self.queue) or self.cursor < len(self.items)
+
+    def next_chunk(self) -> PendingChunk:
+        """Hand out the next chunk to submit, retries first."""
+        if self.queue:
+            chunk = self.queue.popleft()
+        else:
+            items = self.items[self.cursor:self.cursor + self.chunk_size]
+            chunk = PendingChunk(offset=self.cursor, items=items)
+            self.cursor += len(items)
+        chunk.started = time.monotonic()
+        return chunk
+
+    def succeeded(self, chunk: PendingChunk, body: Any) -> None:
+        """Record a chunk the server accepted."""
+        elapsed = time.monotonic() - chunk.started - chunk.delay
+        self.result.chunks.append(ChunkResult(chunk.offset, len(chunk.items), "succeeded", chunk.attempts, elapsed))
+        if isinstance(body, list):
+            self.bodies[chunk.offset] = body
+        if self.adaptive and elapsed > 0:
+            scale = min(2.0, max(0.5, self.target_latency / elapsed))
+            self.chunk_size = max(1, min(self.max_chunk_size, int(self.chunk_size * scale)))
+
+    def failed(self, chunk: PendingChunk, status: Optional[int], error: str, sent: bool = True) -> None:
+        """
+        Record a failed chunk and schedule a retry or split where possible.
+
+        Args:
+            chunk: The chunk that failed
+            status: HTTP status code, or None if no response was received
+            error: Error description
+            sent: False if the request never reached the server (e.g. connection refused)
+        """
+        elapsed = time.monotonic() - chunk.started - chunk.delay
+        retryable = (
+            not sent
+            or status in RETRYABLE_STATUSES
+            or (self.idempotent and (status is None or status in IDEMPOTENT_RETRYABLE_STATUSES))
+        )
+        if retryable and chunk.attempts <= self.retries:
+            delay = self.backoff * (2 ** (chunk.attempts - 1))
+            self.queue.append(PendingChunk(chunk.offset, chunk.items, chunk.attempts + 1,
+                                           delay=random.uniform(delay / 2, delay)))
+            return
+        # Auth, not-found and method errors fail every half alike, so only validation errors split
+        if not retryable and self.split_on_error and status in SPLITTABLE_STATUSES and len(chunk.items) > 1:
+            half = len(chunk.items) // 2
+            self.result.chunks.append(ChunkResult(chunk.offset, len(chunk.items), "split", chunk.attempts, elapsed, error))
+            self.queue.append(PendingChunk(chunk.offset, chunk.items[:half]))
+            self.queue.append(PendingChunk(chunk.offset + half, chunk.items[half:]))
+            return
+        self.result.chunks.append(ChunkResult(chunk.offset, len(chunk.items), "failed", chunk.attempts, elapsed, error))
+
+    def finish(self) -> BulkResult:
+        """Assemble the final result, with returned objects in input order."""
+        self.result.chunks.sort(key=lambda c: (c.offset, -c.size))
+        for offset in sorted(self.bodies):
+            self.result.results.extend(self.bodies[offset])
+        self.result.elapsed = time.monotonic() - self.start
+        return self.result
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+NetBox Response Cache
+
+This module provides a read-through cache for NetBox client implementations.
+Responses are keyed by endpoint and normalized query parameters, expire after a
+per-endpoint TTL, and are evicted least-recently-used once the cache exceeds its
+entry or memory budget. Any write through the wrapped client drops the cached
+entries of the endpoint it touched.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from netbox_client import NetBoxClientBase, RequestKey, request_key
+from netbox_encoding import intern_nested
+from netbox_metrics import count_received
+
+# TTL in seconds used for endpoints not listed in ENDPOINT_TTLS
+DEFAULT_TTL = 60
+
+# Reference data changes rarely; addressing and change records change constantly
+ENDPOINT_TTLS = {
+    "dcim/device-roles": 3600,
+    "dcim/device-types": 3600,
+    "dcim/manufacturers": 3600,
+    "dcim/platforms": 3600,
+    "dcim/rack-roles": 3600,
+    "dcim/regions": 3600,
+    "dcim/site-groups": 3600,
+    "dcim/sites": 600,
+    "ipam/rirs": 3600,
+    "ipam/roles": 3600,
+    "circuits/circuit-types": 3600,
+    "circuits/providers": 3600,
+    "virtualization/cluster-types": 3600,
+    "tenancy/contact-roles": 3600,
+    "tenancy/tenant-groups": 3600,
+    "extras/custom-fields": 3600,
+    "extras/tags": 3600,
+    "ipam/ip-addresses": 15,
+    "ipam/prefixes": 30,
+    "core/object-changes": 5,
+}
+
+# Every write records an object change, so this endpoint is invalidated on all writes
+CHANGELOG_ENDPOINT = "core/object-changes"
+
+
+def _normalize_endpoint(endpoint: str) -> str:
+    return endpoint.strip('/')
+
+
+class ResponseCache:
+    """
+    Thread-safe TTL and LRU cache for decoded NetBox responses.
+
+    Cached values are shared between callers and must be treated as read-only.
+    Repeated nested objects within a cached response are stored once (see
+    netbox_encoding.intern_nested).
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024,
+                 default_ttl: float = DEFAULT_TTL, ttls: Optional[Dict[str, float]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            max_bytes: Approximate memory budget, measured as response body size
+            default_ttl: TTL in seconds for endpoints without an explicit TTL
+            ttls: Per-endpoint TTLs in seconds (defaults to ENDPOINT_TTLS)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = dict(ENDPOINT_TTLS if ttls is None else ttls)
+        self._entries: "OrderedDict[RequestKey, Tuple[float, int, Any]]" = OrderedDict()
+        self._by_endpoint: Dict[str, Set[RequestKey]] = {}
+        self._generations: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def make_key(self, endpoint: str, id: Optional[int] = None, params: Optional[Dict[str, Any]] = None,
+                 max_objects: Optional[int] = None, page_size: Optional[int] = None) -> RequestKey:
+        """Build the cache key for a get() call."""
+        return request_key(endpoint, id, params, max_objects, page_size)
+
+    def ttl_for(self, endpoint: str) -> float:
+        """Return the TTL in seconds for an endpoint."""
+        return self.ttls.get(_normalize_endpoint(endpoint), self.default_ttl)
+
+    def lookup(self, key: RequestKey) -> Tuple[bool, Any]:
+        """
+        Look up a cached response.
+
+        Returns:
+            A (found, value) tuple
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, _, value = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                self._remove(key)
+            self.misses += 1
+            return False, None
+
+    def generation(self, endpoint: str) -> int:
+        """Return the endpoint's invalidation count, to be passed to store() by a read started now."""
+        with self._lock:
+            return self._generations.get(_normalize_endpoint(endpoint), 0)
+
+    def store(self, key: RequestKey, value: Any, size: Optional[int] = None,
+              generation: Optional[int] = None) -> None:
+        """
+        Cache a response, evicting least-recently-used entries as needed.
+
+        Args:
+            key: Cache key of the request
+            value: Decoded response
+            size: Response body size in bytes (measured by serializing the value if unknown)
+            generation: generation() of the endpoint when the read started; the response
+                is not cached if a write invalidated the endpoint since
+        """
+        ttl = self.ttl_for(key[0])
+        if ttl <= 0:
+            return
+        if not size:
+            # Coalesced reads receive no bytes of their own
+            size = len(json.dumps(value, separators=(',', ':'), default=str))
+        if size > self.max_bytes:
+            return
+        intern_nested(value)
+        with self._lock:
+            if generation is not None and self._generations.get(key[0], 0) != generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._by_endpoint.setdefault(key[0], set()).add(key)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, endpoint: str) -> int:
+        """
+        Drop every cached response for an endpoint and for the changelog.
+
+        Returns:
+            Number of entries dropped
+        """
+        dropped = 0
+        with self._lock:
+            for name in {_normalize_endpoint(endpoint), CHANGELOG_ENDPOINT}:
+                # Reads already in flight may carry the old state; keep them from being cached
+                self._generations[name] = self._generations.get(name, 0) + 1
+                for key in list(self._by_endpoint.get(name, ())):
+                    self._remove(key)
+                    dropped += 1
+            self.invalidations += dropped
+        return dropped
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+            self._by_endpoint.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current cache usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _remove(self, key: RequestKey) -> None:
+        """Remove an entry; the caller must hold the lock."""
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        keys = self._by_endpoint.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_endpoint[key[0]]
+
+
+class CachedNetBoxClient(NetBoxClientBase):
+    """
+    Read-through caching wrapper around a blocking NetBox client.
+
+    Writes are passed through and invalidate the cached entries of the endpoint
+    they touch; a read that was in flight during the write is not cached.
+    Nested representations of a changed object held in other endpoints'
+    entries expire with their TTL.
+    """
+
+    def __init__(self, client: NetBoxClientBase, cache: Optional[ResponseCache] = None):
+        """
+        Initialize the caching wrapper.
+
+        Args:
+            client: The NetBox client to wrap
+            cache: Cache to use (a new ResponseCache by default)
+        """
+        self.client = client
+        self.cache = cache or ResponseCache()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    def get(self, endpoint: str, id: Optional[int] = None, params: Optional[Dict[str, Any]] = None,
+            max_objects: Optional[int] = None, page_size: Optional[int] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        key = self.cache.make_key(endpoint, id, params, max_objects, page_size)
+        found, value = self.cache.lookup(key)
+        if found:
+            return value
+        generation = self.cache.generation(endpoint)
+        with count_received() as received:
+            value = self.client.get(endpoint, id=id, params=params, max_objects=max_objects, page_size=page_size)
+        self.cache.store(key, value, size=received[0], generation=generation)
+        return value
+
+    def create(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self.client.create(endpoint, data)
+        finally:
+            self.cache.invalidate(endpoint)
+
+    def update(self, endpoint: str, id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self.client.update(endpoint, id, data)
+        finally:
+            self.cache.invalidate(endpoint)
+
+    def delete(self, endpoint: str, id: int) -> bool:
+        try:
+            return self.client.delete(endpoint, id)
+        finally:
+            self.cache.invalidate(endpoint)
+
+    def bulk_operation(self, operation: str, endpoint: str, data: List[Dict[str, Any]], **kwargs: Any) -> Any:
+        try:
+            return self.client.bulk_operation(operation, endpoint, data, **kwargs)
+        finally:
+            self.cache.invalidate(endpoint)
+
+    def bulk_create(self, endpoint: str, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        try:
+            return self.client.bulk_create(endpoint, data)
+        finally:
+            self.cache.invalidate(endpoint)
+
+    def bulk_update(self, endpoint: str, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        try:
+            return self.client.bulk_update(endpoint, data)
+        finally:
+            self.cache.invalidate(endpoint)
+
+    def bulk_delete(self, endpoint: str, ids: List[int]) -> bool:
+        try:
+            return self.client.bulk_delete(endpoint, ids)
+        finally:
+            self.cache.invalidate(endpoint)
+
+
+class AsyncCachedNetBoxClient(NetBoxClientBase):
+    """
+    Read-through caching wrapper around an asyncio NetBox client.
+
+    Async counterpart of CachedNetBoxClient.
+    """
+
+    def __init__(self, client: NetBoxClientBase, cache: Optional[ResponseCache] = None):
+        """
+        Initialize the caching wrapper.
+
+        Args:
+            client: The async NetBox client to wrap
+            cache: Cache to use (a new ResponseCache by default)
+        """
+        self.client = client
+        self.cache = cache or ResponseCache()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    async def get(self, endpoint: str, id: Optional[int] = None, params: Optional[Dict[str, Any]] = None,
+                  max_objects: Optional[int] = None, page_size: Optional[int] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        key = self.cache.make_key(endpoint, id, params, max_objects, page_size)
+        found, value = self.cache.lookup(key)
+        if found:
+            return value
+        generation = self.cache.generation(endpoint)
+        with count_received() as received:
+            value = await self.client.get(endpoint, id=id, params=params, max_objects=max_objects, page_size=page_size)
+        self.cache.store(key, value, size=received[0], generation=generation)
+        return value
+
+    async def create(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return await self.client.create(endpoint, data)
+        finally:
+            self.cache.invalidate(endpoint)
+
+    async def update(self, endpoint: str, id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return await self.client.update(endpoint, id, data)
+        finally:
+            self.cache.invalidate(endpoint)
+
+    async def delete(self, endpoint: str, id: int) -> bool:
+        try:
+            return await self.client.delete(endpoint, id)
+        finally:
+            self.cache.invalidate(endpoint)
+
+    async def bulk_operation(self, operation: str, endpoint: str, data: List[Dict[str, Any]], **kwargs: Any) -> Any:
+        try:
+            return await self.client.bulk_operation(operation, endpoint, data, **kwargs)
+        finally:
+            self.cache.invalidate(endpoint)
+
+    async def bulk_create(self, endpoint: str, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        try:
+            return await self.client.bulk_create(endpoint, data)
+        finally:
+            self.cache.invalidate(endpoint)
+
+    async def bulk_update(self, endpoint: str, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        try:
+            return await self.client.bulk_update(endpoint, data)
+        finally:
+            self.cache.invalidate(endpoint)
+
+    async def bulk_delete(self, endpoint: str, ids: List[int]) -> bool:
+        try:
+            return await self.client.bulk_delete(endpoint, ids)
+        finally:
+            self.cache.invalidate(endpoint)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+NetBox Changelog Tailing
+
+This module follows NetBox's changelog (core/object-changes) incrementally.
+A cursor remembers the ID and time of the last change seen; each poll asks
+NetBox only for newer entries (id__gt, with time__gte as a coarser bound for
+versions without ID lookups) and streams them across pages. wait() and
+follow() long-poll, backing off while nothing changes, so audit agents and
+cache invalidators can keep up with NetBox without re-scanning a window.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+CHANGELOG_ENDPOINT = "core/object-changes"
+
+
+@dataclass
+class ChangelogCursor:
+    """High-watermark of a changelog tail: the last change ID and its time."""
+
+    last_id: int = 0
+    last_time: Optional[str] = None
+
+    def params(self) -> Dict[str, Any]:
+        """Query parameters selecting the changes after this cursor."""
+        params: Dict[str, Any] = {"ordering": "id"}
+        if self.last_id:
+            params["id__gt"] = self.last_id
+        if self.last_time:
+            params["time__gte"] = self.last_time
+        return params
+
+    def accept(self, change: Dict[str, Any]) -> bool:
+        """Advance past a change; return False if it was already seen."""
+        if change["id"] <= self.last_id:
+            return False
+        self.last_id = change["id"]
+        self.last_time = change.get("time", self.last_time)
+        return True
+
+    def to_token(self) -> str:
+        """Encode the cursor as an opaque string ('<id>:<time>')."""
+        return f"{self.last_id}:{self.last_time or ''}"
+
+    @classmethod
+    def from_token(cls, token: str) -> "ChangelogCursor":
+        """
+        Decode a cursor produced by to_token().
+
+        Raises:
+            ValueError: If the token is malformed
+        """
+        last_id, _, last_time = token.partition(":")
+        try:
+            return cls(int(last_id), last_time or None)
+        except ValueError:
+            raise ValueError(f"Invalid changelog cursor '{token}'") from None
+
+
+class _TailSettings:
+    """Settings shared by the blocking and asyncio tails."""
+
+    def __init__(self, client: Any, filters: Optional[Dict[str, Any]] = None,
+                 cursor: Optional[ChangelogCursor] = None, page_size: int = 1000,
+                 poll_interval: float = 1.0, max_interval: float = 30.0, backoff: float = 2.0):
+        """
+        Initialize the tail.
+
+        Args:
+            client: The NetBox client to read the changelog with
+            filters: Further changelog filters (e.g. {"changed_object_type": "dcim.device"})
+            cursor: Where to start; the beginning of the changelog by default (see seek_latest)
+            page_size: Changes requested per page
+            poll_interval: Seconds between polls while changes keep arriving
+            max_interval: Longest wait between polls after repeated empty polls
+            backoff: Factor the wait grows by after each empty poll
+        """
+        self.client = client
+        self.filters = dict(filters or {})
+        self.cursor = cursor or ChangelogCursor()
+        self.page_size = page_size
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.polls = 0
+        self.truncated = False
+
+    def _params(self) -> Dict[str, Any]:
+        return {**self.filters, **self.cursor.params()}
+
+    def _next_interval(self, interval: float) -> float:
+        return min(self.max_interval, interval * self.backoff)
+
+
+class ChangelogTail(_TailSettings):
+    """Incremental changelog reader for a blocking NetBox client."""
+
+    def seek_latest(self) -> ChangelogCursor:
+        """Move the cursor to the newest change, so only later changes are returned."""
+        latest = self.client.get(CHANGELOG_ENDPOINT, params={**self.filters, "ordering": "-id"}, max_objects=1)
+        if latest:
+            self.cursor.accept(latest[0])
+        return self.cursor
+
+    def iter_changes(self, max_entries: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the changes after the cursor, oldest first, advancing it as each is yielded.
+
+        Args:
+            max_entries: Optional cap on the number of changes yielded; `truncated`
+                tells whether more were pending when it was reached
+        """
+        self.polls += 1
+        self.truncated = False
+        yielded = 0
+        changes = self.client.iter_objects(CHANGELOG_ENDPOINT, params=self._params(), page_size=self.page_size)
+        try:
+            for change in changes:
+                if max_entries is not None and yielded >= max_entries:
+                    self.truncated = True
+                    return
+                if self.cursor.accept(change):
+                    yield change
+                    yielded += 1
+        finally:
+            # Stop prefetching further pages
+            changes.close()
+
+    def fetch(self, max_entries: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the changes after the cursor and advance it."""
+        return list(self.iter_changes(max_entries))
+
+    def wait(self, timeout: float, max_entries: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Long-poll: return as soon as there are new changes, or [] after timeout seconds.
+
+        The wait between polls grows from poll_interval up to max_interval.
+        """
+        deadline = time.monotonic() + timeout
+        interval = self.poll_interval
+        while True:
+            changes = self.fetch(max_entries)
+            remaining = deadline - time.monotonic()
+            if changes or remaining <= 0:
+                return changes
+            time.sleep(min(interval, remaining))
+            interval = self._next_interval(interval)
+
+    def follow(self) -> Iterator[Dict[str, Any]]:
+        """Yield changes indefinitely, polling with backoff while the changelog is idle."""
+        interval = self.poll_interval
+        while True:
+            found = False
+            for change in self.iter_changes():
+                found = True
+                yield change
+            interval = self.poll_interval if found else self._next_interval(interval)
+            time.sleep(interval)
+
+
+class AsyncChangelogTail(_TailSettings):
+    """
+    Incremental changelog reader for an asyncio NetBox client.
+
+    Async counterpart of ChangelogTail.
+    """
+
+    async def seek_latest(self) -> ChangelogCursor:
+        """Move the cursor to the newest change, so only later changes are returned."""
+        latest = await self.client.get(CHANGELOG_ENDPOINT, params={**self.filters, "ordering": "-id"}, max_objects=1)
+        if latest:
+            self.cursor.accept(latest[0])
+        return self.cursor
+
+    async def iter_changes(self, max_entries: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the changes after the cursor, oldest first, advancing it as each is yielded.
+
+        Args:
+            max_entries: Optional cap on the number of changes yielded; `truncated`
+                tells whether more were pending when it was reached
+        """
+        self.polls += 1
+        self.truncated = False
+        yielded = 0
+        changes = self.client.iter_objects(CHANGELOG_ENDPOINT, params=self._params(), page_size=self.page_size)
+        try:
+            async for change in changes:
+                if max_entries is not None and yielded >= max_entries:
+                    self.truncated = True
+                    return
+                if self.cursor.accept(change):
+                    yield change
+                    yielded += 1
+        finally:
+            # Stop prefetching further pages
+            await changes.aclose()
+
+    async def fetch(self, max_entries: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the changes after the cursor and advance it."""
+        return [change async for change in self.iter_changes(max_entries)]
+
+    async def wait(self, timeout: float, max_entries: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Long-poll: return as soon as there are new changes, or [] after timeout seconds.
+
+        The wait between polls grows from poll_interval up to max_interval.
+        """
+        deadline = time.monotonic() + timeout
+        interval = self.poll_interval
+        while True:
+            changes = await self.fetch(max_entries)
+            remaining = deadline - time.monotonic()
+            if changes or remaining <= 0:
+                return changes
+            await asyncio.sleep(min(interval, remaining))
+            interval = self._next_interval(interval)
+
+    async def follow(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield changes indefinitely, polling with backoff while the changelog is idle."""
+        interval = self.poll_interval
+        while True:
+            found = False
+            async for change in self.iter_changes():
+                found = True
+                yield change
+            interval = self.poll_interval if found else self._next_interval(interval)
+            await asyncio.sleep(interval)
@@ -2,12 +2,183 @@
 """
 NetBox Client Library
 
-This module provides a base class for NetBox client implementations and a REST API implementation.
+This module provides a base class for NetBox client implementations and REST API
+implementations on top of requests (blocking) and httpx (asyncio).
 """
 
 import abc
-from typing import Any, Dict, List, Optional, Union
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from netbox_bulk import BulkOperationError, BulkPlan, BulkResult, PendingChunk
+from netbox_export import EXPORT_PAGE_SIZE, ExportResult, ExportWriter
+from netbox_metrics import Metrics, endpoint_label
+from netbox_scheduler import BATCH, RequestScheduler, priority
+from netbox_stream import PageParser
+
+# Bytes read from a streamed response body at a time
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+RequestKey = Tuple[str, Optional[int], Tuple[Tuple[str, str], ...], Optional[int], Optional[int]]
+
+
+def request_key(endpoint: str, id: Optional[int] = None, params: Optional[Dict[str, Any]] = None,
+                max_objects: Optional[int] = None, page_size: Optional[int] = None) -> RequestKey:
+    """
+    Build a hashable key identifying a get() call.
+    
+    Endpoint slashes, parameter order and the order of multi-value parameters
+    do not affect the key.
+    """
+    items = []
+    for key, value in (params or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            value = ",".join(sorted(str(v) for v in value))
+        elif isinstance(value, bool):
+            value = "true" if value else "false"
+        items.append((str(key), str(value)))
+    return (endpoint.strip('/'), id, tuple(sorted(items)), max_objects, page_size)
+
+
+@dataclass
+class TransportConfig:
+    """
+    HTTP transport settings shared by the REST clients.
+    
+    Retries use jittered exponential backoff and honour Retry-After. Status
+    retries are limited to idempotent methods; connection failures, where the
+    request never reached NetBox, are retried for any method. HTTP/2 is only
+    available to AsyncNetBoxRestClient and needs the 'h2' package
+    (pip install 'httpx[http2]').
+    """
+    
+    pool_connections: int = 10
+    pool_maxsize: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    retries: int = 3
+    backoff_factor: float = 0.5
+    backoff_max: float = 30.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 502, 503, 504})
+    retry_methods: FrozenSet[str] = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+    
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """The (connect, read) timeout pair used by requests."""
+        return (self.connect_timeout, self.read_timeout)
+    
+    def backoff(self, attempt: int) -> float:
+        """Jittered exponential delay before retry number attempt (starting at 1)."""
+        delay = min(self.backoff_max, self.backoff_factor * (2 ** (attempt - 1)))
+        return random.uniform(delay / 2, delay)
+    
+    def retry_after(self, headers: Any) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date."""
+        value = headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(self.backoff_max, max(0.0, seconds))
+    
+    def mount(self, session: requests.Session, retries: Optional[int] = None) -> None:
+        """Install a pooled, retrying adapter on a requests session (retries defaults to self.retries)."""
+        retry = Retry(
+            total=self.retries if retries is None else retries,
+            status_forcelist=self.retry_statuses,
+            allowed_methods=self.retry_methods,
+            backoff_factor=self.backoff_factor,
+            backoff_max=self.backoff_max,
+            backoff_jitter=self.backoff_factor,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize,
+                              max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+    
+    def async_client_options(self) -> Dict[str, Any]:
+        """Keyword arguments configuring an httpx.AsyncClient."""
+        return {
+            'http2': self.http2,
+            'timeout': httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            'limits': httpx.Limits(max_connections=self.pool_maxsize,
+                                   max_keepalive_connections=self.pool_maxsize,
+                                   keepalive_expiry=self.keepalive_expiry),
+        }
+
+
+class _InFlightCall:
+    """A GET request being performed by one thread on behalf of its duplicates."""
+    
+    __slots__ = ('done', 'result', 'error')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Page:
+    """
+    One list page: the envelope's keys and its objects.
+
+    header is None for a response that is not a paginated envelope. With
+    streamed decoding, items is a generator reading the still-open response
+    and closer releases it.
+    """
+    
+    __slots__ = ('header', 'items', 'closer')
+    
+    def __init__(self, header: Optional[Dict[str, Any]], items: Any, closer: Any = None):
+        self.header = header
+        self.items = items
+        self.closer = closer
+
+
+def _page_from_json(data: Any) -> _Page:
+    """Wrap a fully decoded response body as a page."""
+    if not isinstance(data, dict) or 'results' not in data:
+        # Not a paginated envelope (e.g. a custom or single-object endpoint)
+        return _Page(None, data if isinstance(data, list) else [data])
+    return _Page(data, data['results'])
+
+
+def _submit(pool: ThreadPoolExecutor, fn: Any, *args: Any) -> Any:
+    """Run fn on a pool thread in a copy of the caller's context, so the request priority carries over."""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def _close_page(future: Any) -> None:
+    """Release the response of a prefetched page that will not be read."""
+    try:
+        page = future.result()
+    except Exception:
+        return
+    if page.closer:
+        page.closer()
 
 
 class NetBoxClientBase(abc.ABC):
@@ -19,7 +190,8 @@ class NetBoxClientBase(abc.ABC):
     """
     
     @abc.abstractmethod
-    def get(self, endpoint: str, id: Optional[int] = None, params: Optional[Dict[str, Any]] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+    def get(self, endpoint: str, id: Optional[int] = None, params: Optional[Dict[str, Any]] = None,
+            max_objects: Optional[int] = None, page_size: Optional[int] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
         """
         Retrieve one or more objects from NetBox.
         
@@ -27,6 +199,8 @@ class NetBoxClientBase(abc.ABC):
             endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
             id: Optional ID to retrieve a specific object
             params: Optional query parameters for filtering
+            max_objects: Optional cap on the number of objects returned for list requests
+            page_size: Optional number of objects to request per page for list requests
             
         Returns:
             Either a single object dict or a list of object dicts
@@ -147,7 +321,10 @@ class NetBoxRestClient(NetBoxClientBase):
 # })
 # print(f"Created site: {new_site.get('name')} (ID: {new_site.get('id')})")
 
-    def __init__(self, url: str, token: str, verify_ssl: bool = True):
+    def __init__(self, url: str, token: str, verify_ssl: bool = True, max_workers: int = 4,
+                 coalesce: bool = True, bulk_chunk_size: int = 500,
+                 transport: Optional[TransportConfig] = None, metrics: Optional[Metrics] = None,
+                 stream_json: bool = False, scheduler: Optional[RequestScheduler] = None):
         """
         Initialize the REST API client.
         
@@ -155,17 +332,47 @@ class NetBoxRestClient(NetBoxClientBase):
             url: The base URL of the NetBox instance (e.g., 'https://netbox.example.com')
             token: API token for authentication
             verify_ssl: Whether to verify SSL certificates
+            max_workers: Number of pages or bulk chunks sent concurrently
+            coalesce: Whether concurrent identical get() calls share a single request
+            bulk_chunk_size: Default number of objects per bulk request
+            transport: Pool, timeout and retry settings (HTTP/2 is not supported by requests)
+            metrics: Registry recording each request and decode (a new Metrics by default)
+            stream_json: Whether list pages are decoded object by object as they arrive (see netbox_stream)
+            scheduler: Rate limit, concurrency caps and priority queuing applied to every request (see netbox_scheduler)
         """
         self.base_url = url.rstrip('/')
         self.api_url = f"{self.base_url}/api"
         self.token = token
         self.verify_ssl = verify_ssl
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.max_workers = max(1, max_workers)
+        self.coalesce = coalesce
+        self.coalesced_requests = 0
+        self.bulk_chunk_size = bulk_chunk_size
+        self._inflight: Dict[RequestKey, _InFlightCall] = {}
+        self._inflight_lock = threading.Lock()
+        self.transport = transport or TransportConfig()
+        self.metrics = metrics or Metrics()
+        self.stream_json = stream_json
+        self.scheduler = scheduler
+        if scheduler is not None and scheduler.metrics is None:
+            scheduler.metrics = self.metrics
+        headers = {
             'Authorization': f'Token {token}',
             'Content-Type': 'application/json',
             'Accept': 'application/json',
-        })
+        }
+        self.session = requests.Session()
+        self.transport.mount(self.session)
+        self.session.headers.update(headers)
+        # Bulk chunks are retried by their BulkPlan, so their session does not retry them again
+        self.bulk_session = requests.Session()
+        self.transport.mount(self.bulk_session, retries=0)
+        self.bulk_session.headers.update(headers)
+    
+    def close(self) -> None:
+        """Close the underlying connection pools."""
+        self.session.close()
+        self.bulk_session.close()
     
     def _build_url(self, endpoint: str, id: Optional[int] = None) -> str:
         """Build the full URL for an API request."""
@@ -174,30 +381,299 @@ class NetBoxRestClient(NetBoxClientBase):
             return f"{self.api_url}/{endpoint}/{id}/"
         return f"{self.api_url}/{endpoint}/"
     
-    def get(self, endpoint: str, id: Optional[int] = None, params: Optional[Dict[str, Any]] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+    def _request(self, method: str, url: str, retry: bool = True, **kwargs: Any) -> requests.Response:
+        """Send a request once the scheduler admits it, and record it in the metrics."""
+        endpoint = endpoint_label(self.api_url, url)
+        if self.scheduler is not None:
+            with self.scheduler.slot(endpoint):
+                return self._send(method, url, endpoint, retry, **kwargs)
+        return self._send(method, url, endpoint, retry, **kwargs)
+    
+    def _send(self, method: str, url: str, endpoint: str, retry: bool = True, **kwargs: Any) -> requests.Response:
+        """
+        Send the request behind _request().
+        
+        Retries happen inside urllib3, so the attempts it retried are recorded
+        from the response's retry history, by status only: their latency is
+        not observable here, unlike in AsyncNetBoxRestClient. Without retry the
+        request is sent once, on the non-retrying bulk session.
+        """
+        session = self.session if retry else self.bulk_session
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, verify=self.verify_ssl, timeout=self.transport.timeout,
+                                            **kwargs)
+        except requests.RequestException:
+            self.metrics.record_request(method, endpoint, None, time.perf_counter() - started)
+            raise
+        body = response.request.body
+        # urllib3 retried failed attempts before this response; count them with their status
+        retries = getattr(response.raw, 'retries', None)
+        for attempt in (retries.history if retries is not None else ()):
+            self.metrics.record_request(method, endpoint, attempt.status, None, len(body) if body else 0)
+        # A streamed body has not been read yet; its size is recorded as it is decoded
+        received = 0 if kwargs.get('stream') else len(response.content)
+        self.metrics.record_request(method, endpoint, response.status_code, time.perf_counter() - started,
+                                    len(body) if body else 0, received)
+        return response
+    
+    def _decode(self, response: requests.Response) -> Any:
+        """Decode a JSON response body, recording the time taken."""
+        started = time.perf_counter()
+        data = response.json()
+        self.metrics.record_decode(endpoint_label(self.api_url, response.url), time.perf_counter() - started)
+        return data
+    
+    def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Perform a GET request and return the decoded JSON body."""
+        response = self._request("GET", url, params=params)
+        response.raise_for_status()
+        return self._decode(response)
+    
+    def _get_page(self, url: str, params: Optional[Dict[str, Any]] = None) -> _Page:
+        """
+        Fetch a list page.
+        
+        With stream_json, only the envelope's leading keys are read here; the
+        objects are decoded from the open response as page.items is iterated.
+        """
+        if not self.stream_json:
+            return _page_from_json(self._get_json(url, params=params))
+        response = self._request("GET", url, params=params, stream=True)
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            response.close()
+            raise
+        endpoint = endpoint_label(self.api_url, url)
+        parser = PageParser()
+        chunks = response.iter_content(STREAM_CHUNK_SIZE)
+        ready: List[Dict[str, Any]] = []
+        received = 0
+        decoding = 0.0
+        try:
+            for chunk in chunks:
+                received += len(chunk)
+                started = time.perf_counter()
+                ready.extend(parser.feed(chunk))
+                decoding += time.perf_counter() - started
+                if parser.envelope is not None:
+                    break
+        except BaseException:
+            response.close()
+            raise
+        
+        def items() -> Iterator[Dict[str, Any]]:
+            nonlocal received, decoding
+            try:
+                yield from ready
+                del ready[:]
+                for chunk in chunks:
+                    received += len(chunk)
+                    started = time.perf_counter()
+                    objects = parser.feed(chunk)
+                    decoding += time.perf_counter() - started
+                    yield from objects
+                started = time.perf_counter()
+                objects = parser.close()
+                decoding += time.perf_counter() - started
+                yield from objects
+                if not parser.envelope:
+                    yield from parser.body if isinstance(parser.body, list) else [parser.body]
+            finally:
+                response.close()
+                self.metrics.record_decode(endpoint, decoding, received)
+        
+        iterator = items()
+        
+        def close() -> None:
+            iterator.close()
+            response.close()
+        
+        return _Page(parser.header if parser.envelope else None, iterator, close)
+    
+    def get(self, endpoint: str, id: Optional[int] = None, params: Optional[Dict[str, Any]] = None,
+            max_objects: Optional[int] = None, page_size: Optional[int] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
         """
         Retrieve one or more objects from NetBox via the REST API.
         
+        List requests follow NetBox pagination and return every matching object
+        unless max_objects, or a 'limit' in params, is given.
+        
         Args:
             endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
             id: Optional ID to retrieve a specific object
             params: Optional query parameters for filtering
+            max_objects: Optional cap on the number of objects returned for list requests
+            page_size: Optional number of objects to request per page for list requests
             
+        Concurrent identical calls are coalesced: one thread performs the
+        request and the others wait for and share its decoded result, which
+        must therefore be treated as read-only. coalesced_requests counts the
+        requests saved this way.
+        
         Returns:
             Either a single object dict or a list of object dicts
         
         Raises:
             requests.HTTPError: If the request fails
         """
-        url = self._build_url(endpoint, id)
-        response = self.session.get(url, params=params, verify=self.verify_ssl)
-        response.raise_for_status()
+        if not self.coalesce:
+            return self._fetch(endpoint, id, params, max_objects, page_size)
         
-        data = response.json()
-        if id is None and 'results' in data:
-            # Handle paginated results
-            return data['results']
-        return data
+        key = request_key(endpoint, id, params, max_objects, page_size)
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InFlightCall()
+            else:
+                self.coalesced_requests += 1
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = self._fetch(endpoint, id, params, max_objects, page_size)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            call.done.set()
+        return call.result
+    
+    def _fetch(self, endpoint: str, id: Optional[int], params: Optional[Dict[str, Any]],
+               max_objects: Optional[int], page_size: Optional[int]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Perform the request behind get()."""
+        if id is not None:
+            return self._get_json(self._build_url(endpoint, id), params=params)
+        return list(self.iter_objects(endpoint, params=params, max_objects=max_objects, page_size=page_size))
+    
+    def count(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Count the objects matching a query without fetching them.
+        
+        Requests a single brief object and reads 'count' from the paginated envelope.
+        
+        Args:
+            endpoint: The API endpoint (e.g., 'dcim/devices')
+            params: Optional query parameters for filtering
+            
+        Returns:
+            Number of matching objects
+        
+        Raises:
+            requests.HTTPError: If the request fails
+        """
+        data = self._get_json(self._build_url(endpoint), params={**(params or {}), 'limit': 1, 'brief': 'true'})
+        return data['count'] if isinstance(data, dict) and 'count' in data else len(data)
+    
+    def iter_objects(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                     max_objects: Optional[int] = None, page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every object of a list endpoint, page by page.
+        
+        The first page is fetched on its own; its 'count' is then used to fetch
+        the remaining pages by offset on a pool of max_workers threads. Pages
+        are yielded in order and at most max_workers pages are held in memory;
+        with stream_json, at most max_workers responses are held open and
+        objects are decoded one at a time as they are yielded.
+        Endpoints that do not return a paginated envelope are yielded as-is.
+        
+        Args:
+            endpoint: The API endpoint (e.g., 'dcim/interfaces')
+            params: Optional query parameters for filtering (a 'limit' acts as max_objects unless page_size is given)
+            max_objects: Optional cap on the number of objects yielded
+            page_size: Optional number of objects to request per page
+            
+        Yields:
+            Object dicts in the order returned by NetBox
+        
+        Raises:
+            requests.HTTPError: If a request fails
+        """
+        params = dict(params or {})
+        if not page_size and params.get('limit'):
+            # A 'limit' parameter caps the result, as it did when get() returned a single page
+            cap = int(params.pop('limit'))
+            max_objects = cap if max_objects is None else min(max_objects, cap)
+        if max_objects is not None and max_objects <= 0:
+            return
+        url = self._build_url(endpoint)
+        if page_size:
+            params['limit'] = page_size if max_objects is None else min(page_size, max_objects)
+        elif max_objects is not None:
+            params['limit'] = max_objects
+        
+        yielded = 0
+        
+        def drain(page: _Page) -> Iterator[Dict[str, Any]]:
+            nonlocal yielded
+            try:
+                for item in page.items:
+                    if max_objects is not None and yielded >= max_objects:
+                        return
+                    yield item
+                    yielded += 1
+            finally:
+                if page.closer:
+                    page.closer()
+        
+        first = self._get_page(url, params=params)
+        yield from drain(first)
+        header = first.header
+        limit = yielded
+        if header is None or not header.get('next') or not limit:
+            return
+        if max_objects is not None and yielded >= max_objects:
+            return
+        if header.get('count') is None:
+            # No total to plan offsets from; walk the 'next' links serially
+            next_url = header['next']
+            while next_url:
+                page = self._get_page(next_url)
+                yield from drain(page)
+                if max_objects is not None and yielded >= max_objects:
+                    return
+                next_url = (page.header or {}).get('next')
+            return
+        
+        # The server may clamp 'limit' to its MAX_PAGE_SIZE, so the length of a
+        # full first page is the real page size.
+        start = int(params.get('offset', 0) or 0)
+        total = header['count']
+        if max_objects is not None:
+            total = min(total, start + max_objects)
+        offsets = range(start + limit, total, limit)
+        
+        def fetch(offset: int) -> _Page:
+            return self._get_page(url, params=dict(params, limit=limit, offset=offset))
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = []
+            offset_iter = iter(offsets)
+            for offset in offset_iter:
+                pending.append(_submit(pool, fetch, offset))
+                if len(pending) >= self.max_workers:
+                    break
+            try:
+                while pending:
+                    page = pending.pop(0).result()
+                    next_offset = next(offset_iter, None)
+                    if next_offset is not None:
+                        pending.append(_submit(pool, fetch, next_offset))
+                    yield from drain(page)
+                    if max_objects is not None and yielded >= max_objects:
+                        return
+            finally:
+                for future in pending:
+                    if not future.cancel():
+                        _close_page(future)
     
     def create(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -214,9 +690,9 @@ class NetBoxRestClient(NetBoxClientBase):
             requests.HTTPError: If the request fails
         """
         url = self._build_url(endpoint)
-        response = self.session.post(url, json=data, verify=self.verify_ssl)
+        response = self._request("POST", url, json=data)
         response.raise_for_status()
-        return response.json()
+        return self._decode(response)
     
     def update(self, endpoint: str, id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -234,9 +710,9 @@ class NetBoxRestClient(NetBoxClientBase):
             requests.HTTPError: If the request fails
         """
         url = self._build_url(endpoint, id)
-        response = self.session.patch(url, json=data, verify=self.verify_ssl)
+        response = self._request("PATCH", url, json=data)
         response.raise_for_status()
-        return response.json()
+        return self._decode(response)
     
     def delete(self, endpoint: str, id: int) -> bool:
         """
@@ -253,14 +729,111 @@ class NetBoxRestClient(NetBoxClientBase):
             requests.HTTPError: If the request fails
         """
         url = self._build_url(endpoint, id)
-        response = self.session.delete(url, verify=self.verify_ssl)
+        response = self._request("DELETE", url)
         response.raise_for_status()
         return response.status_code == 204
     
+    def bulk_operation(self, operation: str, endpoint: str, data: List[Dict[str, Any]],
+                       chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                       adaptive: bool = False, **options: Any) -> BulkResult:
+        """
+        Run a bulk create, update or delete in chunks and report each chunk's outcome.
+        
+        Chunks are sent on up to max_workers threads. Transient failures are
+        retried with backoff and chunks rejected as invalid are split to isolate bad rows;
+        see netbox_bulk.BulkPlan for the policy and the accepted options.
+        
+        Args:
+            operation: One of 'create', 'update' or 'delete'
+            endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
+            data: Objects to send (for 'delete', dicts holding the IDs)
+            chunk_size: Objects per request (defaults to bulk_chunk_size)
+            max_workers: Number of chunks in flight (defaults to max_workers)
+            adaptive: Whether to resize chunks based on observed latency
+            options: Further BulkPlan options (target_latency, max_chunk_size, retries, backoff, split_on_error)
+            
+        Returns:
+            A BulkResult listing succeeded, failed and retried chunks
+        """
+        plan = BulkPlan(operation, endpoint, list(data), chunk_size or self.bulk_chunk_size,
+                        adaptive=adaptive, **options)
+        url = f"{self._build_url(endpoint)}bulk/"
+        workers = max_workers or self.max_workers
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            while plan.has_work() or pending:
+                while plan.has_work() and len(pending) < workers:
+                    chunk = plan.next_chunk()
+                    pending[pool.submit(self._send_bulk_chunk, plan.method, url, chunk)] = chunk
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    try:
+                        plan.succeeded(chunk, future.result())
+                    except requests.HTTPError as e:
+                        status = e.response.status_code if e.response is not None else None
+                        detail = e.response.text[:500] if e.response is not None else ""
+                        plan.failed(chunk, status, f"{e} {detail}".strip())
+                    except requests.ConnectTimeout as e:
+                        plan.failed(chunk, None, str(e), sent=False)
+                    except requests.RequestException as e:
+                        plan.failed(chunk, None, str(e))
+        return plan.finish()
+    
+    def _send_bulk_chunk(self, method: str, url: str, chunk: PendingChunk) -> Any:
+        """Send one bulk chunk as batch work, after its backoff delay if it is a retry."""
+        if chunk.delay:
+            time.sleep(chunk.delay)
+        with priority(BATCH):
+            response = self._request(method, url, retry=False, json=chunk.items)
+        response.raise_for_status()
+        return self._decode(response) if response.content else None
+    
+    def export(self, endpoint: str, path: str, format: str = "ndjson", params: Optional[Dict[str, Any]] = None,
+               fields: Optional[List[str]] = None, where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+               max_objects: Optional[int] = None, page_size: int = EXPORT_PAGE_SIZE) -> ExportResult:
+        """
+        Stream every object of a list endpoint into a local file, as batch work.
+        
+        Pages are written as they arrive (see netbox_export.ExportWriter), so
+        memory stays bounded however many objects the endpoint holds.
+        
+        Args:
+            endpoint: The API endpoint (e.g., 'dcim/interfaces')
+            path: File to write (replaced once the export completes)
+            format: 'ndjson', or 'parquet' / 'arrow' when pyarrow is installed
+            params: Optional query parameters for filtering
+            fields: Top-level fields to write (requested with ?fields= unless params sets it)
+            where: Optional predicate, applied before the fields are narrowed; objects failing it are skipped
+            max_objects: Optional cap on the number of objects read
+            page_size: Number of objects to request per page
+            
+        Returns:
+            An ExportResult with the path, row count and schema summary
+        
+        Raises:
+            requests.HTTPError: If a request fails (no file is left behind)
+        """
+        if fields and not (params or {}).get("fields"):
+            params = {**(params or {}), "fields": ",".join(fields)}
+        writer = ExportWriter(path, format, endpoint, fields)
+        try:
+            with priority(BATCH):
+                for obj in self.iter_objects(endpoint, params=params, max_objects=max_objects, page_size=page_size):
+                    if (where is None or where(obj)) and writer.add(obj):
+                        writer.flush()
+            return writer.close()
+        except BaseException:
+            writer.abort()
+            raise
+    
     def bulk_create(self, endpoint: str, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Create multiple objects in NetBox via the REST API.
         
+        The objects are sent in chunks of bulk_chunk_size; use bulk_operation()
+        for per-chunk results instead of an exception.
+        
         Args:
             endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
             data: List of object data to create
@@ -269,17 +842,20 @@ class NetBoxRestClient(NetBoxClientBase):
             List of created objects as dicts
             
         Raises:
-            requests.HTTPError: If the request fails
+            BulkOperationError: If any chunk failed (a requests.HTTPError carrying the BulkResult)
         """
-        url = f"{self._build_url(endpoint)}bulk/"
-        response = self.session.post(url, json=data, verify=self.verify_ssl)
-        response.raise_for_status()
-        return response.json()
+        result = self.bulk_operation("create", endpoint, data)
+        if not result.ok:
+            raise BulkOperationError(result)
+        return result.results
     
     def bulk_update(self, endpoint: str, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Update multiple objects in NetBox via the REST API.
         
+        The objects are sent in chunks of bulk_chunk_size; use bulk_operation()
+        for per-chunk results instead of an exception.
+        
         Args:
             endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
             data: List of object data to update (must include ID)
@@ -288,33 +864,593 @@ class NetBoxRestClient(NetBoxClientBase):
             List of updated objects as dicts
             
         Raises:
-            requests.HTTPError: If the request fails
+            BulkOperationError: If any chunk failed (a requests.HTTPError carrying the BulkResult)
         """
-        url = f"{self._build_url(endpoint)}bulk/"
-        response = self.session.patch(url, json=data, verify=self.verify_ssl)
-        response.raise_for_status()
-        return response.json()
+        result = self.bulk_operation("update", endpoint, data)
+        if not result.ok:
+            raise BulkOperationError(result)
+        return result.results
     
     def bulk_delete(self, endpoint: str, ids: List[int]) -> bool:
         """
         Delete multiple objects from NetBox via the REST API.
         
+        The IDs are sent in chunks of bulk_chunk_size; use bulk_operation()
+        for per-chunk results.
+        
         Args:
             endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
             ids: List of IDs to delete
             
+        Returns:
+            True if every chunk was deleted, False if any chunk failed
+        """
+        return self.bulk_operation("delete", endpoint, [{"id": id} for id in ids]).failed == 0
+
+
+class AsyncNetBoxRestClient(NetBoxClientBase):
+    """
+    NetBox client implementation using the REST API on an asyncio HTTP client.
+    
+    Implements the same contract as NetBoxRestClient with coroutine methods,
+    so that concurrent callers overlap their network waits. All requests share
+    one httpx connection pool.
+    """
+    
+    def __init__(self, url: str, token: str, verify_ssl: bool = True, max_workers: int = 4,
+                 coalesce: bool = True, bulk_chunk_size: int = 500,
+                 transport: Optional[TransportConfig] = None, metrics: Optional[Metrics] = None,
+                 stream_json: bool = False, scheduler: Optional[RequestScheduler] = None):
+        """
+        Initialize the async REST API client.
+        
+        Args:
+            url: The base URL of the NetBox instance (e.g., 'https://netbox.example.com')
+            token: API token for authentication
+            verify_ssl: Whether to verify SSL certificates
+            max_workers: Number of pages or bulk chunks sent concurrently
+            coalesce: Whether concurrent identical get() calls share a single request
+            bulk_chunk_size: Default number of objects per bulk request
+            transport: Pool, keep-alive, HTTP/2, timeout and retry settings
+            metrics: Registry recording each request and decode (a new Metrics by default)
+            stream_json: Whether list pages are decoded object by object as they arrive (see netbox_stream)
+            scheduler: Rate limit, concurrency caps and priority queuing applied to every request (see netbox_scheduler)
+        """
+        self.base_url = url.rstrip('/')
+        self.api_url = f"{self.base_url}/api"
+        self.token = token
+        self.verify_ssl = verify_ssl
+        self.max_workers = max(1, max_workers)
+        self.coalesce = coalesce
+        self.coalesced_requests = 0
+        self.bulk_chunk_size = bulk_chunk_size
+        self._inflight: Dict[RequestKey, asyncio.Future] = {}
+        self.transport = transport or TransportConfig()
+        self.metrics = metrics or Metrics()
+        self.stream_json = stream_json
+        self.scheduler = scheduler
+        if scheduler is not None and scheduler.metrics is None:
+            scheduler.metrics = self.metrics
+        self.client = httpx.AsyncClient(
+            headers={
+                'Authorization': f'Token {token}',
+                'Content-Type': 'application/json',
+                'Accept': 'application/json',
+            },
+            verify=verify_ssl,
+            **self.transport.async_client_options(),
+        )
+    
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self.client.aclose()
+    
+    def _build_url(self, endpoint: str, id: Optional[int] = None) -> str:
+        """Build the full URL for an API request."""
+        endpoint = endpoint.strip('/')
+        if id is not None:
+            return f"{self.api_url}/{endpoint}/{id}/"
+        return f"{self.api_url}/{endpoint}/"
+    
+    async def _request(self, method: str, url: str, retry: bool = True, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request, retrying transient failures according to the transport settings.
+        
+        Without retry the request is sent once; bulk chunks are retried by their BulkPlan.
+        """
+        if not retry:
+            return await self._send(method, url, **kwargs)
+        transport = self.transport
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = await self._send(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if attempt > transport.retries:
+                    raise
+                delay = transport.backoff(attempt)
+            except (httpx.ReadTimeout, httpx.RemoteProtocolError):
+                if method not in transport.retry_methods or attempt > transport.retries:
+                    raise
+                delay = transport.backoff(attempt)
+            else:
+                if (response.status_code not in transport.retry_statuses
+                        or method not in transport.retry_methods or attempt > transport.retries):
+                    return response
+                retry_after = transport.retry_after(response.headers)
+                delay = retry_after if retry_after is not None else transport.backoff(attempt)
+                await response.aclose()
+            await asyncio.sleep(delay)
+    
+    async def _send(self, method: str, url: str, stream: bool = False, **kwargs: Any) -> httpx.Response:
+        """Send one attempt of a request once the scheduler admits it, and record it in the metrics."""
+        endpoint = endpoint_label(self.api_url, url)
+        if self.scheduler is not None:
+            async with self.scheduler.aslot(endpoint):
+                return await self._send_now(method, url, endpoint, stream, **kwargs)
+        return await self._send_now(method, url, endpoint, stream, **kwargs)
+    
+    async def _send_now(self, method: str, url: str, endpoint: str, stream: bool, **kwargs: Any) -> httpx.Response:
+        """Send the attempt behind _send()."""
+        started = time.perf_counter()
+        request = self.client.build_request(method, url, **kwargs)
+        try:
+            response = await self.client.send(request, stream=stream)
+        except httpx.HTTPError:
+            self.metrics.record_request(method, endpoint, None, time.perf_counter() - started)
+            raise
+        # A streamed body has not been read yet; its size is recorded as it is decoded
+        received = 0 if stream else len(response.content)
+        self.metrics.record_request(method, endpoint, response.status_code, time.perf_counter() - started,
+                                    len(request.content), received)
+        return response
+    
+    def _decode(self, response: httpx.Response) -> Any:
+        """Decode a JSON response body, recording the time taken."""
+        started = time.perf_counter()
+        data = response.json()
+        self.metrics.record_decode(endpoint_label(self.api_url, str(response.url)), time.perf_counter() - started)
+        return data
+    
+    async def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Perform a GET request and return the decoded JSON body."""
+        response = await self._request("GET", url, params=params)
+        response.raise_for_status()
+        return self._decode(response)
+    
+    async def _get_page(self, url: str, params: Optional[Dict[str, Any]] = None) -> _Page:
+        """
+        Fetch a list page.
+        
+        With stream_json, only the envelope's leading keys are read here; the
+        objects are decoded from the open response as page.items is iterated.
+        """
+        if not self.stream_json:
+            return _page_from_json(await self._get_json(url, params=params))
+        response = await self._request("GET", url, params=params, stream=True)
+        if response.is_error:
+            await response.aread()
+            await response.aclose()
+            response.raise_for_status()
+        endpoint = endpoint_label(self.api_url, url)
+        parser = PageParser()
+        chunks = response.aiter_bytes(STREAM_CHUNK_SIZE)
+        ready: List[Dict[str, Any]] = []
+        received = 0
+        decoding = 0.0
+        try:
+            async for chunk in chunks:
+                received += len(chunk)
+                started = time.perf_counter()
+                ready.extend(parser.feed(chunk))
+                decoding += time.perf_counter() - started
+                if parser.envelope is not None:
+                    break
+        except BaseException:
+            await response.aclose()
+            raise
+        
+        async def items() -> AsyncIterator[Dict[str, Any]]:
+            nonlocal received, decoding
+            try:
+                for item in ready:
+                    yield item
+                del ready[:]
+                async for chunk in chunks:
+                    received += len(chunk)
+                    started = time.perf_counter()
+                    objects = parser.feed(chunk)
+                    decoding += time.perf_counter() - started
+                    for item in objects:
+                        yield item
+                started = time.perf_counter()
+                objects = parser.close()
+                decoding += time.perf_counter() - started
+                for item in objects:
+                    yield item
+                if not parser.envelope:
+                    for item in parser.body if isinstance(parser.body, list) else [parser.body]:
+                        yield item
+            finally:
+                await response.aclose()
+                self.metrics.record_decode(endpoint, decoding, received)
+        
+        iterator = items()
+        
+        async def close() -> None:
+            await iterator.aclose()
+            await response.aclose()
+        
+        return _Page(parser.header if parser.envelope else None, iterator, close)
+    
+    async def get(self, endpoint: str, id: Optional[int] = None, params: Optional[Dict[str, Any]] = None,
+                  max_objects: Optional[int] = None, page_size: Optional[int] = None) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Retrieve one or more objects from NetBox via the REST API.
+        
+        Args:
+            endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
+            id: Optional ID to retrieve a specific object
+            params: Optional query parameters for filtering
+            max_objects: Optional cap on the number of objects returned for list requests
+            page_size: Optional number of objects to request per page for list requests
+            
+        Concurrent identical calls are coalesced onto one task whose decoded
+        result they share, so it must be treated as read-only. Cancelling one
+        waiter does not cancel the shared request.
+        
+        Returns:
+            Either a single object dict or a list of object dicts
+        
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+        """
+        if not self.coalesce:
+            return await self._fetch(endpoint, id, params, max_objects, page_size)
+        
+        key = request_key(endpoint, id, params, max_objects, page_size)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(endpoint, id, params, max_objects, page_size))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._finish_inflight(key, t))
+        else:
+            self.coalesced_requests += 1
+        return await asyncio.shield(task)
+    
+    def _finish_inflight(self, key: RequestKey, task: asyncio.Future) -> None:
+        """Forget a completed shared request."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every waiter was cancelled
+            task.exception()
+    
+    async def _fetch(self, endpoint: str, id: Optional[int], params: Optional[Dict[str, Any]],
+                     max_objects: Optional[int], page_size: Optional[int]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Perform the request behind get()."""
+        if id is not None:
+            return await self._get_json(self._build_url(endpoint, id), params=params)
+        return [item async for item in self.iter_objects(endpoint, params=params, max_objects=max_objects, page_size=page_size)]
+    
+    async def count(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Count the objects matching a query without fetching them.
+        
+        Requests a single brief object and reads 'count' from the paginated envelope.
+        
+        Args:
+            endpoint: The API endpoint (e.g., 'dcim/devices')
+            params: Optional query parameters for filtering
+            
+        Returns:
+            Number of matching objects
+        
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+        """
+        data = await self._get_json(self._build_url(endpoint), params={**(params or {}), 'limit': 1, 'brief': 'true'})
+        return data['count'] if isinstance(data, dict) and 'count' in data else len(data)
+    
+    async def iter_objects(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                           max_objects: Optional[int] = None, page_size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over every object of a list endpoint, page by page.
+        
+        Async counterpart of NetBoxRestClient.iter_objects: after the first page,
+        up to max_workers offset pages are in flight at once and pages are
+        yielded in order.
+        
+        Args:
+            endpoint: The API endpoint (e.g., 'dcim/interfaces')
+            params: Optional query parameters for filtering (a 'limit' acts as max_objects unless page_size is given)
+            max_objects: Optional cap on the number of objects yielded
+            page_size: Optional number of objects to request per page
+            
+        Yields:
+            Object dicts in the order returned by NetBox
+        
+        Raises:
+            httpx.HTTPStatusError: If a request fails
+        """
+        params = dict(params or {})
+        if not page_size and params.get('limit'):
+            # A 'limit' parameter caps the result, as it did when get() returned a single page
+            cap = int(params.pop('limit'))
+            max_objects = cap if max_objects is None else min(max_objects, cap)
+        if max_objects is not None and max_objects <= 0:
+            return
+        url = self._build_url(endpoint)
+        if page_size:
+            params['limit'] = page_size if max_objects is None else min(page_size, max_objects)
+        elif max_objects is not None:
+            params['limit'] = max_objects
+        
+        yielded = 0
+        
+        async def drain(page: _Page) -> AsyncIterator[Dict[str, Any]]:
+            nonlocal yielded
+            try:
+                if isinstance(page.items, list):
+                    for item in page.items:
+                        if max_objects is not None and yielded >= max_objects:
+                            return
+                        yield item
+                        yielded += 1
+                else:
+                    async for item in page.items:
+                        if max_objects is not None and yielded >= max_objects:
+                            return
+                        yield item
+                        yielded += 1
+            finally:
+                if page.closer:
+                    await page.closer()
+        
+        first = await self._get_page(url, params=params)
+        async for item in drain(first):
+            yield item
+        header = first.header
+        limit = yielded
+        if header is None or not header.get('next') or not limit:
+            return
+        if max_objects is not None and yielded >= max_objects:
+            return
+        if header.get('count') is None:
+            # No total to plan offsets from; walk the 'next' links serially
+            next_url = header['next']
+            while next_url:
+                page = await self._get_page(next_url)
+                async for item in drain(page):
+                    yield item
+                if max_objects is not None and yielded >= max_objects:
+                    return
+                next_url = (page.header or {}).get('next')
+            return
+        
+        # The server may clamp 'limit' to its MAX_PAGE_SIZE, so the length of a
+        # full first page is the real page size.
+        start = int(params.get('offset', 0) or 0)
+        total = header['count']
+        if max_objects is not None:
+            total = min(total, start + max_objects)
+        offset_iter = iter(range(start + limit, total, limit))
+        
+        async def fetch(offset: int) -> _Page:
+            return await self._get_page(url, params=dict(params, limit=limit, offset=offset))
+        
+        pending = [asyncio.ensure_future(fetch(offset)) for _, offset in zip(range(self.max_workers), offset_iter)]
+        try:
+            while pending:
+                page = await pending.pop(0)
+                next_offset = next(offset_iter, None)
+                if next_offset is not None:
+                    pending.append(asyncio.ensure_future(fetch(next_offset)))
+                async for item in drain(page):
+                    yield item
+                if max_objects is not None and yielded >= max_objects:
+                    return
+        finally:
+            for task in pending:
+                # A finished task cannot be cancelled, but may have ended cancelled
+                if task.cancel() or task.cancelled():
+                    continue
+                if task.exception() is None and task.result().closer:
+                    await task.result().closer()
+    
+    async def create(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create a new object in NetBox via the REST API.
+        
+        Args:
+            endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
+            data: Object data to create
+            
+        Returns:
+            The created object as a dict
+            
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+        """
+        response = await self._request("POST", self._build_url(endpoint), json=data)
+        response.raise_for_status()
+        return self._decode(response)
+    
+    async def update(self, endpoint: str, id: int, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Update an existing object in NetBox via the REST API.
+        
+        Args:
+            endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
+            id: ID of the object to update
+            data: Object data to update
+            
+        Returns:
+            The updated object as a dict
+            
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+        """
+        response = await self._request("PATCH", self._build_url(endpoint, id), json=data)
+        response.raise_for_status()
+        return self._decode(response)
+    
+    async def delete(self, endpoint: str, id: int) -> bool:
+        """
+        Delete an object from NetBox via the REST API.
+        
+        Args:
+            endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
+            id: ID of the object to delete
+            
         Returns:
             True if deletion was successful, False otherwise
             
         Raises:
-            requests.HTTPError: If the request fails
+            httpx.HTTPStatusError: If the request fails
         """
-        url = f"{self._build_url(endpoint)}bulk/"
-        data = [{"id": id} for id in ids]
-        response = self.session.delete(url, json=data, verify=self.verify_ssl)
+        response = await self._request("DELETE", self._build_url(endpoint, id))
         response.raise_for_status()
         return response.status_code == 204
     
+    async def bulk_operation(self, operation: str, endpoint: str, data: List[Dict[str, Any]],
+                             chunk_size: Optional[int] = None, max_workers: Optional[int] = None,
+                             adaptive: bool = False, **options: Any) -> BulkResult:
+        """
+        Run a bulk create, update or delete in chunks and report each chunk's outcome.
+        
+        Async counterpart of NetBoxRestClient.bulk_operation: up to max_workers
+        chunks are in flight at once.
+        
+        Args:
+            operation: One of 'create', 'update' or 'delete'
+            endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
+            data: Objects to send (for 'delete', dicts holding the IDs)
+            chunk_size: Objects per request (defaults to bulk_chunk_size)
+            max_workers: Number of chunks in flight (defaults to max_workers)
+            adaptive: Whether to resize chunks based on observed latency
+            options: Further BulkPlan options (target_latency, max_chunk_size, retries, backoff, split_on_error)
+            
+        Returns:
+            A BulkResult listing succeeded, failed and retried chunks
+        """
+        plan = BulkPlan(operation, endpoint, list(data), chunk_size or self.bulk_chunk_size,
+                        adaptive=adaptive, **options)
+        url = f"{self._build_url(endpoint)}bulk/"
+        workers = max_workers or self.max_workers
+        pending = {}
+        while plan.has_work() or pending:
+            while plan.has_work() and len(pending) < workers:
+                chunk = plan.next_chunk()
+                pending[asyncio.ensure_future(self._send_bulk_chunk(plan.method, url, chunk))] = chunk
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                chunk = pending.pop(task)
+                try:
+                    plan.succeeded(chunk, task.result())
+                except httpx.HTTPStatusError as e:
+                    plan.failed(chunk, e.response.status_code, f"{e} {e.response.text[:500]}".strip())
+                except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                    plan.failed(chunk, None, str(e), sent=False)
+                except httpx.TransportError as e:
+                    plan.failed(chunk, None, str(e))
+        return plan.finish()
+    
+    async def _send_bulk_chunk(self, method: str, url: str, chunk: PendingChunk) -> Any:
+        """Send one bulk chunk as batch work, after its backoff delay if it is a retry."""
+        if chunk.delay:
+            await asyncio.sleep(chunk.delay)
+        with priority(BATCH):
+            response = await self._request(method, url, retry=False, json=chunk.items)
+        response.raise_for_status()
+        return self._decode(response) if response.content else None
+    
+    async def export(self, endpoint: str, path: str, format: str = "ndjson", params: Optional[Dict[str, Any]] = None,
+                     fields: Optional[List[str]] = None, where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                     max_objects: Optional[int] = None, page_size: int = EXPORT_PAGE_SIZE) -> ExportResult:
+        """
+        Stream every object of a list endpoint into a local file, as batch work.
+        
+        Async counterpart of NetBoxRestClient.export; batches are encoded and
+        written on a worker thread so the event loop keeps serving other calls.
+        """
+        if fields and not (params or {}).get("fields"):
+            params = {**(params or {}), "fields": ",".join(fields)}
+        writer = ExportWriter(path, format, endpoint, fields)
+        objects = self.iter_objects(endpoint, params=params, max_objects=max_objects, page_size=page_size)
+        try:
+            with priority(BATCH):
+                async for obj in objects:
+                    if (where is None or where(obj)) and writer.add(obj):
+                        await asyncio.to_thread(writer.flush)
+            return await asyncio.to_thread(writer.close)
+        except BaseException:
+            writer.abort()
+            raise
+        finally:
+            await objects.aclose()
+    
+    async def bulk_create(self, endpoint: str, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create multiple objects in NetBox via the REST API.
+        
+        The objects are sent in chunks of bulk_chunk_size; use bulk_operation()
+        for per-chunk results instead of an exception.
+        
+        Args:
+            endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
+            data: List of object data to create
+            
+        Returns:
+            List of created objects as dicts
+            
+        Raises:
+            BulkOperationError: If any chunk failed
+        """
+        result = await self.bulk_operation("create", endpoint, data)
+        if not result.ok:
+            raise BulkOperationError(result)
+        return result.results
+    
+    async def bulk_update(self, endpoint: str, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Update multiple objects in NetBox via the REST API.
+        
+        The objects are sent in chunks of bulk_chunk_size; use bulk_operation()
+        for per-chunk results instead of an exception.
+        
+        Args:
+            endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
+            data: List of object data to update (must include ID)
+            
+        Returns:
+            List of updated objects as dicts
+            
+        Raises:
+            BulkOperationError: If any chunk failed
+        """
+        result = await self.bulk_operation("update", endpoint, data)
+        if not result.ok:
+            raise BulkOperationError(result)
+        return result.results
+    
+    async def bulk_delete(self, endpoint: str, ids: List[int]) -> bool:
+        """
+        Delete multiple objects from NetBox via the REST API.
+        
+        The IDs are sent in chunks of bulk_chunk_size; use bulk_operation()
+        for per-chunk results.
+        
+        Args:
+            endpoint: The API endpoint (e.g., 'dcim/sites', 'ipam/prefixes')
+            ids: List of IDs to delete
+            
+        Returns:
+            True if every chunk was deleted, False if any chunk failed
+        """
+        return (await self.bulk_operation("delete", endpoint, [{"id": id} for id in ids])).failed == 0
+    
 
 if __name__ == "__main__":
     # Initialize the client
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+NetBox Documentation Search
+
+This module answers free-text questions from the NetBox documentation bundled
+in data/ (the user guide, the REST API reference and the knowledge base) with
+a BM25-ranked inverted index, so agents can look up filter names and API
+shapes instead of guessing them against a live NetBox.
+
+The documents are split into sections (one per Markdown heading, API endpoint
+or knowledge base entry) and indexed once into a single file:
+
+    magic | header length | JSON header | uint32 postings | section text
+
+The header holds the vocabulary (term -> postings offset, document frequency)
+and the section table; the postings and the section text are read through
+mmap, so a query only touches the postings of its terms and the text of the
+sections it returns. The index is rebuilt when a source file changes.
+"""
+
+import array
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from netbox_schema import DEFAULT_CACHE_DIR, singularize
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Indexed files and how each is split into sections
+DEFAULT_SOURCES = {
+    "llms-full.txt": "markdown",
+    "llms-api-full.md": "api",
+    "kb.json": "kb",
+}
+
+DEFAULT_INDEX_PATH = os.path.join(DEFAULT_CACHE_DIR, "docs.index")
+
+MAGIC = b"NBDOCS1\n"
+INDEX_FORMAT = 1
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Weight of a title term relative to a body term
+TITLE_WEIGHT = 3
+
+# Characters of section text returned per result
+SNIPPET_CHARS = 600
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can for from how i if in into is it its no not of on or that the their then there "
+    "these this to was what when where which will with".split()
+)
+
+TOKEN_RE = re.compile(r"[a-z0-9_]+")
+API_ENDPOINT_RE = re.compile(r"^- \*\*([A-Z]+ /\S+)\*\*")
+
+
+def _stem(token: str) -> str:
+    return singularize(token) if len(token) > 3 and not token.isdigit() else token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into index terms.
+
+    Identifiers keep their full form and also contribute their parts
+    ('site_id' -> 'site_id', 'site', 'id'), so both spellings match.
+    """
+    terms = []
+    for token in TOKEN_RE.findall(text.lower()):
+        token = token.strip("_")
+        if not token or token in STOPWORDS:
+            continue
+        terms.append(_stem(token))
+        if "_" in token:
+            terms.extend(_stem(part) for part in token.split("_") if part and part not in STOPWORDS)
+    return terms
+
+
+def split_markdown(text: str) -> Iterator[Tuple[str, str]]:
+    """Yield (heading path, body) per heading, ignoring '#' lines inside code fences."""
+    path: List[Tuple[int, str]] = []
+    lines: List[str] = []
+    in_code = False
+
+    def section() -> Tuple[str, str]:
+        return " > ".join(title for _, title in path), "\n".join(lines).strip()
+
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        elif not in_code and line.startswith("#"):
+            level = len(line) - len(line.lstrip("#"))
+            title = line[level:].strip()
+            if title:
+                if lines:
+                    yield section()
+                while path and path[-1][0] >= level:
+                    path.pop()
+                path.append((level, title))
+                lines = []
+                continue
+        lines.append(line)
+    if lines:
+        yield section()
+
+
+def split_api(text: str) -> Iterator[Tuple[str, str]]:
+    """Yield ('GET /api/dcim/devices/', body) per endpoint of the API reference."""
+    title = None
+    lines: List[str] = []
+    for line in text.splitlines():
+        match = API_ENDPOINT_RE.match(line)
+        if match:
+            if title and lines:
+                yield title, "\n".join(lines).strip()
+            title, lines = match.group(1), []
+        elif title:
+            lines.append(line)
+    if title and lines:
+        yield title, "\n".join(lines).strip()
+
+
+def split_kb(text: str) -> Iterator[Tuple[str, str]]:
+    """Yield (question, answer) per knowledge base entry."""
+    for entry in json.loads(text):
+        yield entry.get("question", ""), entry.get("answer", "")
+
+
+SPLITTERS = {"markdown": split_markdown, "api": split_api, "kb": split_kb}
+
+
+def _source_stamps(data_dir: str, sources: Dict[str, str]) -> Dict[str, List[int]]:
+    stamps = {}
+    for name in sources:
+        st = os.stat(os.path.join(data_dir, name))
+        stamps[name] = [st.st_size, st.st_mtime_ns]
+    return stamps
+
+
+def build_index(path: str, data_dir: str = DATA_DIR, sources: Optional[Dict[str, str]] = None) -> None:
+    """
+    Index the documentation sources into a file.
+
+    Args:
+        path: Index file to write (replaced atomically)
+        data_dir: Directory holding the sources
+        sources: File name -> splitter ('markdown', 'api' or 'kb'); DEFAULT_SOURCES by default
+    """
+    sources = sources or DEFAULT_SOURCES
+    sections: List[List[Any]] = []
+    postings: Dict[str, List[int]] = {}
+    text_parts: List[bytes] = []
+    text_offset = 0
+    total_length = 0
+    for name, kind in sources.items():
+        with open(os.path.join(data_dir, name), encoding="utf-8") as f:
+            content = f.read()
+        for title, body in SPLITTERS[kind](content):
+            if not body:
+                continue
+            counts = Counter(tokenize(body))
+            for term in tokenize(title):
+                counts[term] += TITLE_WEIGHT
+            length = sum(counts.values())
+            if not length:
+                continue
+            section_id = len(sections)
+            for term, tf in counts.items():
+                postings.setdefault(term, []).extend((section_id, tf))
+            encoded = body.encode("utf-8")
+            sections.append([name, title, text_offset, len(encoded), length])
+            text_parts.append(encoded)
+            text_offset += len(encoded)
+            total_length += length
+
+    terms: Dict[str, List[int]] = {}
+    flat = array.array("I")
+    for term in sorted(postings):
+        entries = postings[term]
+        terms[term] = [len(flat), len(entries) // 2]
+        flat.extend(entries)
+    header = json.dumps({
+        "format": INDEX_FORMAT,
+        "built_at": time.time(),
+        "sources": _source_stamps(data_dir, sources),
+        "sections": sections,
+        "avgdl": total_length / len(sections) if sections else 0.0,
+        "terms": terms,
+    }, separators=(",", ":")).encode("utf-8")
+    header += b" " * (-len(header) % 4)  # Keep the postings 4-byte aligned
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        if sys.byteorder != "little":
+            flat.byteswap()
+        f.write(flat.tobytes())
+        for part in text_parts:
+            f.write(part)
+    os.replace(f"{path}.tmp", path)
+
+
+class DocsIndex:
+    """Read-only view of an index file built by build_index()."""
+
+    def __init__(self, path: str):
+        """
+        Open an index file.
+
+        Raises:
+            ValueError: If the file is not an index of the current format
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a docs index")
+        start = len(MAGIC) + 8
+        (header_len,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header = json.loads(self._mmap[start:start + header_len])
+        if header.get("format") != INDEX_FORMAT:
+            self.close()
+            raise ValueError(f"{path} has an unsupported format")
+        self.sources: Dict[str, List[int]] = header["sources"]
+        self.sections: List[List[Any]] = header["sections"]
+        self.terms: Dict[str, List[int]] = header["terms"]
+        self.avgdl: float = header["avgdl"]
+        postings_start = start + header_len
+        postings_len = sum(df * 2 for _, df in self.terms.values())
+        self._text_start = postings_start + postings_len * 4
+        self._postings = memoryview(self._mmap)[postings_start:self._text_start].cast("I")
+        self._swap = sys.byteorder != "little"
+
+    def close(self) -> None:
+        """Release the mapping."""
+        if getattr(self, "_postings", None) is not None:
+            self._postings.release()
+            self._postings = None
+        self._mmap.close()
+
+    def is_stale(self, data_dir: str = DATA_DIR) -> bool:
+        """Whether a source file changed since the index was built."""
+        try:
+            return _source_stamps(data_dir, dict.fromkeys(self.sources)) != self.sources
+        except OSError:
+            return False  # Sources removed: keep serving the index
+
+    def _postings_of(self, term: str) -> Tuple[int, array.array]:
+        offset, df = self.terms[term]
+        entries = array.array("I", self._postings[offset:offset + df * 2])
+        if self._swap:
+            entries.byteswap()
+        return df, entries
+
+    def text(self, section_id: int) -> str:
+        """Return the full text of a section."""
+        _, _, offset, length, _ = self.sections[section_id]
+        start = self._text_start + offset
+        return self._mmap[start:start + length].decode("utf-8")
+
+    def search(self, query: str, limit: int = 5, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Rank the sections matching a query with BM25.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of results
+            source: Only return sections of this source file
+
+        Returns:
+            Results, best first, each with source, title, score and snippet
+        """
+        query_terms = [term for term in dict.fromkeys(tokenize(query)) if term in self.terms]
+        n = len(self.sections)
+        scores: Dict[int, float] = {}
+        for term in query_terms:
+            df, entries = self._postings_of(term)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for i in range(0, len(entries), 2):
+                section_id, tf = entries[i], entries[i + 1]
+                length = self.sections[section_id][4]
+                norm = tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / self.avgdl))
+                scores[section_id] = scores.get(section_id, 0.0) + idf * norm
+        if source is not None:
+            scores = {sid: score for sid, score in scores.items() if self.sections[sid][0] == source}
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [
+            {
+                "source": self.sections[sid][0],
+                "title": self.sections[sid][1],
+                "score": round(score, 3),
+                "snippet": snippet(self.text(sid), set(query_terms)),
+            }
+            for sid, score in best
+        ]
+
+
+def snippet(text: str, terms: set, max_chars: int = SNIPPET_CHARS) -> str:
+    """Return the lines of a section around the line matching the most query terms."""
+    lines = text.splitlines()
+    if not lines:
+        return ""
+    best = max(range(len(lines)), key=lambda i: (len(terms.intersection(tokenize(lines[i]))), -i))
+    start = max(0, best - 2)
+    chunk = "\n".join(lines[start:best + 6]).strip()
+    if len(chunk) > max_chars:
+        chunk = chunk[:max_chars].rsplit(" ", 1)[0] + " ..."
+    return chunk
+
+
+def open_index(path: Optional[str] = None, data_dir: str = DATA_DIR,
+               sources: Optional[Dict[str, str]] = None) -> DocsIndex:
+    """
+    Open the docs index, building it first if it is missing, unreadable or stale.
+
+    Args:
+        path: Index file; DEFAULT_INDEX_PATH by default
+        data_dir: Directory holding the sources
+        sources: File name -> splitter; DEFAULT_SOURCES by default
+    """
+    path = path or DEFAULT_INDEX_PATH
+    try:
+        index = DocsIndex(path)
+        if not index.is_stale(data_dir):
+            return index
+        index.close()
+    except (OSError, ValueError):
+        pass
+    build_index(path, data_dir, sources)
+    return DocsIndex(path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(f"usage: {sys.argv[0]} build | QUERY...")
+        sys.exit(1)
+    if sys.argv[1:] == ["build"]:
+        started = time.perf_counter()
+        build_index(os.getenv("NETBOX_DOCS_INDEX", DEFAULT_INDEX_PATH))
+        print(f"Built in {time.perf_counter() - started:.2f}s")
+        sys.exit(0)
+    docs = open_index(os.getenv("NETBOX_DOCS_INDEX"))
+    started = time.perf_counter()
+    results = docs.search(" ".join(sys.argv[1:]))
+    elapsed = (time.perf_counter() - started) * 1000
+    for result in results:
+        print(f"[{result['score']}] {result['source']}: {result['title']}\n{result['snippet']}\n")
+    print(f"{len(results)} results in {elapsed:.1f} ms")
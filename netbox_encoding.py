@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+NetBox Normalized Encoding
+
+NetBox nests a brief representation of every related object (site, role,
+device type, tenant, ...) inside each object that refers to it, so a list of
+devices from one site carries the same site dict hundreds of times. This
+module moves such repeated nested objects into a shared reference table:
+
+    {"refs": {"dcim.site:3": {"id": 3, "name": "DM-Syracuse", ...}},
+     "objects": [{"id": 1, "site": {"$ref": "dcim.site:3"}, ...}, ...]}
+
+Nested objects are identified by their API URL. Only objects that occur more
+than once with identical content are moved, so the encoding is lossless and
+denormalize() restores the original list. intern_nested() applies the same
+idea in memory, making repeated nested objects share one dict.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from netbox_schema import model_label
+
+REF_KEY = "$ref"
+
+
+def ref_key(obj: Dict[str, Any]) -> Optional[str]:
+    """Return the reference key of a nested NetBox object ('dcim.site:3'), or None if it has no API URL."""
+    url = obj.get("url")
+    if not isinstance(url, str) or obj.get("id") is None or "/api/" not in url:
+        return None
+    parts = url.split("/api/", 1)[1].strip("/").split("/")
+    if len(parts) < 3 or not parts[-1].isdigit():
+        return None
+    return f"{model_label('/'.join(parts[:-1]))}:{parts[-1]}"
+
+
+def _scan(value: Any, seen: Dict[str, Any], counts: Dict[str, int], nested: bool) -> None:
+    """Count the occurrences of each nested object, marking keys seen with differing content."""
+    if isinstance(value, list):
+        for item in value:
+            _scan(item, seen, counts, nested)
+        return
+    if not isinstance(value, dict):
+        return
+    for child in value.values():
+        _scan(child, seen, counts, True)
+    if not nested:
+        return
+    key = ref_key(value)
+    if key is None:
+        return
+    first = seen.setdefault(key, value)
+    if first is not value and first != value:
+        counts[key] = -1
+    elif counts.get(key, 0) >= 0:
+        counts[key] = counts.get(key, 0) + 1
+
+
+def normalize(objects: List[Dict[str, Any]], min_count: int = 2) -> Dict[str, Any]:
+    """
+    Move nested objects occurring at least min_count times into a reference table.
+
+    Args:
+        objects: NetBox objects as returned by the API
+        min_count: Occurrences from which a nested object is replaced by a reference
+
+    Returns:
+        {"refs": {key: object}, "objects": [...]} with each moved object replaced by {"$ref": key}
+    """
+    seen: Dict[str, Any] = {}
+    counts: Dict[str, int] = {}
+    _scan(objects, seen, counts, False)
+    shared = {key for key, n in counts.items() if n >= min_count}
+    refs: Dict[str, Any] = {}
+
+    def encode(value: Any, nested: bool) -> Any:
+        if isinstance(value, list):
+            return [encode(item, nested) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if nested:
+            key = ref_key(value)
+            if key in shared:
+                if key not in refs:
+                    refs[key] = None  # Reserve the slot so refs are listed in first-use order
+                    refs[key] = {k: encode(v, True) for k, v in value.items()}
+                return {REF_KEY: key}
+        return {k: encode(v, True) for k, v in value.items()}
+
+    encoded = [encode(obj, False) for obj in objects]
+    return {"refs": refs, "objects": encoded}
+
+
+def denormalize(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Restore the objects of a normalized payload.
+
+    Every occurrence of a reference resolves to the same dict, so the result
+    holds one copy of each shared object.
+    """
+    refs = payload.get("refs", {})
+    resolved: Dict[str, Any] = {}
+
+    def decode(value: Any) -> Any:
+        if isinstance(value, list):
+            return [decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        key = value.get(REF_KEY)
+        if key is not None and len(value) == 1 and key in refs:
+            if key not in resolved:
+                resolved[key] = decode(refs[key])
+            return resolved[key]
+        return {k: decode(v) for k, v in value.items()}
+
+    return [decode(obj) for obj in payload.get("objects", [])]
+
+
+def intern_nested(objects: Any, table: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Make equal nested objects share one dict, in place.
+
+    The first occurrence of each nested object (by ref_key) is kept and later
+    equal occurrences are replaced by it; objects whose content differs are
+    left alone. The result must be treated as read-only.
+
+    Args:
+        objects: A decoded NetBox response (an object or a list of objects)
+        table: Interning table to reuse across responses
+
+    Returns:
+        The same objects
+    """
+    table = {} if table is None else table
+
+    def walk(value: Any, nested: bool) -> Any:
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                value[i] = walk(item, nested)
+            return value
+        if not isinstance(value, dict):
+            return value
+        for k, v in value.items():
+            if isinstance(v, (dict, list)):
+                value[k] = walk(v, True)
+        if nested:
+            key = ref_key(value)
+            if key is not None:
+                first = table.setdefault(key, value)
+                if first is not value and first == value:
+                    return first
+        return value
+
+    return walk(objects, False)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+NetBox Streaming Export
+
+This module writes object sets too large for a tool response to local files:
+newline-delimited JSON, or Parquet / Arrow IPC when pyarrow is installed. It
+holds no transport of its own: the REST clients page through an endpoint and
+feed each object to an ExportWriter, which buffers at most batch_rows objects
+before writing them out, so an export runs in constant memory however many
+objects the endpoint holds.
+
+Columnar files need one schema for the whole file. It is inferred from the
+first batch: scalar fields keep their type, nested objects and lists are
+stored as JSON text, and fields that are null throughout the first batch
+become strings. Values that do not fit the schema later on are written as
+null and counted per field in the result.
+"""
+
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from netbox_schema import DEFAULT_CACHE_DIR
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+# File extension per export format
+EXPORT_FORMATS = {"ndjson": ".ndjson", "parquet": ".parquet", "arrow": ".arrow"}
+
+DEFAULT_EXPORT_DIR = os.path.join(DEFAULT_CACHE_DIR, "exports")
+
+# Objects requested per page while exporting
+EXPORT_PAGE_SIZE = 1000
+
+# Objects buffered before they are written (one Parquet row group / Arrow record batch)
+EXPORT_BATCH_ROWS = 5000
+
+
+def check_format(format: str) -> None:
+    """
+    Check that files of a format can be written.
+
+    Raises:
+        ValueError: If the format is unknown
+        ImportError: If a columnar format is requested and pyarrow is not installed
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{format}', expected one of {', '.join(EXPORT_FORMATS)}")
+    if format != "ndjson" and pyarrow is None:
+        raise ImportError(f"The {format} export format requires pyarrow")
+
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        return "string"
+    return "list" if isinstance(value, list) else "object"
+
+
+def _json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class SchemaSummary:
+    """The JSON types seen per top-level field, with counts."""
+
+    def __init__(self):
+        self.fields: Dict[str, Counter] = {}
+
+    def observe(self, obj: Dict[str, Any]) -> None:
+        for key, value in obj.items():
+            counts = self.fields.get(key)
+            if counts is None:
+                counts = self.fields[key] = Counter()
+            counts[_type_name(value)] += 1
+
+    def to_dict(self) -> Dict[str, str]:
+        """Field -> its types joined by '|' (e.g. 'string|null'), most frequent first."""
+        return {key: "|".join(name for name, _ in counts.most_common()) for key, counts in self.fields.items()}
+
+
+@dataclass
+class ExportResult:
+    """Where an export was written and what it holds."""
+
+    endpoint: str
+    path: str
+    format: str
+    rows: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+    schema: Dict[str, str] = field(default_factory=dict)
+    dropped: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "endpoint": self.endpoint,
+            "path": self.path,
+            "format": self.format,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "elapsed": round(self.elapsed, 3),
+            "schema": self.schema,
+        }
+        if self.dropped:
+            result["dropped_values"] = self.dropped
+        return result
+
+
+def _arrow_type(names: set) -> Any:
+    names = names - {"null"}
+    if names == {"bool"}:
+        return pyarrow.bool_()
+    if names == {"int"}:
+        return pyarrow.int64()
+    if names and names <= {"int", "float"}:
+        return pyarrow.float64()
+    return pyarrow.string()
+
+
+class ExportWriter:
+    """
+    Buffered writer for one export file.
+
+    add() buffers an object and returns True once a batch is full; flush()
+    writes the batch out. The file is written under a temporary name and
+    only moved into place by close(), so a failed export leaves nothing
+    behind but what abort() removes.
+    """
+
+    def __init__(self, path: str, format: str = "ndjson", endpoint: str = "",
+                 fields: Optional[List[str]] = None, batch_rows: int = EXPORT_BATCH_ROWS):
+        """
+        Initialize the writer.
+
+        Args:
+            path: File to write
+            format: One of EXPORT_FORMATS
+            endpoint: The exported API endpoint, for the result
+            fields: Top-level fields to keep (all fields by default)
+            batch_rows: Objects buffered before they are written
+
+        Raises:
+            ValueError: If the format is unknown
+            ImportError: If a columnar format is requested and pyarrow is not installed
+        """
+        check_format(format)
+        self.path = path
+        self.format = format
+        self.fields = list(fields) if fields else None
+        self.batch_rows = max(1, batch_rows)
+        self.result = ExportResult(endpoint, path, format)
+        self._summary = SchemaSummary()
+        self._dropped: Counter = Counter()
+        self._batch: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+        self._tmp = f"{path}.tmp"
+        self._file: Any = None
+        self._writer: Any = None
+        self._schema: Any = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def add(self, obj: Dict[str, Any]) -> bool:
+        """Buffer an object; returns whether the batch is full and should be flushed."""
+        if self.fields is not None:
+            obj = {key: obj[key] for key in self.fields if key in obj}
+        self._summary.observe(obj)
+        self._batch.append(obj)
+        return len(self._batch) >= self.batch_rows
+
+    def flush(self) -> None:
+        """Write the buffered objects."""
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        if self.format == "ndjson":
+            if self._file is None:
+                self._file = open(self._tmp, "w", encoding="utf-8")
+            self._file.write("".join(_json(obj) + "\n" for obj in batch))
+        else:
+            self._write_columnar(batch)
+        self.result.rows += len(batch)
+
+    def _write_columnar(self, batch: List[Dict[str, Any]]) -> None:
+        if self._schema is None:
+            types: Dict[str, set] = {}
+            for obj in batch:
+                for key, value in obj.items():
+                    types.setdefault(key, set()).add(_type_name(value))
+            self._schema = pyarrow.schema([(key, _arrow_type(names)) for key, names in types.items()])
+            if self.format == "parquet":
+                self._writer = pyarrow.parquet.ParquetWriter(self._tmp, self._schema)
+            else:
+                self._file = pyarrow.OSFile(self._tmp, "wb")
+                self._writer = pyarrow.ipc.new_file(self._file, self._schema)
+        known = set(self._schema.names)
+        for obj in batch:
+            for key in obj.keys() - known:
+                self._dropped[key] += 1
+        columns = [self._column(f.name, f.type, batch) for f in self._schema]
+        self._writer.write_batch(pyarrow.RecordBatch.from_arrays(columns, schema=self._schema))
+
+    def _column(self, name: str, arrow_type: Any, batch: List[Dict[str, Any]]) -> Any:
+        values = []
+        for obj in batch:
+            value = obj.get(name)
+            if value is not None:
+                kind = _type_name(value)
+                if arrow_type == pyarrow.string():
+                    value = value if kind == "string" else _json(value)
+                elif arrow_type == pyarrow.float64() and kind in ("int", "float"):
+                    value = float(value)
+                elif not ((arrow_type == pyarrow.int64() and kind == "int")
+                          or (arrow_type == pyarrow.bool_() and kind == "bool")):
+                    self._dropped[name] += 1
+                    value = None
+            values.append(value)
+        return pyarrow.array(values, type=arrow_type)
+
+    def close(self) -> ExportResult:
+        """Write what is left, move the file into place and return the result."""
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        if not os.path.exists(self._tmp):
+            # Nothing matched: still leave a valid, empty file
+            if self.format == "ndjson":
+                open(self._tmp, "w").close()
+            else:
+                self._schema = pyarrow.schema([])
+                self._write_empty()
+        os.replace(self._tmp, self.path)
+        self.result.bytes = os.path.getsize(self.path)
+        self.result.elapsed = time.perf_counter() - self._started
+        self.result.schema = self._summary.to_dict()
+        self.result.dropped = dict(self._dropped)
+        return self.result
+
+    def _write_empty(self) -> None:
+        if self.format == "parquet":
+            pyarrow.parquet.write_table(self._schema.empty_table(), self._tmp)
+        else:
+            with pyarrow.OSFile(self._tmp, "wb") as f, pyarrow.ipc.new_file(f, self._schema):
+                pass
+
+    def abort(self) -> None:
+        """Discard a failed export."""
+        for handle in (self._writer, self._file):
+            try:
+                if handle is not None:
+                    handle.close()
+            except Exception:
+                pass
+        try:
+            os.remove(self._tmp)
+        except OSError:
+            pass
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+NetBox MCP Shared HTTP Server
+
+This module runs the MCP server as one long-lived process shared by many
+agents over the streamable HTTP transport, instead of one stdio process per
+conversation. Startup cost (interpreter, NetBox connections, schema, cache)
+is paid once: a warm-up hook runs before the server starts listening.
+
+Tool calls pass through a ToolGate, which bounds how many run at once and,
+on SIGTERM/SIGINT, stops admitting new calls and lets the running ones finish
+before the process exits. GET /health reports readiness for load balancers.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional
+
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+from sse_starlette.sse import AppStatus
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+
+class ToolGate:
+    """Concurrency limit and drain switch for tool calls."""
+
+    def __init__(self, max_concurrent: int = 32, queue_timeout: float = 30.0):
+        """
+        Initialize the gate.
+
+        Args:
+            max_concurrent: Tool calls allowed to run at once
+            queue_timeout: Seconds a call may wait for a slot before it is rejected
+        """
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self.draining = False
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold one of the concurrent call slots.
+
+        Raises:
+            RuntimeError: If the server is draining or no slot freed up within queue_timeout
+        """
+        if self.draining:
+            self.rejected += 1
+            raise RuntimeError("The NetBox MCP server is shutting down; retry the call")
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise RuntimeError(f"More than {self.max_concurrent} tool calls are in progress; retry the call") from None
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self._semaphore.release()
+            if not self.active:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Stop admitting calls and wait for the running ones to finish.
+
+        Returns:
+            Whether every call finished within timeout seconds
+        """
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "draining": self.draining,
+        }
+
+
+class GatedFastMCP(FastMCP):
+    """FastMCP whose tool calls go through a ToolGate once one is set."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        self.gate: Optional[ToolGate] = None
+        super().__init__(*args, **kwargs)
+
+    def set_enum(self, tool: str, parameter: str, values: Iterable[str]) -> None:
+        """Advertise the values a tool parameter accepts in the tool's input schema."""
+        self._tool_manager.get_tool(tool).parameters["properties"][parameter]["enum"] = sorted(values)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        if self.gate is None:
+            return await super().call_tool(name, arguments)
+        async with self.gate.slot():
+            return await super().call_tool(name, arguments)
+
+
+class _DrainingServer(uvicorn.Server):
+    """
+    uvicorn server that drains the gate before closing connections.
+
+    While draining, the socket stays open so that new calls are answered with
+    a retryable error and /health with 503, rather than refused connections.
+    """
+
+    def __init__(self, config: uvicorn.Config, gate: ToolGate, drain_timeout: float):
+        super().__init__(config)
+        self.gate = gate
+        self.drain_timeout = drain_timeout
+
+    def handle_exit(self, sig: int, frame: Any) -> None:
+        self.gate.draining = True
+        super().handle_exit(sig, frame)
+
+    async def shutdown(self, sockets: Any = None) -> None:
+        await self.gate.drain(self.drain_timeout)
+        # Tool results travel over SSE streams, which are only closed once the calls are done
+        AppStatus.should_exit = True
+        await super().shutdown(sockets)
+
+
+async def serve_http(mcp: GatedFastMCP, host: str = "127.0.0.1", port: int = 8000,
+                     warm_up: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None,
+                     max_concurrent: int = 32, drain_timeout: float = 30.0) -> None:
+    """
+    Serve MCP over streamable HTTP until SIGTERM/SIGINT, then drain.
+
+    Args:
+        mcp: The MCP server
+        host: Address to listen on
+        port: Port to listen on
+        warm_up: Coroutine function run before listening; its result is reported by /health
+        max_concurrent: Tool calls allowed to run at once
+        drain_timeout: Seconds running calls are given to finish on shutdown
+    """
+    gate = mcp.gate = ToolGate(max_concurrent)
+    # sse_starlette would otherwise end every SSE stream, and the results in flight, on the signal
+    AppStatus.disable_automatic_graceful_drain()
+    warm: Dict[str, Any] = {}
+    started = time.time()
+
+    @mcp.custom_route("/health", methods=["GET"])
+    async def health(request: Request) -> Response:
+        status = 503 if gate.draining else 200
+        return JSONResponse({"status": "draining" if gate.draining else "ok", "uptime": round(time.time() - started, 1),
+                             "tools": gate.stats(), "warm_up": warm}, status_code=status)
+
+    if warm_up is not None:
+        warm.update(await warm_up())
+    config = uvicorn.Config(mcp.streamable_http_app(), host=host, port=port,
+                            log_level=mcp.settings.log_level.lower(), timeout_graceful_shutdown=drain_timeout)
+    await _DrainingServer(config, gate, drain_timeout).serve()
+
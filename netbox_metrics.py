@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+NetBox Metrics
+
+This module records where time goes when talking to NetBox: per-endpoint
+request counts, statuses, latency histograms, bytes in and out and JSON decode
+time from the REST clients, queue depth and wait time from the request
+scheduler, and a span around each MCP tool call. A snapshot
+is available as a dict or in the Prometheus text exposition format.
+"""
+
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds of the request and tool latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Upper bounds in seconds of the JSON decode time histogram buckets
+DECODE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+# Upper bounds in seconds of the scheduler queue wait histogram buckets
+QUEUE_WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+_received: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar("netbox_bytes_received",
+                                                                                default=None)
+
+
+@contextmanager
+def count_received() -> Iterator[List[int]]:
+    """Count the response bytes of the requests recorded within the block; the total is in [0]."""
+    counter = [0]
+    token = _received.set(counter)
+    try:
+        yield counter
+    finally:
+        _received.reset(token)
+
+
+def _add_received(bytes_in: int) -> None:
+    counter = _received.get()
+    if counter is not None:
+        counter[0] += bytes_in
+
+
+def endpoint_label(api_url: str, url: str) -> str:
+    """Reduce a request URL to its endpoint ('.../api/dcim/devices/12/' -> 'dcim/devices')."""
+    path = url.split("?", 1)[0]
+    if path.startswith(api_url):
+        path = path[len(api_url):]
+    parts = path.strip("/").split("/")
+    while parts and (parts[-1].isdigit() or parts[-1] == "bulk"):
+        parts.pop()
+    return "/".join(parts)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile as the upper bound of the bucket it falls in.
+
+        Returns None if it falls beyond the last bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return (le, cumulative count) pairs including +Inf."""
+        total = 0
+        result = []
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return result
+
+
+class EndpointStats:
+    """Counters and histograms of one endpoint."""
+
+    def __init__(self):
+        self.statuses: Dict[Tuple[str, str], int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.decode = Histogram(DECODE_BUCKETS)
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+
+class ToolStats:
+    """Latency and error count of one MCP tool."""
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.errors = 0
+        self.active = 0
+
+
+class Metrics:
+    """
+    Thread-safe registry of client request and MCP tool metrics.
+
+    A client records each HTTP exchange with record_request() and each JSON
+    decode with record_decode(); a RequestScheduler reports its queues with
+    record_queue_wait(), set_queue_depth() and set_in_flight(); tools are
+    wrapped with instrument_tool().
+    With export_path set, the Prometheus text dump is rewritten there at most
+    every export_interval seconds, for a node_exporter textfile collector or
+    for diffing between runs.
+    """
+
+    def __init__(self, export_path: Optional[str] = None, export_interval: float = 10.0):
+        """
+        Initialize the registry.
+
+        Args:
+            export_path: File the Prometheus text dump is periodically written to
+            export_interval: Minimum seconds between writes of export_path
+        """
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self._lock = threading.Lock()
+        self._exported = 0.0
+        # Gauges describe the present, so reset() leaves them alone
+        self.queue_depth: Dict[str, int] = {}
+        self.in_flight = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop every recorded value."""
+        with self._lock:
+            self.endpoints: Dict[str, EndpointStats] = {}
+            self.tools: Dict[str, ToolStats] = {}
+            self.queue_wait: Dict[str, Histogram] = {}
+            self.started = time.time()
+
+    def _endpoint(self, endpoint: str) -> EndpointStats:
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        return stats
+
+    def record_request(self, method: str, endpoint: str, status: Optional[int], elapsed: Optional[float],
+                       bytes_out: int = 0, bytes_in: int = 0) -> None:
+        """
+        Record one HTTP exchange.
+
+        Args:
+            method: HTTP method
+            endpoint: Endpoint label (see endpoint_label)
+            status: HTTP status, or None if no response was received
+            elapsed: Seconds from sending the request to receiving the whole body, or None if
+                not measured (attempts retried inside urllib3 only report their status)
+            bytes_out: Request body size
+            bytes_in: Response body size
+        """
+        key = (method, "error" if status is None else str(status))
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats.statuses[key] = stats.statuses.get(key, 0) + 1
+            if elapsed is not None:
+                stats.latency.observe(elapsed)
+            stats.bytes_out += bytes_out
+            stats.bytes_in += bytes_in
+        _add_received(bytes_in)
+
+    def record_decode(self, endpoint: str, elapsed: float, bytes_in: int = 0) -> None:
+        """
+        Record the time spent decoding one JSON response body.
+
+        bytes_in is the size of a streamed body, which record_request() could not know.
+        """
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats.decode.observe(elapsed)
+            stats.bytes_in += bytes_in
+        _add_received(bytes_in)
+
+    def record_queue_wait(self, priority: str, elapsed: float) -> None:
+        """Record how long a request of a priority class waited for a scheduler slot."""
+        with self._lock:
+            hist = self.queue_wait.get(priority)
+            if hist is None:
+                hist = self.queue_wait[priority] = Histogram(QUEUE_WAIT_BUCKETS)
+            hist.observe(elapsed)
+
+    def set_queue_depth(self, priority: str, depth: int) -> None:
+        """Set the number of requests of a priority class waiting for a scheduler slot."""
+        with self._lock:
+            self.queue_depth[priority] = depth
+
+    def set_in_flight(self, count: int) -> None:
+        """Set the number of requests holding a scheduler slot."""
+        with self._lock:
+            self.in_flight = count
+
+    @contextmanager
+    def span(self, tool: str) -> Iterator[None]:
+        """Time one tool call, counting it as an error if it raises."""
+        with self._lock:
+            stats = self.tools.get(tool)
+            if stats is None:
+                stats = self.tools[tool] = ToolStats()
+            stats.active += 1
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stats.active -= 1
+                stats.latency.observe(elapsed)
+                stats.errors += failed
+            self._maybe_export()
+
+    def instrument_tool(self, fn: Callable) -> Callable:
+        """Decorator wrapping a tool function, sync or async, in a span named after it."""
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.span(fn.__name__):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self.span(fn.__name__):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every metric as a JSON-serializable dict."""
+        with self._lock:
+            endpoints = {}
+            for name, stats in sorted(self.endpoints.items()):
+                by_status: Dict[str, int] = {}
+                for (method, status), n in sorted(stats.statuses.items()):
+                    by_status[f"{method} {status}"] = n
+                endpoints[name] = {
+                    "requests": sum(stats.statuses.values()),
+                    "by_status": by_status,
+                    "latency": stats.latency.to_dict(),
+                    "decode": stats.decode.to_dict(),
+                    "bytes_in": stats.bytes_in,
+                    "bytes_out": stats.bytes_out,
+                }
+            tools = {
+                name: {"latency": stats.latency.to_dict(), "errors": stats.errors, "active": stats.active}
+                for name, stats in sorted(self.tools.items())
+            }
+            scheduler = {
+                "in_flight": self.in_flight,
+                "queue_depth": dict(sorted(self.queue_depth.items())),
+                "queue_wait": {name: hist.to_dict() for name, hist in sorted(self.queue_wait.items())},
+            }
+            return {"since": self.started, "endpoints": endpoints, "tools": tools, "scheduler": scheduler}
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help: str) -> None:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, labels: str, hist: Histogram) -> None:
+            for le, n in hist.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {n}')
+            lines.append(f"{name}_sum{{{labels}}} {hist.sum:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            tools = sorted(self.tools.items())
+            header("netbox_client_requests_total", "counter", "NetBox API requests by method and status.")
+            for name, stats in endpoints:
+                for (method, status), n in sorted(stats.statuses.items()):
+                    lines.append(f'netbox_client_requests_total{{endpoint="{name}",method="{method}",'
+                                 f'status="{status}"}} {n}')
+            header("netbox_client_request_duration_seconds", "histogram", "NetBox API request latency.")
+            for name, stats in endpoints:
+                histogram("netbox_client_request_duration_seconds", f'endpoint="{name}"', stats.latency)
+            header("netbox_client_decode_duration_seconds", "histogram", "JSON decode time of NetBox responses.")
+            for name, stats in endpoints:
+                histogram("netbox_client_decode_duration_seconds", f'endpoint="{name}"', stats.decode)
+            header("netbox_client_response_bytes_total", "counter", "Bytes received from NetBox.")
+            for name, stats in endpoints:
+                lines.append(f'netbox_client_response_bytes_total{{endpoint="{name}"}} {stats.bytes_in}')
+            header("netbox_client_request_bytes_total", "counter", "Bytes sent to NetBox.")
+            for name, stats in endpoints:
+                lines.append(f'netbox_client_request_bytes_total{{endpoint="{name}"}} {stats.bytes_out}')
+            header("netbox_client_queue_wait_seconds", "histogram", "Time requests waited for a scheduler slot.")
+            for name, hist in sorted(self.queue_wait.items()):
+                histogram("netbox_client_queue_wait_seconds", f'priority="{name}"', hist)
+            header("netbox_client_queue_depth", "gauge", "Requests waiting for a scheduler slot.")
+            for name, depth in sorted(self.queue_depth.items()):
+                lines.append(f'netbox_client_queue_depth{{priority="{name}"}} {depth}')
+            header("netbox_client_requests_in_flight", "gauge", "Requests holding a scheduler slot.")
+            lines.append(f"netbox_client_requests_in_flight {self.in_flight}")
+            header("netbox_mcp_tool_duration_seconds", "histogram", "MCP tool call latency.")
+            for name, stats in tools:
+                histogram("netbox_mcp_tool_duration_seconds", f'tool="{name}"', stats.latency)
+            header("netbox_mcp_tool_errors_total", "counter", "MCP tool calls that raised.")
+            for name, stats in tools:
+                lines.append(f'netbox_mcp_tool_errors_total{{tool="{name}"}} {stats.errors}')
+            header("netbox_mcp_tool_active", "gauge", "MCP tool calls in progress.")
+            for name, stats in tools:
+                lines.append(f'netbox_mcp_tool_active{{tool="{name}"}} {stats.active}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> None:
+        """Write the Prometheus text dump to a file atomically."""
+        with open(f"{path}.tmp", "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(f"{path}.tmp", path)
+
+    def _maybe_export(self) -> None:
+        if not self.export_path:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._exported < self.export_interval:
+                return
+            self._exported = now
+        try:
+            self.export(self.export_path)
+        except OSError:
+            pass
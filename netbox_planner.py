@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+NetBox Query Planner
+
+This module splits the filters of an object query between NetBox and the
+client. Filters the endpoint supports are sent as query parameters; every
+other filter, including dotted paths into nested objects ('site.slug',
+'custom_fields.rack_unit') and NetBox-style lookups ('name__ic',
+'vcpus__gte'), becomes a local predicate evaluated on the streamed,
+paginated results. Streaming stops as soon as the requested number of
+matches has been found, or once MAX_SCANNED objects have been read. A filter
+that is neither supported by the endpoint nor a field of its objects is
+rejected up front when the type's fields are known from the OpenAPI schema,
+and otherwise on the first object read (or a sample object, if the scan read
+none) instead of silently matching nothing.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Container, Dict, Iterable, List, Optional
+
+from netbox_schema import FILTER_PATHS
+
+# Lookup suffixes understood by local predicates (NetBox's filter lookup expressions)
+LOOKUPS = {"n", "ie", "nie", "ic", "nic", "isw", "nisw", "iew", "niew", "gt", "gte", "lt", "lte", "empty"}
+
+# Keys of a nested object a filter value is compared with
+NESTED_KEYS = ("id", "slug", "name", "value", "address", "prefix")
+
+# Objects per page when local predicates have to be evaluated
+SCAN_PAGE_SIZE = 250
+
+# Objects a local scan reads at most before it stops and reports the cap
+MAX_SCANNED = 100000
+
+
+def lookup_path(obj: Any, path: str) -> Any:
+    """Follow a dotted path such as 'site.region' into an object."""
+    value = obj
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _text(value: Any, fold: bool) -> str:
+    text = str(value)
+    # Booleans compare as 'true'/'false' whatever the case, as NetBox parses them
+    return text.lower() if fold or text.lower() in ("true", "false") else text
+
+
+def field_values(value: Any, fold: bool = True) -> List[str]:
+    """
+    Return the strings a filter on this field value is compared with.
+
+    Args:
+        value: The field value, or the filter values
+        fold: Lower-case the strings, for the case-insensitive lookups
+    """
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [text for item in value for text in field_values(item, fold)]
+    if isinstance(value, dict):
+        return [_text(value[key], fold) for key in NESTED_KEYS if value.get(key) is not None]
+    if isinstance(value, bool):
+        return ["true" if value else "false"]
+    text = _text(value, fold)
+    # Let 'address=10.0.0.1' match '10.0.0.1/24'
+    return [text, text.split("/", 1)[0]] if "/" in text else [text]
+
+
+def _number(value: Any) -> Any:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value).lower()
+
+
+@dataclass
+class Predicate:
+    """A filter evaluated on the client: a field path, a lookup and the accepted values."""
+
+    key: str
+    paths: List[str]
+    lookup: str
+    values: List[Any]
+
+    @classmethod
+    def parse(cls, key: str, value: Any) -> "Predicate":
+        """Build a predicate from a filter such as ('site.slug', 'dm-akron') or ('vcpus__gte', 4)."""
+        path, _, lookup = key.rpartition("__")
+        if lookup not in LOOKUPS or not path:
+            path, lookup = key, "exact"
+        paths = [path]
+        if path in FILTER_PATHS:
+            paths.append(FILTER_PATHS[path])
+        if "." not in path and path.endswith("_id"):
+            # 'site_id' filters on the nested object's ID
+            paths.append(f"{path[:-3]}.id")
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        return cls(key, paths, lookup, values)
+
+    def matches(self, obj: Dict[str, Any]) -> bool:
+        """Whether an object passes the predicate."""
+        # The field itself, then the field the filter name stands for ('tag' -> 'tags')
+        for path in self.paths:
+            value = lookup_path(obj, path)
+            if value is not None:
+                break
+        lookup = self.lookup
+        if lookup == "empty":
+            empty = value in (None, "", [], {})
+            return any(empty == (str(v).lower() in ("true", "1")) for v in self.values)
+        if lookup in ("gt", "gte", "lt", "lte"):
+            if value is None or isinstance(value, (dict, list)):
+                return False
+            actual = _number(value)
+            for wanted in map(_number, self.values):
+                if type(actual) is not type(wanted):
+                    continue
+                if ((lookup == "gt" and actual > wanted) or (lookup == "gte" and actual >= wanted)
+                        or (lookup == "lt" and actual < wanted) or (lookup == "lte" and actual <= wanted)):
+                    return True
+            return False
+        negate = lookup.startswith("n")
+        base = lookup[1:] if negate and lookup != "n" else "exact" if negate else lookup
+        # Like NetBox's, exact matching is case-sensitive; only the 'i' lookups ignore case
+        fold = base != "exact"
+        actual = field_values(value, fold)
+        wanted = field_values(self.values, fold)
+        if base in ("exact", "ie"):
+            hit = any(v in actual for v in wanted)
+        elif base == "ic":
+            hit = any(w in a for w in wanted for a in actual)
+        elif base == "isw":
+            hit = any(a.startswith(w) for w in wanted for a in actual)
+        else:
+            hit = any(a.endswith(w) for w in wanted for a in actual)
+        return hit != negate
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"filter": self.key, "path": self.paths[-1], "lookup": self.lookup, "values": self.values}
+
+
+@dataclass
+class QueryPlan:
+    """Filters sent to NetBox, predicates evaluated locally, and what executing them did."""
+
+    server: Dict[str, Any]
+    local: List[Predicate] = field(default_factory=list)
+    limit: Optional[int] = None
+    source: str = "api"
+    max_scanned: Optional[int] = MAX_SCANNED
+    scanned: int = 0
+    matched: int = 0
+    stopped_early: bool = False
+    scan_capped: bool = False
+    _checked: bool = field(default=False, repr=False)
+
+    @property
+    def fields(self) -> List[str]:
+        """Top-level fields the local predicates read, which a field projection must keep."""
+        return sorted({path.split(".", 1)[0] for p in self.local for path in p.paths})
+
+    def check_fields(self, obj: Container[str]) -> None:
+        """
+        Check that every local predicate reads a field objects of this type have.
+
+        Args:
+            obj: An object of the type, or the names of the type's fields
+
+        Raises:
+            ValueError: If a filter is neither supported by NetBox nor a field of the object
+        """
+        unknown = [p.key for p in self.local if not any(path.split(".", 1)[0] in obj for path in p.paths)]
+        if unknown:
+            raise ValueError(f"Unknown filter(s) {', '.join(unknown)}: neither a filter NetBox supports "
+                             f"for this type nor a field of its objects")
+
+    def matches(self, obj: Dict[str, Any]) -> bool:
+        """Whether an object passes the local predicates; the first object checked validates the filters."""
+        if not self._checked:
+            self.check_fields(obj)
+            self._checked = True
+        return all(p.matches(obj) for p in self.local)
+
+    def filter(self, objects: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply the local predicates and the limit to objects already in memory."""
+        result = []
+        for obj in objects:
+            if self.limit is not None and len(result) >= self.limit:
+                self.stopped_early = True
+                break
+            self.scanned += 1
+            if self.matches(obj):
+                result.append(obj)
+        self.matched = len(result)
+        return result
+
+    async def execute(self, client: Any, endpoint: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Stream the server-filtered results and keep those passing the local predicates.
+
+        Args:
+            client: The asyncio NetBox client
+            endpoint: The API endpoint
+            params: Further query parameters, such as a field projection
+        """
+        params = {**self.server, **(params or {})}
+        if not self.local:
+            result = await client.get(endpoint, params=params, max_objects=self.limit)
+            self.scanned = self.matched = len(result)
+            return result
+        result = []
+        async for obj in self._scan(client, endpoint, params):
+            result.append(obj)
+        await self.validate(client, endpoint)
+        return result
+
+    async def validate(self, client: Any, endpoint: str) -> None:
+        """
+        Check the local predicates on a sample object if no object has been checked yet.
+
+        A scan whose server-side filters match nothing reads no object, which
+        would otherwise let a misspelled filter pass as an empty result.
+
+        Raises:
+            ValueError: If a filter is neither supported by NetBox nor a field of the objects
+        """
+        if not self.local or self._checked:
+            return
+        sample = await client.get(endpoint, max_objects=1)
+        if sample:
+            self.check_fields(sample[0])
+            self._checked = True
+
+    async def _scan(self, client: Any, endpoint: str, params: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        objects = client.iter_objects(endpoint, params=params, page_size=SCAN_PAGE_SIZE)
+        try:
+            async for obj in objects:
+                if self.max_scanned is not None and self.scanned >= self.max_scanned:
+                    # A filter NetBox cannot apply must not turn into a scan of millions of rows
+                    self.scan_capped = True
+                    return
+                self.scanned += 1
+                if not self.matches(obj):
+                    continue
+                self.matched += 1
+                yield obj
+                if self.limit is not None and self.matched >= self.limit:
+                    self.stopped_early = True
+                    return
+        finally:
+            # Stop prefetching further pages
+            await objects.aclose()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "server_filters": self.server,
+            "local_filters": [p.to_dict() for p in self.local],
+            "limit": self.limit,
+            "scanned": self.scanned,
+            "matched": self.matched,
+            "stopped_early": self.stopped_early,
+            "max_scanned": self.max_scanned,
+            "scan_capped": self.scan_capped,
+        }
+
+
+def plan_query(filters: Optional[Dict[str, Any]], allowed: Iterable[str],
+               aliases: Optional[Dict[str, str]] = None, limit: Optional[int] = None,
+               fields: Iterable[str] = ()) -> QueryPlan:
+    """
+    Split filters between NetBox and local evaluation.
+
+    Args:
+        filters: Filters as given by the caller
+        allowed: Filters the endpoint supports
+        aliases: Friendly filter names mapped to NetBox's
+        limit: Maximum number of matching objects wanted
+        fields: Top-level fields of the type's objects, if known, to validate local filters against
+
+    Returns:
+        The query plan
+
+    Raises:
+        ValueError: If fields are given and a local filter reads none of them
+    """
+    allowed = set(allowed)
+    aliases = aliases or {}
+    server: Dict[str, Any] = {}
+    local: List[Predicate] = []
+    for key, value in (filters or {}).items():
+        api_key = aliases.get(key, key)
+        if api_key in allowed:
+            server[api_key] = value
+        else:
+            local.append(Predicate.parse(api_key, value))
+    plan = QueryPlan(server, local, limit)
+    fields = frozenset(fields)
+    if local and fields:
+        plan.check_fields(fields)
+        plan._checked = True
+    return plan
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+NetBox SQLite Replica
+
+This module keeps a local SQLite copy of NetBox objects so that read-heavy
+callers can be answered without an API round trip. Each object type is fully
+synced once, then refreshed incrementally: core/object-changes is tailed from a
+high-watermark to find deleted objects and the types that changed, and those
+types are re-fetched with a last_updated__gte filter.
+
+Filter values are stored in an indexed (type, key, value) table, so queries on
+the filters the server allows run as index lookups. Only exact filters on a
+field of the objects are indexed, and they match as NetBox's do: a nested
+object by its slug (or choice value, or name), an '_id' filter by ID, and
+strings case-sensitively. A type whose last sync is older than max_lag, or a
+query using a filter that is not indexed (lookups such as 'name__ic', the 'q'
+search, filters on derived values), is reported as unservable and the caller
+falls back to a live API call.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from netbox_changelog import AsyncChangelogTail, ChangelogCursor
+from netbox_scheduler import BATCH, priority
+from netbox_schema import FILTER_PATHS, model_label
+
+# Bumped whenever indexed values change meaning; an older database is rebuilt
+FORMAT = 2
+
+# Nested objects an exact filter matches by a key other than slug, choice value or name
+NESTED_FILTER_KEYS = {"vrf": "rd"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    type TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    last_updated TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (type, id)
+);
+CREATE TABLE IF NOT EXISTS object_filters (
+    type TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS object_filters_lookup ON object_filters (type, key, value);
+CREATE INDEX IF NOT EXISTS object_filters_object ON object_filters (type, id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    type TEXT PRIMARY KEY,
+    watermark TEXT,
+    last_full_sync REAL,
+    last_sync REAL
+);
+CREATE TABLE IF NOT EXISTS changelog_cursor (
+    singleton INTEGER PRIMARY KEY CHECK (singleton = 0),
+    last_id INTEGER NOT NULL,
+    last_time TEXT
+);
+"""
+
+
+def _text(value: Any) -> str:
+    text = str(value)
+    # Booleans match 'true'/'false' whatever the case, as NetBox parses them
+    return text.lower() if text.lower() in ("true", "false") else text
+
+
+def _filter_values(value: Any, nested_key: Optional[str] = None) -> Iterable[str]:
+    """
+    Yield the strings an exact filter on this field value matches.
+
+    Args:
+        value: The field value
+        nested_key: Key a nested object is matched by; its slug, choice value or name by default
+    """
+    if value is None:
+        return
+    if isinstance(value, list):
+        for item in value:
+            yield from _filter_values(item, nested_key)
+    elif isinstance(value, dict):
+        for key in (nested_key,) if nested_key else ("slug", "value", "name"):
+            if value.get(key) is not None:
+                yield _text(value[key])
+                break
+    elif isinstance(value, bool):
+        yield "true" if value else "false"
+    else:
+        text = str(value)
+        yield text
+        if "/" in text:
+            # Let 'address=10.0.0.1' match '10.0.0.1/24'
+            yield text.split("/", 1)[0]
+
+
+def _lookup(obj: Dict[str, Any], path: str) -> Any:
+    value: Any = obj
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _index_values(obj: Dict[str, Any], key: str) -> Iterable[str]:
+    """Yield the values of an object an exact filter matches."""
+    value = _lookup(obj, FILTER_PATHS.get(key, key))
+    if value is None and key.endswith("_id"):
+        # 'site_id' filters on the nested object's ID
+        base = key[:-3]
+        return _filter_values(_lookup(obj, FILTER_PATHS.get(base, base)), "id")
+    return _filter_values(value, NESTED_FILTER_KEYS.get(key))
+
+
+def indexable(key: str, fields: Optional[Iterable[str]] = None) -> bool:
+    """
+    Whether the replica can answer a filter: an exact filter on a field of the objects.
+
+    Args:
+        key: The filter name
+        fields: Top-level fields of the type's objects, if known
+    """
+    if key == "q" or "__" in key:
+        return False
+    if fields is None:
+        return True
+    heads = {FILTER_PATHS.get(key, key).split(".", 1)[0]}
+    if key.endswith("_id"):
+        heads.add(FILTER_PATHS.get(key[:-3], key[:-3]).split(".", 1)[0])
+    return bool(heads & set(fields))
+
+
+class NetBoxReplica:
+    """
+    SQLite mirror of NetBox objects with incremental changelog-driven sync.
+
+    The replica is driven by an asyncio NetBox client. SQLite work runs in a
+    worker thread so that syncing does not block the event loop.
+    """
+
+    def __init__(self, client: Any, path: str, object_types: Dict[str, str],
+                 filters: Dict[str, Iterable[str]], fields: Optional[Dict[str, Iterable[str]]] = None,
+                 max_lag: float = 300.0, interval: float = 30.0, full_sync_interval: float = 86400.0):
+        """
+        Initialize the replica.
+
+        Args:
+            client: Async NetBox client used for syncing
+            path: SQLite database file (':memory:' for a throwaway replica)
+            object_types: Mapping of object type name to API endpoint
+            filters: Filters NetBox supports per object type; the exact ones are indexed
+            fields: Top-level fields per object type, if known, so filters on derived values are not indexed
+            max_lag: Seconds after which a type's data is considered stale
+            interval: Seconds between incremental refreshes
+            full_sync_interval: Seconds between full re-syncs of a type
+        """
+        fields = fields or {}
+        self.client = client
+        self.object_types = dict(object_types)
+        self.indexed_filters = {t: {key for key in f if indexable(key, fields.get(t))} for t, f in filters.items()}
+        self.max_lag = max_lag
+        self.interval = interval
+        self.full_sync_interval = full_sync_interval
+        self.types_by_model = {model_label(endpoint): t for t, endpoint in self.object_types.items()}
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != FORMAT:
+            self.db.executescript("DROP TABLE IF EXISTS objects; DROP TABLE IF EXISTS object_filters; "
+                                  "DROP TABLE IF EXISTS sync_state; DROP TABLE IF EXISTS changelog_cursor;")
+            self.db.execute(f"PRAGMA user_version = {FORMAT}")
+        self.db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.last_error: Optional[str] = None
+        self.sync_errors: Dict[str, str] = {}
+
+    def start(self) -> None:
+        """Start the background sync loop on the running event loop, once."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background sync loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        # Background syncs yield to the requests agents are waiting on
+        with priority(BATCH):
+            await self._loop()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.sync()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+            await asyncio.sleep(self.interval)
+
+    async def sync(self) -> None:
+        """Run one sync pass: full syncs where due, then an incremental refresh."""
+        state = await asyncio.to_thread(self._sync_state)
+        now = time.time()
+        if not await asyncio.to_thread(self._cursor):
+            await self._init_cursor()
+        for object_type in self.object_types:
+            last_full = state.get(object_type, (None, None, None))[1]
+            if last_full is None or now - last_full > self.full_sync_interval:
+                # One unreadable type (e.g. missing permissions) must not stall the others
+                try:
+                    await self.full_sync(object_type)
+                    self.sync_errors.pop(object_type, None)
+                except Exception as e:
+                    self.sync_errors[object_type] = f"{type(e).__name__}: {e}"
+        await self.refresh()
+
+    async def _init_cursor(self) -> None:
+        """Start tailing the changelog from its newest entry."""
+        cursor = await AsyncChangelogTail(self.client).seek_latest()
+        await asyncio.to_thread(self._set_cursor, cursor.last_id, cursor.last_time)
+
+    async def full_sync(self, object_type: str) -> int:
+        """
+        Replace the replica's copy of one object type.
+
+        Returns:
+            Number of objects stored
+        """
+        started = time.time()
+        endpoint = self.object_types[object_type]
+        batch: List[Dict[str, Any]] = []
+        seen: Set[int] = set()
+        async for obj in self.client.iter_objects(endpoint, page_size=1000):
+            batch.append(obj)
+            if len(batch) >= 1000:
+                seen.update(await asyncio.to_thread(self._upsert, object_type, batch))
+                batch = []
+        seen.update(await asyncio.to_thread(self._upsert, object_type, batch))
+        await asyncio.to_thread(self._prune, object_type, seen)
+        await asyncio.to_thread(self._mark_synced, object_type, started, full=True)
+        return len(seen)
+
+    async def refresh(self) -> None:
+        """Apply changes recorded since the changelog cursor."""
+        started = time.time()
+        cursor = await asyncio.to_thread(self._cursor)
+        tail = AsyncChangelogTail(self.client, cursor=ChangelogCursor(*cursor) if cursor else None)
+        changed: Set[str] = set()
+        deleted: List[Tuple[str, int]] = []
+        async for change in tail.iter_changes():
+            object_type = self.types_by_model.get(change.get("changed_object_type"))
+            if object_type is None:
+                continue
+            action = change.get("action")
+            action = action.get("value") if isinstance(action, dict) else action
+            if action == "delete":
+                deleted.append((object_type, change["changed_object_id"]))
+            else:
+                changed.add(object_type)
+        if deleted:
+            await asyncio.to_thread(self._delete, deleted)
+        state = await asyncio.to_thread(self._sync_state)
+        for object_type in changed:
+            watermark = state.get(object_type, (None,))[0]
+            params = {"last_updated__gte": watermark} if watermark else {}
+            batch = [obj async for obj in self.client.iter_objects(self.object_types[object_type], params=params)]
+            await asyncio.to_thread(self._upsert, object_type, batch)
+        await asyncio.to_thread(self._set_cursor, tail.cursor.last_id, tail.cursor.last_time)
+        for object_type, (_, last_full, _) in state.items():
+            # Types whose full sync never completed stay unservable
+            if last_full is not None and object_type in self.object_types:
+                await asyncio.to_thread(self._mark_synced, object_type, started, full=False)
+
+    def lag(self, object_type: str) -> Optional[float]:
+        """Seconds since the type was last synced, or None if it never was."""
+        with self._lock:
+            row = self.db.execute("SELECT last_sync FROM sync_state WHERE type = ?", (object_type,)).fetchone()
+        return time.time() - row[0] if row and row[0] else None
+
+    def status(self) -> Dict[str, Any]:
+        """Report per-type lag and row counts, and the changelog cursor."""
+        with self._lock:
+            counts = dict(self.db.execute("SELECT type, COUNT(*) FROM objects GROUP BY type").fetchall())
+            rows = self.db.execute("SELECT type, last_sync FROM sync_state").fetchall()
+        cursor = self._cursor()
+        now = time.time()
+        types = {t: {"objects": counts.get(t, 0), "lag": round(now - last_sync, 1) if last_sync else None}
+                 for t, last_sync in rows}
+        lags = [v["lag"] for v in types.values() if v["lag"] is not None]
+        return {
+            "max_lag": self.max_lag,
+            "lag": max(lags) if lags else None,
+            "synced_types": len(types),
+            "total_types": len(self.object_types),
+            "stale_types": sorted(t for t, v in types.items() if v["lag"] is None or v["lag"] > self.max_lag),
+            "changelog_cursor": cursor[0] if cursor else None,
+            "last_error": self.last_error,
+            "sync_errors": dict(self.sync_errors),
+            "types": types,
+        }
+
+    async def query(self, object_type: str, filters: Optional[Dict[str, Any]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Answer a filtered object query from the replica.
+
+        Returns:
+            Matching objects ordered by ID, or None if the type is stale or a
+            filter is not indexed and the caller should query NetBox instead
+        """
+        lag = self.lag(object_type)
+        if lag is None or lag > self.max_lag:
+            return None
+        filters = filters or {}
+        allowed = self.indexed_filters.get(object_type, set())
+        if any(key not in allowed for key in filters):
+            return None
+        return await asyncio.to_thread(self._query, object_type, filters)
+
+    def _query(self, object_type: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        sql = ["SELECT data FROM objects WHERE type = ?"]
+        args: List[Any] = [object_type]
+        for key, value in filters.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            placeholders = ",".join("?" * len(values))
+            sql.append(f"AND id IN (SELECT id FROM object_filters WHERE type = ? AND key = ? AND value IN ({placeholders}))")
+            args.extend([object_type, key, *(_text(v) for v in values)])
+        sql.append("ORDER BY id")
+        with self._lock:
+            rows = self.db.execute(" ".join(sql), args).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def _upsert(self, object_type: str, objects: List[Dict[str, Any]]) -> Set[int]:
+        if not objects:
+            return set()
+        keys = self.indexed_filters.get(object_type, set())
+        rows = []
+        filter_rows = []
+        for obj in objects:
+            rows.append((object_type, obj["id"], obj.get("last_updated"), json.dumps(obj)))
+            for key in keys:
+                for value in set(_index_values(obj, key)):
+                    filter_rows.append((object_type, obj["id"], key, value))
+        ids = [(object_type, obj["id"]) for obj in objects]
+        with self._lock, self.db:
+            self.db.executemany("DELETE FROM object_filters WHERE type = ? AND id = ?", ids)
+            self.db.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?)", rows)
+            self.db.executemany("INSERT INTO object_filters VALUES (?, ?, ?, ?)", filter_rows)
+            watermark = max((r[2] for r in rows if r[2]), default=None)
+            if watermark:
+                self.db.execute(
+                    "INSERT INTO sync_state (type, watermark) VALUES (?, ?) ON CONFLICT(type) DO UPDATE "
+                    "SET watermark = MAX(COALESCE(watermark, ''), excluded.watermark)",
+                    (object_type, watermark),
+                )
+        return {obj["id"] for obj in objects}
+
+    def _delete(self, objects: List[Tuple[str, int]]) -> None:
+        with self._lock, self.db:
+            self.db.executemany("DELETE FROM objects WHERE type = ? AND id = ?", objects)
+            self.db.executemany("DELETE FROM object_filters WHERE type = ? AND id = ?", objects)
+
+    def _prune(self, object_type: str, keep: Set[int]) -> None:
+        with self._lock:
+            existing = {row[0] for row in self.db.execute("SELECT id FROM objects WHERE type = ?", (object_type,))}
+        stale = [(object_type, id) for id in existing - keep]
+        if stale:
+            self._delete(stale)
+
+    def _mark_synced(self, object_type: str, started: float, full: bool) -> None:
+        with self._lock, self.db:
+            self.db.execute(
+                "INSERT INTO sync_state (type, last_sync, last_full_sync) VALUES (?, ?, ?) "
+                "ON CONFLICT(type) DO UPDATE SET last_sync = excluded.last_sync, "
+                "last_full_sync = COALESCE(excluded.last_full_sync, last_full_sync)",
+                (object_type, started, started if full else None),
+            )
+
+    def _sync_state(self) -> Dict[str, Tuple[Optional[str], Optional[float], Optional[float]]]:
+        with self._lock:
+            rows = self.db.execute("SELECT type, watermark, last_full_sync, last_sync FROM sync_state").fetchall()
+        return {t: (watermark, last_full, last_sync) for t, watermark, last_full, last_sync in rows}
+
+    def _cursor(self) -> Optional[Tuple[int, Optional[str]]]:
+        with self._lock:
+            row = self.db.execute("SELECT last_id, last_time FROM changelog_cursor").fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _set_cursor(self, last_id: int, last_time: Optional[str]) -> None:
+        with self._lock, self.db:
+            self.db.execute(
+                "INSERT INTO changelog_cursor VALUES (0, ?, ?) ON CONFLICT(singleton) DO UPDATE "
+                "SET last_id = excluded.last_id, last_time = excluded.last_time",
+                (last_id, last_time),
+            )
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+NetBox Request Scheduler
+
+This module coordinates the requests a process sends to one NetBox instance,
+so that bulk jobs do not starve interactive queries or trip NetBox's rate
+limits. Each HTTP attempt waits for a slot from a RequestScheduler, which
+enforces:
+
+- a token-bucket rate limit (requests per second with a burst allowance),
+- a cap on requests in flight, overall and per endpoint,
+- weighted fair queuing between priority classes: interactive requests are
+  served several times as often as batch requests, but batch work always
+  progresses,
+- round-robin between endpoints within a class, so a flood of requests to
+  one endpoint does not hold up the others.
+
+A request's class comes from the priority() context, which asyncio tasks
+inherit; bulk operations and background syncs run as BATCH. The scheduler
+works for the blocking and the asyncio clients alike.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional
+
+from netbox_metrics import Metrics
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# Share of slots each class receives while both are waiting
+DEFAULT_WEIGHTS = {INTERACTIVE: 4, BATCH: 1}
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("netbox_request_priority", default=INTERACTIVE)
+
+
+def current_priority() -> str:
+    """The priority class requests are sent with in the current context."""
+    return _priority.get()
+
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """
+    Send the requests made within the block with the given priority class.
+
+    Raises:
+        ValueError: If the class is unknown
+    """
+    if name not in DEFAULT_WEIGHTS:
+        raise ValueError(f"Unknown priority '{name}', expected one of {', '.join(DEFAULT_WEIGHTS)}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _Waiter:
+    """A request waiting for a slot."""
+
+    __slots__ = ("endpoint", "priority", "enqueued", "granted", "event", "loop")
+
+    def __init__(self, endpoint: str, priority: str):
+        self.endpoint = endpoint
+        self.priority = priority
+        self.enqueued = time.perf_counter()
+        self.granted = False
+        self.event: Any = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def wake(self) -> None:
+        """Wake the waiter to take its granted slot or to recheck the limits."""
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self.event.set)
+
+
+class RequestScheduler:
+    """
+    Priority-aware admission control for the requests sent to one NetBox instance.
+
+    Thread-safe; a blocking and an asyncio client may share one scheduler.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None,
+                 max_in_flight: Optional[int] = None, endpoint_limits: Optional[Dict[str, int]] = None,
+                 default_endpoint_limit: Optional[int] = None, weights: Optional[Dict[str, int]] = None,
+                 metrics: Optional[Metrics] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            rate: Requests per second allowed on average (unlimited if None)
+            burst: Requests that may be sent at once after an idle period (defaults to rate, at least 1)
+            max_in_flight: Requests in flight across all endpoints (unlimited if None)
+            endpoint_limits: Requests in flight per endpoint label (e.g. {"dcim/interfaces": 4})
+            default_endpoint_limit: Requests in flight for endpoints not in endpoint_limits
+            weights: Relative share of slots per priority class (DEFAULT_WEIGHTS by default)
+            metrics: Registry recording queue depth and wait times
+        """
+        self.rate = rate or None
+        self.burst = max(1, burst if burst is not None else int(rate or 1))
+        self.max_in_flight = max_in_flight
+        self.endpoint_limits = dict(endpoint_limits or {})
+        self.default_endpoint_limit = default_endpoint_limit
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {name: OrderedDict() for name in self.weights}
+        self._waiting = {name: 0 for name in self.weights}
+        self._pass = {name: 0.0 for name in self.weights}
+        self._in_flight = 0
+        self._in_flight_by_endpoint: Dict[str, int] = {}
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+
+    def _endpoint_limit(self, endpoint: str) -> Optional[int]:
+        return self.endpoint_limits.get(endpoint, self.default_endpoint_limit)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        name = waiter.priority
+        if not self._waiting[name]:
+            # A class returning from idle does not get credit for the time it was away
+            busy = [self._pass[other] for other, n in self._waiting.items() if n]
+            if busy:
+                self._pass[name] = max(self._pass[name], min(busy))
+        self._queues[name].setdefault(waiter.endpoint, deque()).append(waiter)
+        self._waiting[name] += 1
+        self._report_depth(name)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        flows = self._queues[waiter.priority]
+        queue = flows.get(waiter.endpoint)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del flows[waiter.endpoint]
+            self._waiting[waiter.priority] -= 1
+            self._report_depth(waiter.priority)
+
+    def _pick(self) -> Optional[_Waiter]:
+        """Pop the next waiter: the class furthest behind its share, then the next endpoint in turn."""
+        for name in sorted((n for n, count in self._waiting.items() if count), key=lambda n: self._pass[n]):
+            flows = self._queues[name]
+            for endpoint in list(flows):
+                limit = self._endpoint_limit(endpoint)
+                if limit is not None and self._in_flight_by_endpoint.get(endpoint, 0) >= limit:
+                    continue
+                queue = flows[endpoint]
+                waiter = queue.popleft()
+                if queue:
+                    flows.move_to_end(endpoint)
+                else:
+                    del flows[endpoint]
+                self._waiting[name] -= 1
+                self._pass[name] += 1.0 / self.weights[name]
+                self._report_depth(name)
+                return waiter
+        return None
+
+    def _dispatch(self) -> Optional[float]:
+        """
+        Grant slots to waiters while limits allow.
+
+        Returns:
+            Seconds until the next token if the rate limit is what holds waiters back, else None
+        """
+        while any(self._waiting.values()):
+            if self.max_in_flight is not None and self._in_flight >= self.max_in_flight:
+                return None
+            self._refill()
+            if self.rate and self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            waiter = self._pick()
+            if waiter is None:
+                return None
+            if self.rate:
+                self._tokens -= 1
+            self._in_flight += 1
+            self._in_flight_by_endpoint[waiter.endpoint] = self._in_flight_by_endpoint.get(waiter.endpoint, 0) + 1
+            waiter.granted = True
+            if self.metrics is not None:
+                self.metrics.record_queue_wait(waiter.priority, time.perf_counter() - waiter.enqueued)
+            waiter.wake()
+        return None
+
+    def _kick(self) -> None:
+        """Dispatch, and if the rate limit holds waiters back, wake one to wait for the next token."""
+        if self._dispatch() is not None:
+            for flows in self._queues.values():
+                for queue in flows.values():
+                    queue[0].wake()
+                    return
+
+    def _release(self, waiter: _Waiter) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            remaining = self._in_flight_by_endpoint[waiter.endpoint] - 1
+            if remaining:
+                self._in_flight_by_endpoint[waiter.endpoint] = remaining
+            else:
+                del self._in_flight_by_endpoint[waiter.endpoint]
+            self._kick()
+            self._report_in_flight()
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Withdraw a waiter whose request was interrupted."""
+        if waiter.granted:
+            self._release(waiter)
+            return
+        with self._lock:
+            self._remove(waiter)
+            self._kick()
+
+    def _report_depth(self, name: str) -> None:
+        if self.metrics is not None:
+            self.metrics.set_queue_depth(name, self._waiting[name])
+
+    def _report_in_flight(self) -> None:
+        if self.metrics is not None:
+            self.metrics.set_in_flight(self._in_flight)
+
+    @contextmanager
+    def slot(self, endpoint: str) -> Iterator[None]:
+        """Hold a slot for one request to an endpoint, blocking the thread until it is granted."""
+        waiter = _Waiter(endpoint, current_priority())
+        waiter.event = threading.Event()
+        with self._lock:
+            self._enqueue(waiter)
+            delay = self._dispatch()
+        try:
+            while not waiter.granted:
+                waiter.event.wait(delay)
+                waiter.event.clear()
+                with self._lock:
+                    delay = self._dispatch()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        with self._lock:
+            self._report_in_flight()
+        try:
+            yield
+        finally:
+            self._release(waiter)
+
+    @asynccontextmanager
+    async def aslot(self, endpoint: str) -> AsyncIterator[None]:
+        """Hold a slot for one request to an endpoint, awaiting it without blocking the event loop."""
+        waiter = _Waiter(endpoint, current_priority())
+        waiter.loop = asyncio.get_running_loop()
+        waiter.event = asyncio.Event()
+        with self._lock:
+            self._enqueue(waiter)
+            delay = self._dispatch()
+        try:
+            while not waiter.granted:
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                waiter.event.clear()
+                with self._lock:
+                    delay = self._dispatch()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        with self._lock:
+            self._report_in_flight()
+        try:
+            yield
+        finally:
+            self._release(waiter)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current queue depth per class, requests in flight and available tokens."""
+        with self._lock:
+            self._refill()
+            return {
+                "waiting": dict(self._waiting),
+                "in_flight": self._in_flight,
+                "in_flight_by_endpoint": dict(self._in_flight_by_endpoint),
+                "tokens": round(self._tokens, 2) if self.rate else None,
+                "rate": self.rate,
+                "max_in_flight": self.max_in_flight,
+            }
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+NetBox Schema Registry
+
+This module builds the object type and filter registry used by the MCP server
+from NetBox's OpenAPI schema (/api/schema/). The multi-megabyte schema is
+reduced to a compact JSON cache on disk, keyed by NetBox version, so startup
+only re-downloads it after an upgrade or once the cache expires.
+
+Lookups go through precomputed indexes: every accepted spelling of an object
+type (plural, singular, underscores, endpoint path, model label) maps straight
+to its canonical name, and each type's filters are held in a set.
+"""
+
+import json
+import os
+import time
+from difflib import get_close_matches
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+from urllib.parse import urlparse
+
+import requests
+
+# Query parameters that control the response rather than filter it
+NON_FILTER_PARAMS = {"limit", "offset", "ordering", "format", "brief", "fields", "exclude", "include"}
+
+# Endpoints whose model name cannot be derived from the URL
+MODEL_OVERRIDES = {
+    "virtualization/interfaces": "virtualization.vminterface",
+}
+
+# Filters whose value lives somewhere other than the same-named top-level field
+FILTER_PATHS = {
+    "manufacturer": "device_type.manufacturer",
+    "tag": "tags",
+    "type": "device_type",
+}
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "netbox-mcp")
+
+CACHE_FORMAT = 2
+
+# Misspelled object types whose fuzzy match is remembered per registry
+FUZZY_CACHE_SIZE = 256
+
+
+def singularize(resource: str) -> str:
+    """Turn a plural endpoint resource ('ip-addresses') into its singular ('ip-address')."""
+    if resource.endswith("ies"):
+        return resource[:-3] + "y"
+    if resource.endswith(("sses", "xes")):
+        return resource[:-2]
+    if resource.endswith("s") and not resource.endswith(("ss", "chassis")):
+        return resource[:-1]
+    return resource
+
+
+def model_label(endpoint: str) -> str:
+    """Derive NetBox's 'app_label.model' content type from a REST endpoint."""
+    if endpoint in MODEL_OVERRIDES:
+        return MODEL_OVERRIDES[endpoint]
+    app, _, resource = endpoint.partition("/")
+    return f"{app}.{singularize(resource).replace('-', '')}"
+
+
+def _response_fields(schema: Dict[str, Any], operation: Dict[str, Any]) -> List[str]:
+    """Top-level fields of the objects in a list operation's paginated response."""
+    components = schema.get("components", {}).get("schemas", {})
+
+    def resolve(node: Any) -> Dict[str, Any]:
+        while isinstance(node, dict) and "$ref" in node:
+            node = components.get(node["$ref"].rsplit("/", 1)[-1])
+        return node if isinstance(node, dict) else {}
+
+    content = operation.get("responses", {}).get("200", {}).get("content", {})
+    page = resolve(content.get("application/json", {}).get("schema"))
+    item = resolve(page.get("properties", {}).get("results", {}).get("items"))
+    return sorted(item.get("properties", {}))
+
+
+def parse_openapi(schema: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Extract list endpoints, their filter parameters and their objects' fields from an OpenAPI schema.
+
+    Returns:
+        Mapping of endpoint (e.g. 'dcim/devices') to {"filters": [...], "fields": [...]}
+    """
+    endpoints = {}
+    for path, operations in schema.get("paths", {}).items():
+        parts = path.strip("/").split("/")
+        if len(parts) != 3 or parts[0] != "api" or "{" in path:
+            continue
+        operation = operations.get("get")
+        if not operation:
+            continue
+        filters = sorted({
+            param["name"] for param in operation.get("parameters", [])
+            if param.get("in") == "query" and param.get("name") not in NON_FILTER_PARAMS
+        })
+        endpoints[f"{parts[1]}/{parts[2]}"] = {"filters": filters, "fields": _response_fields(schema, operation)}
+    return endpoints
+
+
+class SchemaRegistry:
+    """
+    Object types, their endpoints and valid filters, with O(1) lookup indexes.
+
+    A registry built only from the static tables knows the hand-maintained
+    types and filters; merging a parsed schema adds every list endpoint, its
+    full filter set and the fields of its objects.
+    """
+
+    def __init__(self, object_types: Dict[str, str], filters: Dict[str, Iterable[str]],
+                 schema_endpoints: Optional[Dict[str, Dict[str, Any]]] = None, version: Optional[str] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            object_types: Static mapping of object type name to API endpoint
+            filters: Static mapping of object type name to allowed filters
+            schema_endpoints: Endpoints parsed from the OpenAPI schema, if available
+            version: NetBox version the schema was read from
+        """
+        self.version = version
+        self.from_schema = schema_endpoints is not None
+        self.object_types: Dict[str, str] = dict(object_types)
+        self.filters: Dict[str, FrozenSet[str]] = {name: frozenset(f) for name, f in filters.items()}
+        self.fields: Dict[str, FrozenSet[str]] = {}
+        if schema_endpoints:
+            names_by_endpoint = {endpoint: name for name, endpoint in object_types.items()}
+            for endpoint, info in sorted(schema_endpoints.items()):
+                name = names_by_endpoint.get(endpoint)
+                if name is None:
+                    app, _, resource = endpoint.partition("/")
+                    name = resource if resource not in self.object_types else f"{app}-{resource}"
+                    self.object_types[name] = endpoint
+                self.filters[name] = frozenset(info["filters"]) | self.filters.get(name, frozenset())
+                if info.get("fields"):
+                    self.fields[name] = frozenset(info["fields"])
+        self.aliases: Dict[str, str] = {}
+        for name, endpoint in self.object_types.items():
+            for alias in self._aliases(name, endpoint):
+                self.aliases.setdefault(alias, name)
+        self._names = tuple(sorted(self.object_types))
+        # Per instance, so a registry replaced at startup is not kept alive by a shared cache
+        self._fuzzy_cache: Dict[str, Optional[str]] = {}
+
+    @staticmethod
+    def _aliases(name: str, endpoint: str) -> Set[str]:
+        label = model_label(endpoint)
+        singular = singularize(name)
+        return {
+            name, name.replace("-", "_"), singular, singular.replace("-", "_"),
+            endpoint, label, label.split(".", 1)[1],
+        }
+
+    def resolve(self, obj_type: str) -> str:
+        """
+        Map any accepted spelling of an object type to its canonical name.
+
+        Raises:
+            ValueError: If the type is unknown
+        """
+        key = obj_type.strip().strip("/").lower()
+        name = self.aliases.get(key) or self._fuzzy(key)
+        if name is None:
+            raise ValueError(f"Invalid object_type '{obj_type}'. Must be one of:\n" + "\n".join(self._names))
+        return name
+
+    def _fuzzy(self, key: str) -> Optional[str]:
+        if key in self._fuzzy_cache:
+            return self._fuzzy_cache[key]
+        close = get_close_matches(key, self._names, n=1, cutoff=0.8)
+        name = close[0] if close else None
+        if len(self._fuzzy_cache) < FUZZY_CACHE_SIZE:
+            self._fuzzy_cache[key] = name
+        return name
+
+    def endpoint(self, name: str) -> str:
+        return self.object_types[name]
+
+    def filters_for(self, name: str) -> FrozenSet[str]:
+        return self.filters.get(name, frozenset())
+
+    def fields_for(self, name: str) -> FrozenSet[str]:
+        """Top-level fields of the type's objects; empty if the schema did not describe them."""
+        return self.fields.get(name, frozenset())
+
+    def to_cache(self, schema_endpoints: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        return {"format": CACHE_FORMAT, "version": self.version, "fetched_at": time.time(),
+                "endpoints": schema_endpoints}
+
+
+def _netbox_version(api_url: str, headers: Dict[str, str], verify_ssl: bool) -> Optional[str]:
+    try:
+        response = requests.get(f"{api_url}/status/", headers=headers, verify=verify_ssl, timeout=10)
+        response.raise_for_status()
+        return response.json().get("netbox-version")
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def load_registry(url: str, token: str, object_types: Dict[str, str], filters: Dict[str, Iterable[str]],
+                  cache_path: Optional[str] = None, max_age: float = 7 * 86400,
+                  verify_ssl: bool = True) -> SchemaRegistry:
+    """
+    Build the registry from the cached or freshly downloaded OpenAPI schema.
+
+    The cache is reused while it is younger than max_age and matches the
+    running NetBox version. If the schema cannot be obtained, a stale cache or
+    finally the static tables are used instead.
+
+    Args:
+        url: The base URL of the NetBox instance
+        token: API token for authentication
+        object_types: Static mapping of object type name to API endpoint
+        filters: Static mapping of object type name to allowed filters
+        cache_path: Where the compact schema cache is stored (one file per host by default)
+        max_age: Seconds after which the cache is refreshed
+        verify_ssl: Whether to verify SSL certificates
+
+    Returns:
+        The schema registry
+    """
+    api_url = f"{url.rstrip('/')}/api"
+    if cache_path is None:
+        host = urlparse(url).netloc.replace(":", "_") or "netbox"
+        cache_path = os.path.join(DEFAULT_CACHE_DIR, f"schema-{host}.json")
+    headers = {"Authorization": f"Token {token}", "Accept": "application/json"}
+    cached = None
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        if cached.get("format") != CACHE_FORMAT:
+            cached = None
+    except (OSError, ValueError):
+        cached = None
+
+    version = _netbox_version(api_url, headers, verify_ssl)
+    if cached and time.time() - cached["fetched_at"] < max_age and (version is None or version == cached["version"]):
+        return SchemaRegistry(object_types, filters, cached["endpoints"], cached["version"])
+
+    try:
+        response = requests.get(f"{api_url}/schema/", params={"format": "json"}, headers=headers,
+                                verify=verify_ssl, timeout=60)
+        response.raise_for_status()
+        endpoints = parse_openapi(response.json())
+        if not endpoints:
+            raise ValueError("schema lists no endpoints")
+    except (requests.RequestException, ValueError):
+        if cached:
+            return SchemaRegistry(object_types, filters, cached["endpoints"], cached["version"])
+        return SchemaRegistry(object_types, filters)
+
+    registry = SchemaRegistry(object_types, filters, endpoints, version)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(f"{cache_path}.tmp", "w") as f:
+            json.dump(registry.to_cache(endpoints), f, separators=(",", ":"))
+        os.replace(f"{cache_path}.tmp", cache_path)
+    except OSError:
+        pass
+    return registry
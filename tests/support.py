@@ -0,0 +1,47 @@
+"""
+Shared fixtures: an in-process fake NetBox server per test class.
+
+Run the suite from the repository root with `python -m unittest discover -s tests -t .`
+(pytest collects the same tests).
+"""
+
+import threading
+import unittest
+from typing import Any, Dict, Optional
+
+from benchmarks.fake_netbox import Dataset, FakeNetBoxServer
+
+TOKEN = "0123456789abcdef0123456789abcdef01234567"
+
+
+class FakeNetBoxTestCase(unittest.TestCase):
+    """Serves a synthetic Dataset of `devices` devices for the tests of a class."""
+
+    devices = 250
+    handler: Optional[Any] = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = FakeNetBoxServer(Dataset(cls.devices))
+        if cls.handler is not None:
+            cls.server.RequestHandlerClass = cls.handler
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def setUp(self) -> None:
+        self.server.stats.reset()
+
+    def requests_sent(self, method: Optional[str] = None) -> int:
+        """Requests the server answered since the test started, optionally of one method."""
+        stats: Dict[str, Any] = self.server.stats.to_dict()
+        return stats["by_method"].get(method, 0) if method else stats["requests"]
+
+
+class AsyncFakeNetBoxTestCase(FakeNetBoxTestCase, unittest.IsolatedAsyncioTestCase):
+    """FakeNetBoxTestCase for coroutine tests."""
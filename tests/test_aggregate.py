@@ -0,0 +1,104 @@
+"""Group counts of netbox_aggregate, per plan."""
+
+import logging
+import unittest
+
+import netbox_server
+from netbox_client import AsyncNetBoxRestClient
+from netbox_schema import SchemaRegistry
+from tests.support import TOKEN, AsyncFakeNetBoxTestCase
+
+# The server module sets up DEBUG logging for FastMCP
+logging.getLogger().setLevel(logging.WARNING)
+
+# Devices 1..250 cycle through the statuses active, planned, offline by id % 3
+STATUSES = {"active": 83, "planned": 84, "offline": 83}
+
+
+class AggregateTest(AsyncFakeNetBoxTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.saved = netbox_server.netbox, netbox_server.registry
+        netbox_server.netbox = AsyncNetBoxRestClient(self.server.url, TOKEN)
+        netbox_server.registry = SchemaRegistry(netbox_server.NETBOX_OBJECT_TYPES,
+                                                {"devices": {"site", "site_id", "status", "q"}})
+
+    async def asyncTearDown(self) -> None:
+        await netbox_server.netbox.aclose()
+        netbox_server.netbox, netbox_server.registry = self.saved
+
+    async def test_total(self) -> None:
+        result = await netbox_server.netbox_aggregate("devices")
+        self.assertEqual(result["total"], self.devices)
+        self.assertEqual(result["plan"], "count")
+
+    async def test_count_per_group(self) -> None:
+        result = await netbox_server.netbox_aggregate("devices", group_by="site")
+        self.assertEqual(result["plan"], "count-per-group")
+        self.assertEqual(result["groups"], {"site-00001": 125, "site-00002": 125})
+
+    async def test_plans_agree(self) -> None:
+        counted = await netbox_server.netbox_aggregate("devices", group_by="status",
+                                                       group_values=list(STATUSES))
+        streamed = await netbox_server.netbox_aggregate("devices", group_by="status")
+        self.assertEqual(counted["plan"], "count-per-group")
+        self.assertEqual(streamed["plan"], "stream")
+        self.assertEqual(counted["groups"], STATUSES)
+        self.assertEqual(streamed["groups"], STATUSES)
+        self.assertEqual(sum(streamed["groups"].values()), streamed["total"])
+
+    async def test_nested_path(self) -> None:
+        result = await netbox_server.netbox_aggregate("devices", group_by="device_type.manufacturer")
+        self.assertEqual(result["plan"], "stream")
+        self.assertEqual(sum(result["groups"].values()), self.devices)
+        self.assertEqual(result["groups"]["vendor-1"], 62)
+
+    async def test_local_filter(self) -> None:
+        # Serial numbers ending in 0 belong to every tenth device, all in the second site
+        result = await netbox_server.netbox_aggregate("devices", filters={"serial__iew": "0"}, group_by="site")
+        self.assertEqual(result["plan"], "stream")
+        self.assertEqual(result["total"], 25)
+        self.assertEqual(result["groups"], {"site-00002": 25})
+
+
+VRFS = [{"id": 1, "name": "red"}, {"id": 2, "name": "blue"}]
+PREFIXES = [{"id": n, "prefix": f"10.{n}.0.0/16", "vrf": VRFS[n % 3] if n % 3 < 2 else None} for n in range(30)]
+
+
+class PrefixClient:
+    """Serves VRFs, which have no slug, and prefixes of which a third have no VRF."""
+
+    async def count(self, endpoint, params=None):
+        prefixes = PREFIXES
+        for key, value in (params or {}).items():
+            if key == "vrf_id":
+                prefixes = [p for p in prefixes if p["vrf"] and str(p["vrf"]["id"]) == str(value)]
+            elif key == "vrf" and value == "null":
+                prefixes = [p for p in prefixes if p["vrf"] is None]
+        return len(prefixes)
+
+    async def get(self, endpoint, params=None, **kwargs):
+        return VRFS
+
+    async def iter_objects(self, endpoint, params=None, page_size=None, max_objects=None):
+        for prefix in PREFIXES:
+            yield prefix
+
+
+class NullGroupTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        self.saved = netbox_server.netbox, netbox_server.registry
+        netbox_server.netbox = PrefixClient()
+        netbox_server.registry = SchemaRegistry(netbox_server.NETBOX_OBJECT_TYPES,
+                                                {"prefixes": {"vrf", "vrf_id", "q"}})
+
+    def tearDown(self) -> None:
+        netbox_server.netbox, netbox_server.registry = self.saved
+
+    async def test_plans_agree_on_unassigned_and_slugless_values(self) -> None:
+        counted = await netbox_server.netbox_aggregate("prefixes", group_by="vrf")
+        streamed = await netbox_server.netbox_aggregate("prefixes", group_by="vrf.name")
+        self.assertEqual(counted["plan"], "count-per-group")
+        self.assertEqual(counted["groups"], {"red": 10, "blue": 10, "null": 10})
+        self.assertEqual(streamed["groups"], counted["groups"])
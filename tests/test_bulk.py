@@ -0,0 +1,144 @@
+"""Chunked bulk operations with rows the server rejects."""
+
+import json
+import unittest
+
+from benchmarks.fake_netbox import FakeNetBoxHandler
+from netbox_bulk import BulkPlan
+from netbox_client import AsyncNetBoxRestClient, NetBoxRestClient
+from tests.support import TOKEN, AsyncFakeNetBoxTestCase, FakeNetBoxTestCase
+
+
+class RejectingHandler(FakeNetBoxHandler):
+    """
+    Answers 400 to any write that contains an object named 'bad...'.
+
+    Setting `write_status` on the server answers every write with that status instead.
+    """
+
+    def _write(self, endpoint, body):
+        status = getattr(self.server, "write_status", None)
+        if status:
+            return status, {"detail": "Refused."}
+        items = body if isinstance(body, list) else [body]
+        bad = [item["name"] for item in items if str(item.get("name", "")).startswith("bad")]
+        if bad:
+            return 400, {"name": [f"Invalid name: {json.dumps(bad)}"]}
+        return super()._write(endpoint, body)
+
+
+def sites(names):
+    return [{"name": name, "slug": name} for name in names]
+
+
+NAMES = [f"site-{n}" for n in range(10)]
+NAMES[5] = "bad-5"
+
+
+class BulkOperationTest(FakeNetBoxTestCase):
+    handler = RejectingHandler
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client = NetBoxRestClient(self.server.url, TOKEN, max_workers=2)
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.server.write_status = None
+
+    def test_partial_failure_isolates_bad_rows(self) -> None:
+        result = self.client.bulk_operation("create", "dcim/sites", sites(NAMES), chunk_size=4)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.succeeded, 9)
+        self.assertEqual(result.failed, 1)
+        failed = [c for c in result.chunks if c.status == "failed"]
+        self.assertEqual([(c.offset, c.size) for c in failed], [(5, 1)])
+        self.assertIn("400", failed[0].error)
+        # Created objects come back in input order, without the rejected one
+        self.assertEqual([r["name"] for r in result.results], [n for n in NAMES if n != "bad-5"])
+
+    def test_without_splitting_the_whole_chunk_fails(self) -> None:
+        result = self.client.bulk_operation("create", "dcim/sites", sites(NAMES), chunk_size=4,
+                                            split_on_error=False)
+        self.assertEqual(result.succeeded, 6)
+        self.assertEqual(result.failed, 4)
+
+    def test_rejected_rows_are_not_retried(self) -> None:
+        result = self.client.bulk_operation("create", "dcim/sites", sites(["bad-0"]), chunk_size=1)
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(self.requests_sent("POST"), 1)
+
+    def test_permission_error_fails_each_chunk_once(self) -> None:
+        self.server.write_status = 403
+        result = self.client.bulk_operation("create", "dcim/sites", sites(NAMES), chunk_size=4)
+        self.assertEqual(result.failed, len(NAMES))
+        self.assertEqual([c.status for c in result.chunks], ["failed"] * 3)
+        # One request per chunk: no splitting, no retries
+        self.assertEqual(self.requests_sent("POST"), 3)
+
+    def test_transient_delete_failures_are_retried_once_per_plan_attempt(self) -> None:
+        self.server.write_status = 503
+        result = self.client.bulk_operation("delete", "dcim/sites", [{"id": 1}], backoff=0)
+        self.assertEqual(result.chunks[0].attempts, 3)
+        # The transport does not retry bulk chunks on top of the plan
+        self.assertEqual(self.requests_sent("DELETE"), 3)
+
+    def test_bulk_delete_reports_failure(self) -> None:
+        self.assertTrue(self.client.bulk_delete("dcim/sites", [1, 2, 3]))
+        self.server.write_status = 404
+        self.assertFalse(self.client.bulk_delete("dcim/sites", [1, 2, 3]))
+
+    def test_all_rows_accepted(self) -> None:
+        result = self.client.bulk_operation("update", "dcim/sites",
+                                            [{"id": n, "description": "x"} for n in range(1, 8)], chunk_size=3)
+        self.assertTrue(result.ok)
+        self.assertEqual(len(result.chunks), 3)
+        self.assertEqual(self.requests_sent("PATCH"), 3)
+
+
+class AsyncBulkOperationTest(AsyncFakeNetBoxTestCase):
+    handler = RejectingHandler
+
+    async def asyncSetUp(self) -> None:
+        self.client = AsyncNetBoxRestClient(self.server.url, TOKEN, max_workers=2)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+        self.server.write_status = None
+
+    async def test_partial_failure_isolates_bad_rows(self) -> None:
+        result = await self.client.bulk_operation("create", "dcim/sites", sites(NAMES), chunk_size=4)
+        self.assertEqual(result.succeeded, 9)
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(len(result.results), 9)
+
+    async def test_permission_error_fails_each_chunk_once(self) -> None:
+        self.server.write_status = 403
+        result = await self.client.bulk_operation("create", "dcim/sites", sites(NAMES), chunk_size=4)
+        self.assertEqual(result.failed, len(NAMES))
+        self.assertEqual(self.requests_sent("POST"), 3)
+
+    async def test_transient_delete_failures_are_retried_once_per_plan_attempt(self) -> None:
+        self.server.write_status = 503
+        await self.client.bulk_operation("delete", "dcim/sites", [{"id": 1}], backoff=0)
+        self.assertEqual(self.requests_sent("DELETE"), 3)
+
+    async def test_bulk_delete_reports_failure(self) -> None:
+        self.assertTrue(await self.client.bulk_delete("dcim/sites", [1, 2, 3]))
+        self.server.write_status = 404
+        self.assertFalse(await self.client.bulk_delete("dcim/sites", [1, 2, 3]))
+
+
+class BulkPlanTest(unittest.TestCase):
+
+    def test_transient_failures_are_retried(self) -> None:
+        plan = BulkPlan("update", "dcim/sites", sites(NAMES[:2]), chunk_size=2, backoff=0)
+        chunk = plan.next_chunk()
+        plan.failed(chunk, 503, "Service Unavailable")
+        self.assertTrue(plan.has_work())
+        retry = plan.next_chunk()
+        self.assertEqual(retry.attempts, 2)
+        plan.succeeded(retry, [])
+        result = plan.finish()
+        self.assertTrue(result.ok)
+        self.assertTrue(result.chunks[0].retried)
@@ -0,0 +1,106 @@
+"""Response cache invalidation on writes, against the fake server."""
+
+import threading
+import time
+import unittest
+
+from netbox_cache import AsyncCachedNetBoxClient, CachedNetBoxClient
+from netbox_client import AsyncNetBoxRestClient, NetBoxRestClient
+from netbox_metrics import Metrics
+from tests.support import TOKEN, AsyncFakeNetBoxTestCase, FakeNetBoxTestCase
+
+
+class CachedNetBoxClientTest(FakeNetBoxTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.inner = NetBoxRestClient(self.server.url, TOKEN)
+        self.client = CachedNetBoxClient(self.inner)
+
+    def tearDown(self) -> None:
+        self.inner.close()
+
+    def test_repeated_reads_are_served_from_cache(self) -> None:
+        first = self.client.get("dcim/sites")
+        second = self.client.get("dcim/sites")
+        self.assertEqual(first, second)
+        self.assertEqual(self.requests_sent("GET"), 1)
+        self.assertGreater(self.client.cache.stats()["bytes"], 0)
+
+    def test_write_invalidates_the_endpoint(self) -> None:
+        self.client.get("dcim/sites")
+        self.client.get("dcim/sites", id=1)
+        self.client.get("dcim/devices", id=1)
+        self.client.update("dcim/sites", 1, {"description": "changed"})
+        self.client.get("dcim/sites")
+        self.client.get("dcim/sites", id=1)
+        self.client.get("dcim/devices", id=1)
+        # Both site reads are refetched; the device read is still cached
+        self.assertEqual(self.requests_sent("GET"), 5)
+        self.assertEqual(self.requests_sent("PATCH"), 1)
+
+    def test_create_and_delete_invalidate(self) -> None:
+        self.client.get("dcim/sites")
+        self.client.create("dcim/sites", {"name": "new", "slug": "new"})
+        self.client.get("dcim/sites")
+        self.client.delete("dcim/sites", 1)
+        self.client.get("dcim/sites")
+        self.assertEqual(self.requests_sent("GET"), 3)
+
+    def test_bulk_write_invalidates(self) -> None:
+        self.client.get("dcim/devices", id=1)
+        self.client.bulk_update("dcim/devices", [{"id": 1, "description": "changed"}])
+        self.client.get("dcim/devices", id=1)
+        self.assertEqual(self.requests_sent("GET"), 2)
+
+
+class SlowClient:
+    """A client whose reads take a while, so that a write can land while one is in flight."""
+
+    def __init__(self):
+        self.value = "old"
+        self.metrics = Metrics()
+
+    def get(self, endpoint, id=None, params=None, max_objects=None, page_size=None):
+        value = self.value
+        time.sleep(0.2)
+        self.metrics.record_request("GET", endpoint, 200, 0.2, bytes_in=1234)
+        return [{"value": value}]
+
+    def update(self, endpoint, id, data):
+        self.value = "new"
+        return {"id": id}
+
+
+class CacheGenerationTest(unittest.TestCase):
+
+    def test_read_overlapping_a_write_is_not_cached(self) -> None:
+        client = CachedNetBoxClient(SlowClient())
+        reader = threading.Thread(target=client.get, args=("dcim/sites",))
+        reader.start()
+        time.sleep(0.05)
+        client.update("dcim/sites", 1, {})
+        reader.join()
+        self.assertEqual(client.get("dcim/sites"), [{"value": "new"}])
+
+    def test_entry_size_is_the_response_size(self) -> None:
+        client = CachedNetBoxClient(SlowClient())
+        client.get("dcim/sites")
+        self.assertEqual(client.cache.stats()["bytes"], 1234)
+
+
+class AsyncCachedNetBoxClientTest(AsyncFakeNetBoxTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.inner = AsyncNetBoxRestClient(self.server.url, TOKEN)
+        self.client = AsyncCachedNetBoxClient(self.inner)
+
+    async def asyncTearDown(self) -> None:
+        await self.inner.aclose()
+
+    async def test_write_invalidates_the_endpoint(self) -> None:
+        await self.client.get("dcim/sites")
+        await self.client.get("dcim/sites")
+        await self.client.update("dcim/sites", 1, {"description": "changed"})
+        await self.client.get("dcim/sites")
+        self.assertEqual(self.requests_sent("GET"), 2)
@@ -0,0 +1,139 @@
+"""Cursor-based changelog tailing over an in-memory changelog."""
+
+import logging
+import unittest
+
+import netbox_server
+from netbox_changelog import AsyncChangelogTail, ChangelogCursor, ChangelogTail
+
+# The server module sets up DEBUG logging for FastMCP
+logging.getLogger().setLevel(logging.WARNING)
+
+
+def change(id):
+    return {"id": id, "time": f"2024-01-01T00:{id // 60:02d}:{id % 60:02d}Z", "action": "update"}
+
+
+class ChangelogClient:
+    """Serves core/object-changes from a list; records whether each scan was closed."""
+
+    def __init__(self, count):
+        self.changes = [change(n) for n in range(1, count + 1)]
+        self.scans = []
+
+    def _select(self, params):
+        after = int(params.get("id__gt", 0))
+        return [c for c in self.changes if c["id"] > after]
+
+    def get(self, endpoint, params=None, max_objects=None):
+        newest = sorted(self.changes, key=lambda c: -c["id"]) if params.get("ordering") == "-id" else self.changes
+        return newest[:max_objects]
+
+    def iter_objects(self, endpoint, params=None, page_size=None):
+        scan = {"closed": False}
+        self.scans.append(scan)
+        try:
+            yield from self._select(params)
+        finally:
+            scan["closed"] = True
+
+
+class AsyncChangelogClient(ChangelogClient):
+
+    async def get(self, endpoint, params=None, max_objects=None):
+        return ChangelogClient.get(self, endpoint, params, max_objects)
+
+    async def iter_objects(self, endpoint, params=None, page_size=None):
+        scan = {"closed": False}
+        self.scans.append(scan)
+        try:
+            for item in self._select(params):
+                yield item
+        finally:
+            scan["closed"] = True
+
+
+class ChangelogCursorTest(unittest.TestCase):
+
+    def test_token_round_trip(self) -> None:
+        cursor = ChangelogCursor(42, "2024-01-01T00:00:42Z")
+        self.assertEqual(ChangelogCursor.from_token(cursor.to_token()), cursor)
+        self.assertEqual(ChangelogCursor.from_token("7:"), ChangelogCursor(7, None))
+
+    def test_invalid_token(self) -> None:
+        with self.assertRaises(ValueError):
+            ChangelogCursor.from_token("latest")
+
+    def test_params(self) -> None:
+        self.assertEqual(ChangelogCursor().params(), {"ordering": "id"})
+        self.assertEqual(ChangelogCursor(5, "t").params(), {"ordering": "id", "id__gt": 5, "time__gte": "t"})
+
+    def test_accept_skips_seen_changes(self) -> None:
+        cursor = ChangelogCursor(5)
+        self.assertFalse(cursor.accept(change(5)))
+        self.assertTrue(cursor.accept(change(6)))
+        self.assertEqual(cursor.last_id, 6)
+
+
+class ChangelogTailTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.client = ChangelogClient(20)
+        self.tail = ChangelogTail(self.client)
+
+    def test_fetch_advances_the_cursor(self) -> None:
+        self.assertEqual([c["id"] for c in self.tail.fetch()], list(range(1, 21)))
+        self.assertFalse(self.tail.truncated)
+        self.assertEqual(self.tail.cursor.last_id, 20)
+        self.assertEqual(self.tail.fetch(), [])
+
+    def test_truncation_resumes_after_the_last_change_returned(self) -> None:
+        self.assertEqual([c["id"] for c in self.tail.fetch(max_entries=5)], [1, 2, 3, 4, 5])
+        self.assertTrue(self.tail.truncated)
+        self.assertEqual([c["id"] for c in self.tail.fetch(max_entries=15)], list(range(6, 21)))
+        self.assertFalse(self.tail.truncated)
+
+    def test_truncation_closes_the_scan(self) -> None:
+        self.tail.fetch(max_entries=5)
+        self.assertEqual(self.client.scans, [{"closed": True}])
+
+    def test_seek_latest(self) -> None:
+        self.tail.seek_latest()
+        self.assertEqual(self.tail.fetch(), [])
+        self.client.changes.append(change(21))
+        self.assertEqual([c["id"] for c in self.tail.fetch()], [21])
+
+    def test_wait_times_out(self) -> None:
+        self.tail.seek_latest()
+        tail = ChangelogTail(self.client, cursor=self.tail.cursor, poll_interval=0.01)
+        self.assertEqual(tail.wait(0.05), [])
+        self.assertGreater(tail.polls, 1)
+
+
+class AsyncChangelogTailTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        self.client = AsyncChangelogClient(20)
+        self.tail = AsyncChangelogTail(self.client)
+
+    async def test_truncation_closes_the_scan(self) -> None:
+        self.assertEqual([c["id"] for c in await self.tail.fetch(max_entries=5)], [1, 2, 3, 4, 5])
+        self.assertTrue(self.tail.truncated)
+        self.assertEqual(self.client.scans, [{"closed": True}])
+        self.assertEqual(len(await self.tail.fetch()), 15)
+
+    async def test_tail_tool_pages_with_its_cursor(self) -> None:
+        saved = netbox_server.netbox
+        netbox_server.netbox = self.client
+        try:
+            first = await netbox_server.netbox_tail_changelogs(since="2024-01-01T00:00:00Z", limit=8)
+            second = await netbox_server.netbox_tail_changelogs(cursor=first["cursor"], limit=100)
+            latest = await netbox_server.netbox_tail_changelogs()
+        finally:
+            netbox_server.netbox = saved
+        self.assertEqual(len(first["changes"]), 8)
+        self.assertTrue(first["more"])
+        self.assertEqual([c["id"] for c in second["changes"]], list(range(9, 21)))
+        self.assertFalse(second["more"])
+        self.assertEqual(latest["changes"], [])
+        self.assertEqual(latest["cursor"], second["cursor"])
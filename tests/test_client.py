@@ -0,0 +1,139 @@
+"""Pagination, max_objects and early close of the REST clients against the fake server."""
+
+import asyncio
+import time
+
+from netbox_client import AsyncNetBoxRestClient, NetBoxRestClient
+from tests.support import TOKEN, AsyncFakeNetBoxTestCase, FakeNetBoxTestCase
+
+
+class NetBoxRestClientTest(FakeNetBoxTestCase):
+    stream_json = False
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client = NetBoxRestClient(self.server.url, TOKEN, max_workers=2, stream_json=self.stream_json)
+
+    def tearDown(self) -> None:
+        self.client.close()
+
+    def test_get_returns_every_page(self) -> None:
+        devices = self.client.get("dcim/devices", page_size=50)
+        self.assertEqual([d["id"] for d in devices], list(range(1, self.devices + 1)))
+        self.assertEqual(self.requests_sent(), 5)
+
+    def test_get_pages_a_partial_last_page(self) -> None:
+        devices = self.client.get("dcim/devices", page_size=60)
+        self.assertEqual(len(devices), self.devices)
+        self.assertEqual(len({d["id"] for d in devices}), self.devices)
+
+    def test_get_passes_filters(self) -> None:
+        devices = self.client.get("dcim/devices", params={"site_id": 2}, page_size=50)
+        self.assertEqual(len(devices), self.devices // 2)
+        self.assertTrue(all(d["site"]["id"] == 2 for d in devices))
+
+    def test_count(self) -> None:
+        self.assertEqual(self.client.count("dcim/devices"), self.devices)
+        self.assertEqual(self.client.count("dcim/interfaces", {"device_id": 3}), 8)
+
+    def test_max_objects(self) -> None:
+        devices = self.client.get("dcim/devices", max_objects=30, page_size=10)
+        self.assertEqual([d["id"] for d in devices], list(range(1, 31)))
+        self.assertEqual(self.requests_sent(), 3)
+
+    def test_max_objects_without_page_size_is_one_request(self) -> None:
+        devices = self.client.get("dcim/devices", max_objects=7)
+        self.assertEqual(len(devices), 7)
+        self.assertEqual(self.requests_sent(), 1)
+
+    def test_limit_param_caps_the_result(self) -> None:
+        devices = self.client.get("dcim/devices", params={"limit": 5})
+        self.assertEqual([d["id"] for d in devices], [1, 2, 3, 4, 5])
+        self.assertEqual(self.requests_sent(), 1)
+        self.assertEqual(len(self.client.get("dcim/devices", params={"limit": 5}, max_objects=3)), 3)
+
+    def test_limit_param_with_page_size_is_ignored(self) -> None:
+        devices = self.client.get("dcim/devices", params={"limit": 5}, page_size=100)
+        self.assertEqual(len(devices), self.devices)
+
+    def test_closing_iterator_stops_paging(self) -> None:
+        objects = self.client.iter_objects("dcim/devices", page_size=10)
+        first = [next(objects) for _ in range(5)]
+        objects.close()
+        self.assertEqual([d["id"] for d in first], [1, 2, 3, 4, 5])
+        time.sleep(0.1)
+        sent = self.requests_sent()
+        # The first page and at most max_workers prefetched pages, not all 25
+        self.assertLessEqual(sent, 1 + self.client.max_workers)
+        time.sleep(0.1)
+        self.assertEqual(self.requests_sent(), sent)
+
+    def test_single_object(self) -> None:
+        device = self.client.get("dcim/devices", id=42)
+        self.assertEqual(device["name"], "device-0000042")
+
+
+class StreamingNetBoxRestClientTest(NetBoxRestClientTest):
+    stream_json = True
+
+
+class AsyncNetBoxRestClientTest(AsyncFakeNetBoxTestCase):
+    stream_json = False
+
+    async def asyncSetUp(self) -> None:
+        self.client = AsyncNetBoxRestClient(self.server.url, TOKEN, max_workers=2, stream_json=self.stream_json)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_get_returns_every_page(self) -> None:
+        devices = await self.client.get("dcim/devices", page_size=50)
+        self.assertEqual([d["id"] for d in devices], list(range(1, self.devices + 1)))
+        self.assertEqual(self.requests_sent(), 5)
+
+    async def test_max_objects(self) -> None:
+        devices = await self.client.get("dcim/devices", max_objects=30, page_size=10)
+        self.assertEqual([d["id"] for d in devices], list(range(1, 31)))
+        self.assertEqual(self.requests_sent(), 3)
+
+    async def test_limit_param_caps_the_result(self) -> None:
+        devices = await self.client.get("dcim/devices", params={"limit": 5})
+        self.assertEqual([d["id"] for d in devices], [1, 2, 3, 4, 5])
+        self.assertEqual(self.requests_sent(), 1)
+
+    async def test_closing_iterator_stops_paging(self) -> None:
+        objects = self.client.iter_objects("dcim/devices", page_size=10)
+        first = [await anext(objects) for _ in range(5)]
+        await objects.aclose()
+        self.assertEqual([d["id"] for d in first], [1, 2, 3, 4, 5])
+        sent = self.requests_sent()
+        self.assertLessEqual(sent, 1 + self.client.max_workers)
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.requests_sent(), sent)
+
+    async def test_closing_after_a_prefetch_was_cancelled(self) -> None:
+        client = self.client
+
+        async def get_page(url, params=None):
+            if params and params.get("offset", 0) >= 20:
+                raise asyncio.CancelledError()
+            return await type(client)._get_page(client, url, params)
+
+        client._get_page = get_page
+        objects = client.iter_objects("dcim/devices", page_size=10)
+        # Into the second page, with the prefetches of the next ones pending
+        for _ in range(11):
+            await anext(objects)
+        # Let the prefetches finish, cancelled
+        await asyncio.sleep(0.05)
+        await objects.aclose()
+
+    async def test_concurrent_identical_gets_are_coalesced(self) -> None:
+        results = await asyncio.gather(*(self.client.get("dcim/sites") for _ in range(5)))
+        self.assertTrue(all(r == results[0] for r in results))
+        self.assertEqual(self.requests_sent(), 1)
+        self.assertEqual(self.client.coalesced_requests, 4)
+
+
+class StreamingAsyncNetBoxRestClientTest(AsyncNetBoxRestClientTest):
+    stream_json = True
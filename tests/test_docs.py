@@ -0,0 +1,115 @@
+"""The BM25 documentation index, built over small sources."""
+
+import json
+import math
+import os
+import tempfile
+import unittest
+
+from netbox_docs import B, K1, TITLE_WEIGHT, DocsIndex, open_index, split_api, split_markdown, tokenize
+
+GUIDE = """# Devices
+
+A device is a piece of hardware installed in a rack.
+
+## Interfaces
+
+Devices have interfaces. Filter interfaces of a device with device_id.
+
+```
+# Not a heading
+curl /api/dcim/interfaces/?device_id=1
+```
+
+# Sites
+
+A site is a building or campus. Racks stand in sites.
+"""
+
+API = """# API reference
+
+- **GET /api/dcim/sites/**
+  List sites. Filters: name, slug, region.
+- **GET /api/dcim/devices/**
+  List devices. Filters: site_id, role, status.
+"""
+
+KB = [{"question": "How do I find a VLAN?", "answer": "Query ipam/vlans with the vid filter."}]
+
+SOURCES = {"guide.md": "markdown", "api.md": "api", "kb.json": "kb"}
+
+
+class TokenizeTest(unittest.TestCase):
+
+    def test_identifiers_keep_their_parts(self) -> None:
+        self.assertEqual(tokenize("Filter by site_id"), ["filter", "site_id", "site", "id"])
+
+    def test_stopwords_and_plurals(self) -> None:
+        self.assertEqual(tokenize("the devices in racks"), ["device", "rack"])
+
+
+class SplitTest(unittest.TestCase):
+
+    def test_markdown_sections_carry_their_heading_path(self) -> None:
+        sections = dict(split_markdown(GUIDE))
+        self.assertEqual(list(sections), ["Devices", "Devices > Interfaces", "Sites"])
+        self.assertIn("# Not a heading", sections["Devices > Interfaces"])
+
+    def test_api_sections_per_endpoint(self) -> None:
+        self.assertEqual([title for title, _ in split_api(API)], ["GET /api/dcim/sites/", "GET /api/dcim/devices/"])
+
+
+class DocsIndexTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.data_dir = directory.name
+        for name, content in [("guide.md", GUIDE), ("api.md", API), ("kb.json", json.dumps(KB))]:
+            with open(os.path.join(self.data_dir, name), "w") as f:
+                f.write(content)
+        self.path = os.path.join(self.data_dir, "docs.index")
+        self.index = open_index(self.path, self.data_dir, SOURCES)
+        self.addCleanup(lambda: self.index.close())
+
+    def test_best_section_first(self) -> None:
+        results = self.index.search("interfaces of a device")
+        self.assertEqual(results[0]["title"], "Devices > Interfaces")
+        self.assertIn("device_id", results[0]["snippet"])
+        self.assertEqual(self.index.search("vlan vid")[0]["source"], "kb.json")
+
+    def test_title_terms_count_with_their_weight(self) -> None:
+        body = dict(split_markdown(GUIDE))["Sites"]
+        section = next(s for s in self.index.sections if s[1] == "Sites")
+        self.assertEqual(section[4], len(tokenize(body)) + TITLE_WEIGHT)
+
+    def test_bm25_score(self) -> None:
+        result = self.index.search("campus")[0]
+        section = next(s for s in self.index.sections if s[1] == "Sites")
+        n, tf, length = len(self.index.sections), 1, section[4]
+        idf = math.log(1 + (n - 1 + 0.5) / (1 + 0.5))
+        expected = idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / self.index.avgdl))
+        self.assertEqual(result["score"], round(expected, 3))
+
+    def test_source_filter_and_limit(self) -> None:
+        results = self.index.search("devices", source="api.md")
+        self.assertEqual({r["source"] for r in results}, {"api.md"})
+        self.assertEqual(len(self.index.search("devices", limit=1)), 1)
+        self.assertEqual(self.index.search("nonexistentterm"), [])
+
+    def test_section_text_round_trips(self) -> None:
+        texts = [self.index.text(i) for i in range(len(self.index.sections))]
+        self.assertIn("Query ipam/vlans with the vid filter.", texts)
+
+    def test_changed_source_rebuilds_the_index(self) -> None:
+        self.assertFalse(self.index.is_stale(self.data_dir))
+        with open(os.path.join(self.data_dir, "guide.md"), "a") as f:
+            f.write("\n# Cables\n\nCables connect interfaces with patch panels.\n")
+        self.assertTrue(self.index.is_stale(self.data_dir))
+        self.index.close()
+        self.index = open_index(self.path, self.data_dir, SOURCES)
+        self.assertEqual(self.index.search("patch panels")[0]["title"], "Cables")
+
+    def test_other_files_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            DocsIndex(os.path.join(self.data_dir, "api.md"))
@@ -0,0 +1,126 @@
+"""Exports written by the clients and read back."""
+
+import json
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import netbox_server
+from benchmarks.fake_netbox import Dataset
+from netbox_client import AsyncNetBoxRestClient, NetBoxRestClient
+from netbox_export import ExportWriter, pyarrow
+from netbox_schema import SchemaRegistry
+from tests.support import TOKEN, AsyncFakeNetBoxTestCase, FakeNetBoxTestCase
+
+# The server module sets up DEBUG logging for FastMCP
+logging.getLogger().setLevel(logging.WARNING)
+
+
+def read_ndjson(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class ExportDirMixin:
+    """A temporary directory per test, as self.directory."""
+
+    @property
+    def directory(self) -> str:
+        if not hasattr(self, "_directory"):
+            directory = tempfile.TemporaryDirectory()
+            self.addCleanup(directory.cleanup)
+            self._directory = directory.name
+        return self._directory
+
+
+class ExportWriterTest(ExportDirMixin, unittest.TestCase):
+
+    def test_batches_round_trip(self) -> None:
+        objects = [{"id": n, "name": f"é-{n}", "site": {"id": 1}, "tags": [], "serial": None} for n in range(7)]
+        writer = ExportWriter(os.path.join(self.directory, "out.ndjson"), endpoint="dcim/devices", batch_rows=3)
+        flushes = 0
+        for obj in objects:
+            if writer.add(obj):
+                writer.flush()
+                flushes += 1
+        result = writer.close()
+        self.assertEqual(flushes, 2)
+        self.assertEqual(read_ndjson(result.path), objects)
+        self.assertEqual(result.rows, 7)
+        self.assertEqual(result.schema, {"id": "int", "name": "string", "site": "object", "tags": "list",
+                                         "serial": "null"})
+        self.assertEqual(os.listdir(self.directory), ["out.ndjson"])
+
+    def test_empty_export_leaves_an_empty_file(self) -> None:
+        result = ExportWriter(os.path.join(self.directory, "out.ndjson")).close()
+        self.assertEqual((result.rows, result.bytes), (0, 0))
+
+    def test_abort_leaves_nothing_behind(self) -> None:
+        writer = ExportWriter(os.path.join(self.directory, "out.ndjson"), batch_rows=1)
+        writer.add({"id": 1})
+        writer.flush()
+        writer.abort()
+        self.assertEqual(os.listdir(self.directory), [])
+
+    @unittest.skipIf(pyarrow is not None, "pyarrow is installed")
+    def test_columnar_formats_need_pyarrow(self) -> None:
+        with self.assertRaises(ImportError):
+            ExportWriter(os.path.join(self.directory, "out.parquet"), "parquet")
+
+
+class ClientExportTest(ExportDirMixin, FakeNetBoxTestCase):
+
+    def test_every_page_is_written(self) -> None:
+        client = NetBoxRestClient(self.server.url, TOKEN)
+        self.addCleanup(client.close)
+        path = os.path.join(self.directory, "devices.ndjson")
+        result = client.export("dcim/devices", path, page_size=100)
+        dataset = Dataset(self.devices)
+        self.assertEqual(read_ndjson(path), [dataset.render("dcim/devices", n) for n in range(1, self.devices + 1)])
+        self.assertEqual(result.rows, self.devices)
+        self.assertEqual(self.requests_sent(), 3)
+
+    def test_fields_and_predicate(self) -> None:
+        client = NetBoxRestClient(self.server.url, TOKEN)
+        self.addCleanup(client.close)
+        path = os.path.join(self.directory, "devices.ndjson")
+        result = client.export("dcim/devices", path, params={"site_id": 1}, fields=["id", "name"],
+                               where=lambda obj: obj["id"] % 10 == 1)
+        rows = read_ndjson(path)
+        self.assertEqual([set(row) for row in rows], [{"id", "name"}] * result.rows)
+        self.assertEqual([row["id"] for row in rows], list(range(1, self.devices + 1, 10)))
+
+
+class AsyncClientExportTest(ExportDirMixin, AsyncFakeNetBoxTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.client = AsyncNetBoxRestClient(self.server.url, TOKEN)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_every_page_is_written(self) -> None:
+        path = os.path.join(self.directory, "devices.ndjson")
+        result = await self.client.export("dcim/devices", path, page_size=100, max_objects=120)
+        self.assertEqual([row["id"] for row in read_ndjson(path)], list(range(1, 121)))
+        self.assertEqual(result.rows, 120)
+
+    async def test_export_tool(self) -> None:
+        saved = netbox_server.netbox, netbox_server.registry
+        netbox_server.netbox = self.client
+        netbox_server.registry = SchemaRegistry(netbox_server.NETBOX_OBJECT_TYPES, {"devices": {"site_id"}})
+        try:
+            with mock.patch.dict(os.environ, {"NETBOX_EXPORT_DIR": self.directory}):
+                result = await netbox_server.netbox_export(["devices"], filters={"site_id": 2, "role": "router"},
+                                                           fields=["id", "role"])
+        finally:
+            netbox_server.netbox, netbox_server.registry = saved
+        export = result["exports"]["devices"]
+        rows = read_ndjson(export["path"])
+        # Devices 3, 8, 13, ... are routers; the even ones are in site 2
+        self.assertEqual([row["id"] for row in rows], [n for n in range(1, self.devices + 1) if n % 10 == 8])
+        self.assertEqual(set(rows[0]), {"id", "role"})
+        self.assertEqual(result["rows"], len(rows))
+        self.assertEqual(export["schema"], {"id": "int", "role": "object"})
@@ -0,0 +1,70 @@
+"""Admission and draining of tool calls on the shared HTTP server."""
+
+import asyncio
+import unittest
+
+from netbox_http import GatedFastMCP, ToolGate
+
+
+class ToolGateTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_drain_waits_for_running_calls_and_rejects_new_ones(self) -> None:
+        gate = ToolGate(max_concurrent=2)
+        release = asyncio.Event()
+
+        async def call() -> str:
+            async with gate.slot():
+                await release.wait()
+            return "done"
+
+        running = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        draining = asyncio.create_task(gate.drain(timeout=5))
+        await asyncio.sleep(0)
+        self.assertFalse(draining.done())
+        with self.assertRaisesRegex(RuntimeError, "shutting down"):
+            async with gate.slot():
+                pass
+        release.set()
+        self.assertEqual(await running, "done")
+        self.assertTrue(await draining)
+        self.assertEqual(gate.stats(), {"max_concurrent": 2, "active": 0, "waiting": 0, "completed": 1,
+                                        "rejected": 1, "draining": True})
+
+    async def test_drain_times_out(self) -> None:
+        gate = ToolGate()
+        async with gate.slot():
+            self.assertFalse(await gate.drain(timeout=0.01))
+
+    async def test_calls_beyond_the_limit_wait_then_are_rejected(self) -> None:
+        gate = ToolGate(max_concurrent=1, queue_timeout=0.05)
+        async with gate.slot():
+            with self.assertRaisesRegex(RuntimeError, "More than 1 tool calls"):
+                async with gate.slot():
+                    pass
+            self.assertEqual(gate.waiting, 0)
+        # The slot is free again
+        async with gate.slot():
+            self.assertEqual(gate.active, 1)
+        self.assertEqual(gate.rejected, 1)
+
+
+class GatedFastMCPTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_tool_calls_pass_through_the_gate(self) -> None:
+        mcp = GatedFastMCP("test")
+        seen = []
+
+        @mcp.tool()
+        async def probe() -> int:
+            seen.append(mcp.gate.active if mcp.gate else None)
+            return 1
+
+        await mcp.call_tool("probe", {})
+        mcp.gate = ToolGate()
+        await mcp.call_tool("probe", {})
+        self.assertEqual(seen, [None, 1])
+        await mcp.gate.drain(timeout=1)
+        with self.assertRaises(RuntimeError):
+            await mcp.call_tool("probe", {})
+        self.assertEqual(seen, [None, 1])
@@ -0,0 +1,31 @@
+"""OpenAI tool definitions generated from the MCP server's tool list."""
+
+import logging
+import subprocess
+import sys
+import unittest
+
+import netbox_server
+from openai_netbox_client import OBJECT_TYPE_TOOL, build_openai_tools, object_types_of
+
+# The server module sets up DEBUG logging for FastMCP
+logging.getLogger().setLevel(logging.WARNING)
+
+
+class OpenAIToolsTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_object_type_enum_comes_from_the_tool_list(self) -> None:
+        netbox_server.mcp.set_enum(OBJECT_TYPE_TOOL, "object_type", ["vlans", "devices"])
+        schema = netbox_server.mcp._tool_manager.get_tool(OBJECT_TYPE_TOOL).parameters
+        self.addCleanup(schema["properties"]["object_type"].pop, "enum")
+        mcp_tools = await netbox_server.mcp.list_tools()
+        self.assertEqual(object_types_of(mcp_tools), ["devices", "vlans"])
+        tools = {t["function"]["name"]: t["function"]["parameters"] for t in build_openai_tools(mcp_tools)}
+        self.assertEqual(tools[OBJECT_TYPE_TOOL]["properties"]["object_type"]["enum"], ["devices", "vlans"])
+        # The other tools refer to it instead of repeating the list
+        self.assertNotIn("enum", tools["netbox_aggregate"]["properties"]["object_type"])
+
+    def test_importing_the_client_leaves_the_server_module_alone(self) -> None:
+        code = "import sys, openai_netbox_client; print('netbox_server' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "False")
@@ -0,0 +1,147 @@
+"""Local predicates and query plans, executed against the fake server."""
+
+import unittest
+
+from benchmarks.fake_netbox import Dataset
+from netbox_client import AsyncNetBoxRestClient
+from netbox_planner import Predicate, plan_query
+from tests.support import TOKEN, AsyncFakeNetBoxTestCase
+
+DEVICE = Dataset(200).render("dcim/devices", 7)
+DEVICE["vcpus"] = 8
+DEVICE["tags"] = [{"id": 1, "name": "Edge", "slug": "edge"}]
+DEVICE["custom_fields"] = {"rack_unit": 12}
+
+
+def matches(key, value, obj=DEVICE):
+    return Predicate.parse(key, value).matches(obj)
+
+
+class PredicateTest(unittest.TestCase):
+
+    def test_exact_on_nested_object(self) -> None:
+        # Device 7 of a two-site dataset is a planned firewall in site-00001
+        self.assertTrue(matches("site", "site-00001"))
+        self.assertTrue(matches("role", ["router", "firewall"]))
+        self.assertFalse(matches("site", "site-00002"))
+
+    def test_exact_is_case_sensitive(self) -> None:
+        self.assertFalse(matches("site", "SITE-00001"))
+        self.assertTrue(matches("site__n", "SITE-00001"))
+        self.assertTrue(matches("site__ie", "SITE-00001"))
+        self.assertFalse(matches("site__nie", "SITE-00001"))
+        # Booleans are parsed, whatever their case
+        self.assertTrue(matches("enabled", "True", {"enabled": True}))
+
+    def test_id_filter_reads_the_nested_id(self) -> None:
+        self.assertTrue(matches("site_id", 1))
+        self.assertFalse(matches("site_id", 2))
+
+    def test_dotted_paths(self) -> None:
+        self.assertTrue(matches("device_type.manufacturer.slug", "vendor-4"))
+        self.assertTrue(matches("custom_fields.rack_unit__gte", 12))
+        self.assertFalse(matches("custom_fields.rack_unit__gt", 12))
+
+    def test_filter_names_standing_for_fields(self) -> None:
+        self.assertTrue(matches("tag", "edge"))
+        self.assertTrue(matches("manufacturer", "vendor-4"))
+        self.assertFalse(matches("tag", "core"))
+
+    def test_string_lookups(self) -> None:
+        self.assertTrue(matches("name__ic", "0007"))
+        self.assertTrue(matches("name__isw", "DEVICE-"))
+        self.assertTrue(matches("name__iew", "007"))
+        self.assertTrue(matches("name__nic", "router"))
+        self.assertFalse(matches("name__nisw", "device"))
+
+    def test_negation(self) -> None:
+        self.assertTrue(matches("status__n", "active"))
+        self.assertFalse(matches("status__n", "planned"))
+
+    def test_numeric_lookups(self) -> None:
+        self.assertTrue(matches("vcpus__gt", 4))
+        self.assertTrue(matches("vcpus__lte", "8"))
+        self.assertFalse(matches("vcpus__lt", 8))
+        # Nested objects are not comparable
+        self.assertFalse(matches("site__gt", 1))
+
+    def test_empty(self) -> None:
+        self.assertTrue(matches("rack__empty", "true"))
+        self.assertTrue(matches("serial__empty", "false"))
+        self.assertFalse(matches("tags__empty", True))
+
+    def test_address_matches_without_prefix_length(self) -> None:
+        self.assertTrue(matches("address", "10.0.0.1", {"address": "10.0.0.1/24"}))
+
+    def test_plan_splits_filters(self) -> None:
+        plan = plan_query({"site": "a", "name__ic": "x", "vendor": "y"}, {"site", "manufacturer"},
+                          {"vendor": "manufacturer"})
+        self.assertEqual(plan.server, {"site": "a", "manufacturer": "y"})
+        self.assertEqual([p.key for p in plan.local], ["name__ic"])
+        self.assertEqual(plan.fields, ["name"])
+
+    def test_unknown_filter_is_rejected(self) -> None:
+        plan = plan_query({"bogus_field": 1}, set())
+        with self.assertRaises(ValueError):
+            plan.filter([DEVICE])
+
+    def test_unknown_filter_is_rejected_up_front_with_known_fields(self) -> None:
+        with self.assertRaises(ValueError):
+            plan_query({"bogus_field": 1}, set(), fields=DEVICE)
+        plan = plan_query({"name__ic": "x", "manufacturer": "y", "site_id": 1}, set(), fields=set(DEVICE))
+        self.assertEqual(len(plan.local), 3)
+
+    def test_filter_applies_limit(self) -> None:
+        plan = plan_query({"status": "active"}, set(), limit=2)
+        objects = [{"id": n, "status": {"value": "active" if n % 2 else "planned"}} for n in range(10)]
+        self.assertEqual([o["id"] for o in plan.filter(objects)], [1, 3])
+        self.assertTrue(plan.stopped_early)
+
+
+class QueryPlanExecuteTest(AsyncFakeNetBoxTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.client = AsyncNetBoxRestClient(self.server.url, TOKEN)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_local_predicates_on_server_filtered_results(self) -> None:
+        plan = plan_query({"site_id": 1, "role": "router"}, {"site_id"})
+        devices = await plan.execute(self.client, "dcim/devices")
+        # Devices 3, 13, 23, ... are routers; the odd ones are in site 1
+        expected = [n for n in range(1, self.devices + 1) if n % 2 == 1 and n % 5 == 3]
+        self.assertEqual([d["id"] for d in devices], expected)
+        self.assertEqual(plan.scanned, self.devices // 2)
+        self.assertEqual(plan.matched, len(expected))
+
+    async def test_limit_stops_the_scan(self) -> None:
+        plan = plan_query({"status": "offline"}, set(), limit=3)
+        devices = await plan.execute(self.client, "dcim/devices")
+        self.assertEqual([d["id"] for d in devices], [2, 5, 8])
+        self.assertTrue(plan.stopped_early)
+        self.assertEqual(plan.scanned, 8)
+        # A single page request
+        self.assertEqual(self.requests_sent(), 1)
+
+    async def test_scan_cap(self) -> None:
+        plan = plan_query({"name__ic": "no such device"}, set())
+        plan.max_scanned = 100
+        self.assertEqual(await plan.execute(self.client, "dcim/devices"), [])
+        self.assertTrue(plan.scan_capped)
+        self.assertEqual(plan.scanned, 100)
+
+    async def test_unknown_filter_fails_on_the_first_object(self) -> None:
+        plan = plan_query({"bogus_field": 1}, set())
+        with self.assertRaises(ValueError):
+            await plan.execute(self.client, "dcim/devices")
+        self.assertEqual(plan.scanned, 1)
+
+    async def test_unknown_filter_fails_when_the_server_filters_match_nothing(self) -> None:
+        plan = plan_query({"site_id": 999, "bogus_field": 1}, {"site_id"})
+        with self.assertRaises(ValueError):
+            await plan.execute(self.client, "dcim/devices")
+        self.assertEqual(plan.scanned, 0)
+        # A known field on an empty result set is simply no match
+        plan = plan_query({"site_id": 999, "name__ic": "x"}, {"site_id"})
+        self.assertEqual(await plan.execute(self.client, "dcim/devices"), [])
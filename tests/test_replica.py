@@ -0,0 +1,68 @@
+"""Replica queries match as NetBox's exact filters do, or defer to the API."""
+
+import unittest
+
+from netbox_replica import NetBoxReplica
+
+SITES = [{"id": 1, "name": "Akron", "slug": "dm-akron"}, {"id": 2, "name": "Butler", "slug": "dm-butler"}]
+VRF = {"id": 7, "name": "red", "rd": "65000:1"}
+
+DEVICES = [
+    {"id": 1, "name": "edge-1", "site": SITES[0], "status": {"value": "active", "label": "Active"},
+     "tags": [{"id": 1, "name": "Edge", "slug": "edge"}], "vrf": VRF, "enabled": True},
+    {"id": 2, "name": "Edge-2", "site": SITES[1], "status": {"value": "planned", "label": "Planned"},
+     "tags": [], "vrf": None, "enabled": False},
+]
+
+FILTERS = {"devices": {"id", "name", "site", "site_id", "status", "tag", "vrf", "enabled", "region", "q", "name__ic"}}
+FIELDS = {"devices": {"id", "name", "site", "status", "tags", "vrf", "enabled"}}
+
+
+class ListClient:
+    """Serves the devices above; the changelog is empty."""
+
+    async def iter_objects(self, endpoint, params=None, page_size=None, max_objects=None):
+        for obj in DEVICES if endpoint == "dcim/devices" else []:
+            yield obj
+
+
+class ReplicaQueryTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.replica = NetBoxReplica(ListClient(), ":memory:", {"devices": "dcim/devices"}, FILTERS, FIELDS)
+        await self.replica.full_sync("devices")
+
+    async def ids(self, **filters):
+        rows = await self.replica.query("devices", filters)
+        return None if rows is None else [row["id"] for row in rows]
+
+    async def test_nested_objects_match_by_slug_only(self) -> None:
+        self.assertEqual(await self.ids(site="dm-akron"), [1])
+        self.assertEqual(await self.ids(site=["dm-akron", "dm-butler"]), [1, 2])
+        self.assertEqual(await self.ids(site="Akron"), [])
+        self.assertEqual(await self.ids(site="1"), [])
+        self.assertEqual(await self.ids(tag="edge"), [1])
+
+    async def test_id_filters_match_the_nested_id(self) -> None:
+        self.assertEqual(await self.ids(site_id=2), [2])
+        self.assertEqual(await self.ids(id=1), [1])
+
+    async def test_choices_and_overridden_keys(self) -> None:
+        self.assertEqual(await self.ids(status="planned"), [2])
+        self.assertEqual(await self.ids(vrf="65000:1"), [1])
+        self.assertEqual(await self.ids(vrf="red"), [])
+
+    async def test_exact_matching_is_case_sensitive(self) -> None:
+        self.assertEqual(await self.ids(name="edge-2"), [])
+        self.assertEqual(await self.ids(name="Edge-2"), [2])
+        self.assertEqual(await self.ids(site="DM-AKRON"), [])
+        # Booleans are parsed, whatever their case
+        self.assertEqual(await self.ids(enabled="True"), [1])
+
+    async def test_other_filters_defer_to_the_api(self) -> None:
+        self.assertIsNone(await self.ids(q="edge"))
+        self.assertIsNone(await self.ids(name__ic="edge"))
+        # Derived from the site, so not a field of the device
+        self.assertIsNone(await self.ids(region="ohio"))
+        self.assertEqual(self.replica.indexed_filters["devices"],
+                         {"id", "name", "site", "site_id", "status", "tag", "vrf", "enabled"})
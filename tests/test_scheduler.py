@@ -0,0 +1,121 @@
+"""Priority share, fairness, rate limit and cancellation of the request scheduler."""
+
+import asyncio
+import threading
+import time
+import unittest
+
+from netbox_client import AsyncNetBoxRestClient
+from netbox_scheduler import BATCH, INTERACTIVE, RequestScheduler, priority
+from tests.support import TOKEN, AsyncFakeNetBoxTestCase
+
+
+class RequestSchedulerTest(unittest.IsolatedAsyncioTestCase):
+
+    async def take(self, scheduler, endpoint, order, label):
+        async with scheduler.aslot(endpoint):
+            order.append(label)
+
+    async def queue_behind(self, scheduler, waiters):
+        """Hold the only slot while the (priority, endpoint, label) waiters queue up, then let them run."""
+        order = []
+        async with scheduler.aslot("blocker"):
+            tasks = []
+            for name, endpoint, label in waiters:
+                with priority(name):
+                    tasks.append(asyncio.create_task(self.take(scheduler, endpoint, order, label)))
+            await asyncio.sleep(0.01)
+            self.assertEqual(sum(scheduler.stats()["waiting"].values()), len(waiters))
+        await asyncio.gather(*tasks)
+        return order
+
+    async def test_interactive_gets_its_weighted_share(self) -> None:
+        scheduler = RequestScheduler(max_in_flight=1)
+        waiters = [(BATCH, "dcim/interfaces", "b")] * 8 + [(INTERACTIVE, "dcim/devices", "i")] * 8
+        order = await self.queue_behind(scheduler, waiters)
+        # Interactive requests take four slots for every batch one, yet batch work never stalls
+        self.assertEqual(order[:10].count("i"), 8)
+        self.assertIn("b", order[:5])
+        self.assertEqual(len(order), 16)
+
+    async def test_endpoints_take_turns_within_a_class(self) -> None:
+        scheduler = RequestScheduler(max_in_flight=1)
+        waiters = [(BATCH, "dcim/interfaces", "a")] * 3 + [(BATCH, "dcim/devices", "b")]
+        order = await self.queue_behind(scheduler, waiters)
+        self.assertEqual(order, ["a", "b", "a", "a"])
+
+    async def test_endpoint_limit(self) -> None:
+        scheduler = RequestScheduler(endpoint_limits={"dcim/interfaces": 1})
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            async with scheduler.aslot("dcim/interfaces"):
+                peak = max(peak, scheduler.stats()["in_flight"])
+                await asyncio.sleep(0.005)
+
+        await asyncio.gather(*(request() for _ in range(5)))
+        self.assertEqual(peak, 1)
+
+    async def test_rate_limit(self) -> None:
+        scheduler = RequestScheduler(rate=50, burst=1)
+        started = time.monotonic()
+        for _ in range(6):
+            async with scheduler.aslot("dcim/devices"):
+                pass
+        self.assertGreaterEqual(time.monotonic() - started, 5 / 50 * 0.9)
+
+    async def test_cancelled_waiter_leaves_the_queue(self) -> None:
+        scheduler = RequestScheduler(max_in_flight=1)
+        async with scheduler.aslot("dcim/devices"):
+            waiter = asyncio.create_task(self.take(scheduler, "dcim/devices", [], "x"))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            self.assertEqual(scheduler.stats()["waiting"], {INTERACTIVE: 0, BATCH: 0})
+        self.assertEqual(scheduler.stats()["in_flight"], 0)
+        await asyncio.wait_for(self.take(scheduler, "dcim/devices", [], "y"), 1)
+
+    def test_blocking_slots_respect_max_in_flight(self) -> None:
+        scheduler = RequestScheduler(max_in_flight=2)
+        lock = threading.Lock()
+        active = peak = 0
+
+        def request():
+            nonlocal active, peak
+            with scheduler.slot("dcim/devices"):
+                with lock:
+                    active += 1
+                    peak = max(peak, active)
+                time.sleep(0.01)
+                with lock:
+                    active -= 1
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak, 2)
+        self.assertEqual(scheduler.stats()["in_flight"], 0)
+
+    def test_unknown_priority(self) -> None:
+        with self.assertRaises(ValueError):
+            with priority("urgent"):
+                pass
+
+
+class ScheduledClientTest(AsyncFakeNetBoxTestCase):
+
+    async def test_client_requests_pass_through_the_scheduler(self) -> None:
+        scheduler = RequestScheduler(max_in_flight=2)
+        client = AsyncNetBoxRestClient(self.server.url, TOKEN, max_workers=4, scheduler=scheduler)
+        try:
+            with priority(BATCH):
+                devices = await client.get("dcim/devices", page_size=25)
+        finally:
+            await client.aclose()
+        self.assertEqual(len(devices), self.devices)
+        self.assertEqual(scheduler.stats()["in_flight"], 0)
+        self.assertEqual(self.requests_sent(), 10)
@@ -0,0 +1,136 @@
+"""Registry built from an OpenAPI schema."""
+
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from netbox_schema import CACHE_FORMAT, SchemaRegistry, load_registry, parse_openapi
+
+# Nothing listens here, so every request fails at once
+UNREACHABLE = "http://127.0.0.1:9"
+
+
+def list_operation(filters, component):
+    return {
+        "get": {
+            "parameters": [{"in": "query", "name": name} for name in ["limit", "offset", *filters]],
+            "responses": {"200": {"content": {"application/json": {
+                "schema": {"$ref": f"#/components/schemas/Paginated{component}List"}}}}},
+        }
+    }
+
+
+def paginated(component, fields):
+    return {
+        f"Paginated{component}List": {"properties": {
+            "count": {"type": "integer"},
+            "results": {"type": "array", "items": {"$ref": f"#/components/schemas/{component}"}},
+        }},
+        component: {"properties": {name: {} for name in fields}},
+    }
+
+
+SCHEMA = {
+    "paths": {
+        "/api/dcim/devices/": list_operation(["name", "site_id", "q"], "DeviceWithConfigContext"),
+        "/api/dcim/devices/{id}/": {"get": {}},
+        "/api/ipam/vlans/": list_operation(["vid"], "VLAN"),
+        "/api/status/": {"get": {}},
+    },
+    "components": {"schemas": {
+        **paginated("DeviceWithConfigContext", ["id", "name", "site", "serial"]),
+        **paginated("VLAN", ["id", "vid", "name"]),
+    }},
+}
+
+
+class ParseOpenAPITest(unittest.TestCase):
+
+    def test_list_endpoints_with_filters_and_fields(self) -> None:
+        endpoints = parse_openapi(SCHEMA)
+        self.assertEqual(sorted(endpoints), ["dcim/devices", "ipam/vlans"])
+        self.assertEqual(endpoints["dcim/devices"]["filters"], ["name", "q", "site_id"])
+        self.assertEqual(endpoints["dcim/devices"]["fields"], ["id", "name", "serial", "site"])
+
+    def test_unresolvable_response_has_no_fields(self) -> None:
+        endpoints = parse_openapi({"paths": {"/api/dcim/sites/": {"get": {"parameters": []}}}})
+        self.assertEqual(endpoints["dcim/sites"], {"filters": [], "fields": []})
+
+    def test_registry_knows_fields_only_from_the_schema(self) -> None:
+        registry = SchemaRegistry({"devices": "dcim/devices", "sites": "dcim/sites"}, {"sites": {"q"}},
+                                  parse_openapi(SCHEMA))
+        self.assertEqual(registry.fields_for("devices"), {"id", "name", "serial", "site"})
+        self.assertEqual(registry.fields_for("sites"), frozenset())
+
+
+class ResolveTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.registry = SchemaRegistry({"devices": "dcim/devices", "ip-addresses": "ipam/ip-addresses",
+                                        "vm-interfaces": "virtualization/interfaces"}, {})
+
+    def test_every_spelling_maps_to_the_canonical_name(self) -> None:
+        for spelling in ["devices", "device", "dcim/devices", "/dcim/devices/", "dcim.device", " Devices "]:
+            self.assertEqual(self.registry.resolve(spelling), "devices")
+        for spelling in ["ip_addresses", "ip-address", "ipam.ipaddress", "ipaddress"]:
+            self.assertEqual(self.registry.resolve(spelling), "ip-addresses")
+        self.assertEqual(self.registry.resolve("virtualization.vminterface"), "vm-interfaces")
+
+    def test_close_misspelling(self) -> None:
+        self.assertEqual(self.registry.resolve("devcies"), "devices")
+        self.assertEqual(self.registry.resolve("devcies"), "devices")
+        self.assertEqual(self.registry._fuzzy_cache, {"devcies": "devices"})
+
+    def test_unknown_type(self) -> None:
+        with self.assertRaises(ValueError) as raised:
+            self.registry.resolve("circuits")
+        self.assertIn("ip-addresses", str(raised.exception))
+
+
+class SchemaMergeTest(unittest.TestCase):
+
+    def test_schema_adds_endpoints_and_filters(self) -> None:
+        registry = SchemaRegistry({"devices": "dcim/devices", "vlans": "dcim/vlans"}, {"devices": {"role"}},
+                                  parse_openapi(SCHEMA))
+        self.assertTrue(registry.from_schema)
+        self.assertEqual(registry.filters_for("devices"), {"name", "site_id", "q", "role"})
+        # A schema endpoint whose resource name is taken is prefixed with its app
+        self.assertEqual(registry.endpoint("ipam-vlans"), "ipam/vlans")
+        self.assertEqual(registry.resolve("ipam/vlans"), "ipam-vlans")
+        self.assertEqual(registry.resolve("vlans"), "vlans")
+
+
+class LoadRegistryTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_path = os.path.join(directory.name, "schema.json")
+
+    def write_cache(self, **overrides) -> None:
+        cache = {"format": CACHE_FORMAT, "version": "4.2.0", "fetched_at": time.time(),
+                 "endpoints": parse_openapi(SCHEMA), **overrides}
+        with open(self.cache_path, "w") as f:
+            json.dump(cache, f)
+
+    def load(self, **kwargs) -> SchemaRegistry:
+        return load_registry(UNREACHABLE, "token", {"devices": "dcim/devices"}, {"devices": {"role"}},
+                             cache_path=self.cache_path, **kwargs)
+
+    def test_fresh_cache_is_used(self) -> None:
+        self.write_cache()
+        registry = self.load()
+        self.assertEqual(registry.version, "4.2.0")
+        self.assertIn("ipam/vlans", registry.aliases)
+
+    def test_stale_cache_is_used_when_the_schema_cannot_be_fetched(self) -> None:
+        self.write_cache(fetched_at=0)
+        self.assertTrue(self.load().from_schema)
+
+    def test_cache_of_another_format_is_ignored(self) -> None:
+        self.write_cache(format=CACHE_FORMAT - 1)
+        registry = self.load()
+        self.assertFalse(registry.from_schema)
+        self.assertEqual(registry.filters_for("devices"), {"role"})
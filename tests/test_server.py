@@ -0,0 +1,80 @@
+"""The MCP read tools, against the fake server."""
+
+import logging
+import unittest
+
+import netbox_server
+from netbox_client import AsyncNetBoxRestClient
+from tests.support import TOKEN, AsyncFakeNetBoxTestCase
+
+# The server module sets up DEBUG logging for FastMCP
+logging.getLogger().setLevel(logging.WARNING)
+
+
+class GetObjectsTest(AsyncFakeNetBoxTestCase):
+    devices = 1200
+
+    async def asyncSetUp(self) -> None:
+        self.saved = netbox_server.netbox
+        netbox_server.netbox = AsyncNetBoxRestClient(self.server.url, TOKEN)
+
+    async def asyncTearDown(self) -> None:
+        await netbox_server.netbox.aclose()
+        netbox_server.netbox = self.saved
+
+    async def test_default_limit(self) -> None:
+        devices = await netbox_server.netbox_get_objects("devices")
+        self.assertEqual(len(devices), netbox_server.OBJECT_LIMIT)
+        self.assertEqual(self.requests_sent(), 1)
+
+    async def test_explicit_limit(self) -> None:
+        self.assertEqual(len(await netbox_server.netbox_get_objects("devices", limit=self.devices + 1)),
+                         self.devices)
+        self.assertEqual(len(await netbox_server.netbox_get_objects("devices", limit=3)), 3)
+
+
+class WarmUpTest(AsyncFakeNetBoxTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.saved = netbox_server.netbox
+        netbox_server.netbox = AsyncNetBoxRestClient(self.server.url, TOKEN)
+        netbox_server.metrics.reset()
+
+    async def asyncTearDown(self) -> None:
+        await netbox_server.netbox.aclose()
+        netbox_server.netbox = self.saved
+        netbox_server.metrics.reset()
+
+    async def test_prefetch_records_no_tool_spans(self) -> None:
+        warm = await netbox_server.warm_up()
+        # The fake server only serves sites of the reference types
+        self.assertEqual(warm["prefetched"], ["sites"])
+        self.assertEqual(netbox_server.metrics.snapshot()["tools"], {})
+        await netbox_server.netbox_get_objects("sites")
+        self.assertEqual(list(netbox_server.metrics.snapshot()["tools"]), ["netbox_get_objects"])
+
+
+class ChangelogClient:
+    """Records the cap each changelog read is made with."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def get(self, endpoint, id=None, params=None, max_objects=None, page_size=None):
+        self.calls.append((endpoint, params, max_objects))
+        return []
+
+
+class GetChangelogsTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        self.saved = netbox_server.netbox
+        netbox_server.netbox = self.client = ChangelogClient()
+
+    def tearDown(self) -> None:
+        netbox_server.netbox = self.saved
+
+    async def test_changelog_reads_are_capped(self) -> None:
+        await netbox_server.netbox_get_changelogs({"user": "admin"})
+        await netbox_server.netbox_get_changelogs({}, limit=10)
+        self.assertEqual([call[2] for call in self.client.calls], [100, 10])
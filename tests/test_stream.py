@@ -0,0 +1,94 @@
+"""PageParser fed a body split at every byte boundary."""
+
+import json
+import unittest
+
+from benchmarks.fake_netbox import Dataset
+from netbox_stream import PageParser, ijson
+
+DATASET = Dataset(200)
+
+PAGE = {
+    "count": 3,
+    "next": "http://netbox.example.com/api/dcim/sites/?limit=3&offset=3",
+    "previous": None,
+    "results": [
+        {"id": 1, "name": "Zürich – HQ", "description": "quote \" and brace } in text", "tags": []},
+        {"id": 2, "name": "東京", "custom_fields": {"nested": {"results": [1, 2]}}, "latitude": -1.5e-3},
+        {"id": 3, "name": "emoji 🛰", "description": "back\\slash", "tenant": None},
+    ],
+}
+
+
+def parse(body, sizes, use_ijson=False):
+    """Feed body in chunks of the given sizes (cycled) and return the objects, header and plain body."""
+    parser = PageParser(use_ijson=use_ijson)
+    objects = []
+    offset = index = 0
+    while offset < len(body):
+        size = sizes[index % len(sizes)]
+        objects.extend(parser.feed(body[offset:offset + size]))
+        offset += size
+        index += 1
+    objects.extend(parser.close())
+    return objects, parser.header, parser.body
+
+
+class PageParserTest(unittest.TestCase):
+    use_ijson = False
+
+    def setUp(self) -> None:
+        if self.use_ijson and ijson is None:
+            self.skipTest("ijson is not installed")
+
+    def check_every_split(self, page, body):
+        for split in range(len(body) + 1):
+            parser = PageParser(use_ijson=self.use_ijson)
+            objects = parser.feed(body[:split]) + parser.feed(body[split:]) + parser.close()
+            self.assertEqual(objects, page["results"], f"split at byte {split}")
+            self.assertEqual(parser.header, {k: v for k, v in page.items() if k != "results"})
+
+    def test_every_split_point(self) -> None:
+        self.check_every_split(PAGE, json.dumps(PAGE, ensure_ascii=False).encode())
+
+    def test_every_split_point_with_whitespace(self) -> None:
+        self.check_every_split(PAGE, json.dumps(PAGE, ensure_ascii=False, indent=2).encode())
+
+    def test_one_byte_at_a_time(self) -> None:
+        body = json.dumps(PAGE, ensure_ascii=False).encode()
+        objects, header, _ = parse(body, [1], self.use_ijson)
+        self.assertEqual(objects, PAGE["results"])
+        self.assertEqual(header["count"], 3)
+
+    def test_fake_server_page(self) -> None:
+        page = {"count": 200, "next": None, "previous": None,
+                "results": [DATASET.render("dcim/devices", i) for i in range(1, 201)]}
+        body = json.dumps(page, separators=(",", ":")).encode()
+        for sizes in ([7], [4096], [1, 2, 3, 5, 8, 13, 1000]):
+            objects, header, _ = parse(body, sizes, self.use_ijson)
+            self.assertEqual(objects, page["results"])
+            self.assertEqual(header["count"], 200)
+
+    def test_empty_results(self) -> None:
+        page = {"count": 0, "next": None, "previous": None, "results": []}
+        self.check_every_split(page, json.dumps(page).encode())
+
+    def test_non_envelope_body(self) -> None:
+        for value in ({"id": 1, "name": "Zürich"}, [{"id": 1}, {"id": 2}], {"netbox-version": "4.2.0"}):
+            body = json.dumps(value, ensure_ascii=False).encode()
+            for split in range(len(body) + 1):
+                parser = PageParser(use_ijson=self.use_ijson)
+                self.assertEqual(parser.feed(body[:split]) + parser.feed(body[split:]) + parser.close(), [])
+                self.assertIsNone(parser.header)
+                self.assertEqual(parser.body, value)
+
+    def test_truncated_body(self) -> None:
+        body = json.dumps(PAGE).encode()
+        parser = PageParser(use_ijson=self.use_ijson)
+        parser.feed(body[:-20])
+        with self.assertRaises(ValueError):
+            parser.close()
+
+
+class IjsonPageParserTest(PageParserTest):
+    use_ijson = True